@@ -1,5 +1,10 @@
+from typing import Any
+
 from sqladmin import Admin, ModelView
+from starlette.requests import Request
 from app.models.app_setting import AppSetting
+from app.models.feature_flag import FeatureFlag
+from app.feature_flags import invalidate_feature_flags
 from app.services import SettingsService
 from app.core.db import engine
 
@@ -33,6 +38,30 @@ class AppSettingAdmin(ModelView, model=AppSetting):
         await settings_service.clear_cache_for_key(model.key)
 
 
+class FeatureFlagAdmin(ModelView, model=FeatureFlag):
+    column_list = ["key", "enabled", "rollout_percentage", "description"]
+
+    form_include_pk = True
+
+    form_columns = ["key", "enabled", "rollout_percentage", "allow_list", "description"]
+
+    column_searchable_list = ["key", "description"]
+
+    name = "Feature flag"
+    name_plural = "Feature flags"
+    icon = "fa-solid fa-flag"
+
+    # Tras cualquier cambio, todos los procesos recompilan las reglas
+    async def after_model_change(
+        self, data: dict[str, Any], model: FeatureFlag, is_created: bool, request: Request
+    ) -> None:
+        await invalidate_feature_flags()
+
+    async def after_model_delete(self, model: FeatureFlag, request: Request) -> None:
+        await invalidate_feature_flags()
+
+
 def setup_admin(app):
     admin = Admin(app, engine)
     admin.add_view(AppSettingAdmin)
+    admin.add_view(FeatureFlagAdmin)
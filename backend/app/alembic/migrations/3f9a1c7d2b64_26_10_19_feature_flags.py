@@ -0,0 +1,41 @@
+"""26-10-19-feature_flags
+
+Revision ID: 3f9a1c7d2b64
+Revises: 6bec4302ec7e
+Create Date: 2026-10-19 10:30:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "3f9a1c7d2b64"
+down_revision = "6bec4302ec7e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "feature_flags",
+        sa.Column("key", sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+        sa.Column("enabled", sa.Boolean(), nullable=False),
+        sa.Column("rollout_percentage", sa.Integer(), nullable=False),
+        sa.Column(
+            "allow_list",
+            postgresql.JSONB(astext_type=sa.Text()),
+            server_default=sa.text("'[]'::jsonb"),
+            nullable=False,
+        ),
+        sa.Column(
+            "description", sqlmodel.sql.sqltypes.AutoString(length=255), nullable=True
+        ),
+        sa.PrimaryKeyConstraint("key"),
+    )
+
+
+def downgrade():
+    op.drop_table("feature_flags")
@@ -1,7 +1,7 @@
 from collections.abc import Generator
 from typing import Annotated, AsyncGenerator
 
-from fastapi import Depends, Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, status
 
 from sqlmodel import Session
 from sqlmodel.ext.asyncio.session import AsyncSession
@@ -9,7 +9,12 @@ from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from uuid import UUID
 
+from app.core.cache import cache_service
+from app.core.cache_warmup import is_warmup_request
 from app.core.db import engine, a_engine
+from app.core.logging import get_logger
+
+log = get_logger(__name__)
 
 # ========================================================================
 #     --- DEPENDENCIAS PARA OBTENER LA SESSION DE LA BD ---
@@ -52,6 +57,7 @@ SessionDep = Annotated[Session, Depends(get_db)]
 # ========================================================================
 
 async def get_user_id(
+    request: Request,
     x_user_id: str = Header(..., alias="X-User-Id"),
 ) -> UUID:
     """
@@ -59,13 +65,23 @@ async def get_user_id(
     como header interno. Este backend sólo lo lee y confía.
     """
     try:
-        return UUID(x_user_id)
+        user_id = UUID(x_user_id)
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="X-User-Id header must be a valid UUID.",
         )
 
+    # Actividad reciente para el precalentamiento de caché (best-effort). Las
+    # peticiones del propio precalentamiento no cuentan: si no, los usuarios
+    # calentados nunca dejarían de ser "recientes"
+    if not is_warmup_request(request.scope):
+        try:
+            await cache_service.mark_user_active(user_id)
+        except Exception as exc:
+            log.warning("deps.user_activity.failed", user_id=str(user_id), error=str(exc))
+    return user_id
+
 
 # ========================================================================
 #     --- DEPENDENCIAS PARA LOS REPOSITORIOS ---
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1.routes import utils
+from app.api.v1.routes import cvs, reference, uploads, utils
 
 # ========================================================================
 #           --- ROUTER PRINCIPAL PARA LA API RESTful V1 ---
@@ -9,3 +9,6 @@ api_router = APIRouter()
 
 # Incluir cada router
 api_router.include_router(utils.router)  # Root
+api_router.include_router(reference.router)
+api_router.include_router(cvs.router)
+api_router.include_router(uploads.router)
@@ -0,0 +1,81 @@
+# endpoints de CVs (descarga del PDF generado)
+
+import asyncio
+import os
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from app.api.deps import get_user_id
+from app.core.config import settings
+from app.core.pdf_disk_cache import pdf_disk_cache
+from app.core.s3 import StoredObject, minio_client
+from app.core.security import require_admin_key
+
+router = APIRouter(prefix="/cvs", tags=["cvs"], dependencies=[Depends(get_user_id)])
+
+PDF_MEDIA_TYPE = "application/pdf"
+
+
+def _pdf_headers(cv_id: UUID, info: StoredObject) -> dict[str, str]:
+    return {
+        "Content-Disposition": f'attachment; filename="cv-{cv_id}.pdf"',
+        "ETag": f'"{info.etag}"',
+    }
+
+
+# ===========================================================================
+#       --- Descarga del PDF (caché en disco del nodo + MinIO) ---
+# ===========================================================================
+
+
+@router.get(
+    "/{cv_id}/pdf",
+    response_class=Response,
+    dependencies=[Depends(require_admin_key)],
+)
+async def download_cv_pdf(cv_id: UUID) -> Response:
+    """
+    Descarga el PDF generado de un CV.
+
+    Solo para servicios internos (X-Admin-Key): aún no hay modelo de CV con
+    el que comprobar que el CV es del usuario del X-User-Id. Los clientes
+    descargan con la presigned URL de minio_client.get_download_url.
+
+    Con la caché en disco activa (PDF_DISK_CACHE_DIR), un acierto se envía
+    sin pasar el fichero por Python: X-Accel-Redirect a nginx o FileResponse
+    (sendfile). En un fallo se hace streaming desde MinIO guardando a la vez
+    una copia para las siguientes descargas. Si otro worker borra el fichero
+    entre el acierto y el envío, también se sirve desde MinIO.
+    """
+    if pdf_disk_cache is not None:
+        info = await minio_client.stat_pdf(cv_id)
+        if info is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="PDF not found")
+
+        path = await pdf_disk_cache.get(info.name, info.etag)
+        if path is not None:
+            headers = _pdf_headers(cv_id, info)
+            if settings.PDF_DISK_CACHE_ACCEL_PREFIX:
+                headers["X-Accel-Redirect"] = f"{settings.PDF_DISK_CACHE_ACCEL_PREFIX}{path.name}"
+                return Response(media_type=PDF_MEDIA_TYPE, headers=headers)
+            try:
+                # Con el stat hecho, FileResponse no vuelve a comprobar que existe
+                stat_result = await asyncio.to_thread(os.stat, path)
+            except FileNotFoundError:
+                stat_result = None
+            if stat_result is not None:
+                return FileResponse(
+                    path, media_type=PDF_MEDIA_TYPE, headers=headers, stat_result=stat_result
+                )
+
+    opened = await minio_client.open_pdf(cv_id)
+    if opened is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="PDF not found")
+    info, chunks = opened
+    if pdf_disk_cache is not None:
+        chunks = pdf_disk_cache.tee(info.name, info.etag, chunks)
+    headers = _pdf_headers(cv_id, info)
+    headers["Content-Length"] = str(info.size)
+    return StreamingResponse(chunks, media_type=PDF_MEDIA_TYPE, headers=headers)
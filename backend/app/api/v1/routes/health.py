@@ -13,9 +13,10 @@ import psutil
 from datetime import datetime
 
 from fastapi import APIRouter
-from fastapi_cache.decorator import cache
+from fastapi_cache import default_key_builder
 from pydantic import BaseModel
 
+from app.core.cache import cached
 from app.core.config import settings
 from app.core.logging import get_logger
 
@@ -55,6 +56,26 @@ class NetworkMetrics(BaseModel):
     packets_recv: int
 
 
+class CacheNamespaceStats(BaseModel):
+    layer: str  # "http" | "service"
+    namespace: str
+    lookups: int
+    hits_l1: int
+    hits: int
+    stale: int
+    misses: int
+    hit_ratio: float | None = None
+    avg_fill_ms: float | None = None
+    max_fill_ms: float | None = None
+    avg_payload_bytes: int | None = None
+
+
+class CacheSummary(BaseModel):
+    l1_entries: int
+    l1_bytes: int
+    namespaces: list[CacheNamespaceStats]
+
+
 class SystemStatusResponse(BaseModel):
     status: str  # "ok" | "degraded" | "down"
     version: str
@@ -64,6 +85,7 @@ class SystemStatusResponse(BaseModel):
     disk_usage: ResourceMetrics
     memory_usage: ResourceMetrics
     network: NetworkMetrics
+    cache: CacheSummary
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -90,7 +112,7 @@ async def health_check() -> HealthResponse:
         "Respuesta cacheada 15 segundos para no saturar los servicios."
     ),
 )
-@cache(expire=15)
+@cached(expire=15, namespace="status", key_builder=default_key_builder)
 async def system_status() -> SystemStatusResponse:
     services: list[ServiceStatus] = []
     overall = "ok"
@@ -235,6 +257,16 @@ async def system_status() -> SystemStatusResponse:
         status=mem_status,
     )
 
+    # ── Caché (contadores de este worker) ──────────────────────
+    from app.core.cache import local_cache
+    from app.core.cache_metrics import cache_metrics
+
+    cache_summary = CacheSummary(
+        l1_entries=len(local_cache),
+        l1_bytes=local_cache.nbytes,
+        namespaces=[CacheNamespaceStats(**row) for row in cache_metrics.summary()],
+    )
+
     net = psutil.net_io_counters()
     net_metrics = NetworkMetrics(
         bytes_sent=net.bytes_sent,
@@ -252,4 +284,5 @@ async def system_status() -> SystemStatusResponse:
         disk_usage=disk_metrics,
         memory_usage=mem_metrics,
         network=net_metrics,
+        cache=cache_summary,
     )
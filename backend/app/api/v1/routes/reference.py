@@ -0,0 +1,64 @@
+# endpoints de datos de referencia (enums, catálogo de plantillas)
+
+from fastapi import APIRouter, Request, Response, status
+from fastapi.responses import RedirectResponse
+
+from app.core.config import settings
+from app.services.reference_data import get_reference_bundle
+
+router = APIRouter(prefix="/reference", tags=["reference"])
+
+# El contenido de una URL versionada no cambia nunca
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# El manifest se revalida siempre (304 con If-None-Match)
+MANIFEST_CACHE_CONTROL = "no-cache"
+
+
+def _bundle_url(version: str) -> str:
+    return f"{settings.API_V1_PREFIX}{router.prefix}/bundle/{version}"
+
+
+# ===========================================================================
+#           --- Manifest: versión vigente del bundle ---
+# ===========================================================================
+
+
+@router.get("/manifest", response_model=None)
+async def get_reference_manifest(request: Request, response: Response) -> Response | dict[str, str]:
+    """
+    Versión vigente del bundle de datos de referencia y su URL.
+    El cliente solo descarga el bundle cuando cambia `version`.
+    """
+    bundle  = get_reference_bundle()
+    headers = {"ETag": bundle.etag, "Cache-Control": MANIFEST_CACHE_CONTROL}
+    if request.headers.get("If-None-Match") == bundle.etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return {"version": bundle.version, "url": _bundle_url(bundle.version)}
+
+
+# ===========================================================================
+#        --- Bundle versionado (enums + catálogo de plantillas) ---
+# ===========================================================================
+
+
+@router.get("/bundle/{version}")
+async def get_reference_bundle_by_version(version: str) -> Response:
+    """
+    Bundle precalculado, servido tal cual (sin serializar por petición) y
+    cacheable para siempre. Una versión antigua (p. ej. durante un
+    despliegue) redirige a la vigente sin que se cachee la redirección.
+    """
+    bundle = get_reference_bundle()
+    if version != bundle.version:
+        return RedirectResponse(
+            _bundle_url(bundle.version),
+            status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+            headers={"Cache-Control": "no-store"},
+        )
+    return Response(
+        content=bundle.body,
+        media_type="application/json",
+        headers={"ETag": bundle.etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL},
+    )
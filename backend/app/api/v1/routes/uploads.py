@@ -0,0 +1,98 @@
+# endpoints de subidas directas a MinIO (avatares y previews de plantillas)
+
+from dataclasses import asdict
+from typing import Any
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Path, status
+
+from app.api.deps import get_user_id
+from app.core.s3 import UploadRejected, minio_client
+from app.core.security import require_admin_key
+from app.schemas import (
+    PresignedUploadResponse,
+    UploadCompleteRequest,
+    UploadCompleteResponse,
+    UploadRequest,
+)
+
+router = APIRouter(prefix="/uploads", tags=["uploads"])
+
+TemplateSlug = Path(pattern=r"^[a-z0-9][a-z0-9-]{0,63}$")
+
+
+# ===========================================================================
+#   --- Subida en dos pasos: el fichero nunca pasa por la API ---
+#   1. POST /uploads/...            -> política de presigned POST
+#   2. el navegador sube a MinIO    (multipart con los `fields`)
+#   3. POST /uploads/.../complete   -> se valida y se publica
+# ===========================================================================
+
+
+def _rejected(exc: UploadRejected) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
+
+
+# ---------------------------------------------------------------------------
+#                       --- Avatar del usuario ---
+# ---------------------------------------------------------------------------
+@router.post("/avatar", response_model=PresignedUploadResponse)
+async def presign_avatar_upload(
+    body: UploadRequest,
+    user_id: UUID = Depends(get_user_id),
+) -> dict[str, Any]:
+    """Política para subir el avatar directamente a MinIO."""
+    try:
+        upload = await minio_client.presign_avatar_upload(user_id, body.content_type)
+    except UploadRejected as exc:
+        raise _rejected(exc)
+    return asdict(upload)
+
+
+@router.post("/avatar/complete", response_model=UploadCompleteResponse)
+async def complete_avatar_upload(
+    body: UploadCompleteRequest,
+    user_id: UUID = Depends(get_user_id),
+) -> UploadCompleteResponse:
+    """Publica el avatar subido y retorna su URL."""
+    try:
+        url = await minio_client.complete_avatar_upload(user_id, body.token)
+    except UploadRejected as exc:
+        raise _rejected(exc)
+    return UploadCompleteResponse(url=url)
+
+
+# ---------------------------------------------------------------------------
+#               --- Preview de una plantilla (admin) ---
+# ---------------------------------------------------------------------------
+@router.post(
+    "/template-preview/{slug}",
+    response_model=PresignedUploadResponse,
+    dependencies=[Depends(require_admin_key)],
+)
+async def presign_template_preview_upload(
+    body: UploadRequest, slug: str = TemplateSlug
+) -> dict[str, Any]:
+    """Política para subir el preview de una plantilla directamente a MinIO."""
+    try:
+        upload = await minio_client.presign_template_preview_upload(slug, body.content_type)
+    except UploadRejected as exc:
+        raise _rejected(exc)
+    return asdict(upload)
+
+
+@router.post(
+    "/template-preview/{slug}/complete",
+    response_model=UploadCompleteResponse,
+    dependencies=[Depends(require_admin_key)],
+)
+async def complete_template_preview_upload(
+    body: UploadCompleteRequest,
+    slug: str = TemplateSlug,
+) -> UploadCompleteResponse:
+    """Publica el preview subido y retorna su URL."""
+    try:
+        url = await minio_client.complete_template_preview_upload(slug, body.token)
+    except UploadRejected as exc:
+        raise _rejected(exc)
+    return UploadCompleteResponse(url=url)
@@ -1,14 +1,22 @@
 # endpoints for Root and Utils
 
-from fastapi import APIRouter, Depends
-from fastapi_cache.decorator import cache
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from fastapi_cache import default_key_builder
 
 from pydantic.networks import EmailStr
 
 from app.models import Message
 from app.services import SettingsService
 from app.api.deps import get_settings_service
+from app.core.cache import cached, local_cache
+from app.core.cache_metrics import cache_metrics
 from app.core.config import settings
+from app.core.redis import redis_pools
+from app.core.redis_report import ReportInProgress, run_keyspace_report
+from app.core.security import require_admin_key
 from app.utils import generate_test_email, send_email
 
 router = APIRouter(prefix="/utils", tags=["utils"])
@@ -33,7 +41,7 @@ async def health_check() -> bool:
 #   --- Endpoint de ayuda para acceder a la documentación del sistema ---
 # ---------------------------------------------------------------------------
 @router.get("/docs-access")
-@cache(expire=86400)
+@cached(expire=86400, namespace="docs", key_builder=default_key_builder)
 async def get_docs_access_info():
     """
     Endpoint de ayuda para acceder a la documentación interna.
@@ -61,6 +69,47 @@ async def get_docs_access_info():
     }
 
 
+# ===========================================================================
+#         --- Métricas de caché y pools Redis (Prometheus) ---
+# ===========================================================================
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_cache_metrics() -> str:
+    """
+    Métricas de caché del proceso (hits, misses, latencia de relleno y
+    tamaño por capa y namespace) y de los pools Redis (conexiones en uso /
+    ociosas, espera por conexión) en formato de texto de Prometheus.
+    """
+    return cache_metrics.render_prometheus(
+        l1_entries=len(local_cache),
+        l1_bytes=local_cache.nbytes,
+    ) + redis_pools.render_prometheus()
+
+
+# ===========================================================================
+#       --- Memoria de Redis por prefijo (informe bajo demanda) ---
+# ===========================================================================
+
+
+@router.get("/redis-keyspace", dependencies=[Depends(require_admin_key)])
+async def get_redis_keyspace_report(
+    max_keys: int | None = Query(default=None, ge=1, le=settings.REDIS_REPORT_MAX_KEYS),
+) -> dict[str, Any]:
+    """
+    Claves, memoria (MEMORY USAGE) y distribución de TTL por prefijo en la
+    DB de caché. Recorre el keyspace con SCAN por lotes y con pausas, así
+    que puede tardar unos segundos; solo se ejecuta un informe a la vez.
+    """
+    try:
+        return await run_keyspace_report(max_keys=max_keys)
+    except ReportInProgress:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Ya hay un informe de keyspace en curso",
+        )
+
+
 # ===========================================================================
 #           --- Endpoint para simular un error inesperado. ---
 # ===========================================================================
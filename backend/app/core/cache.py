@@ -13,13 +13,59 @@ Caché en dos niveles sobre Redis:
       - Locks distribuidos para evitar generaciones duplicadas
       - Invalidación granular por usuario / CV
 
-Uso del decorador @cache en rutas:
-    from fastapi_cache.decorator import cache
-    from app.core.cache import CacheKeys, user_key_builder
-
-    @router.get("/templates")
-    @cache(expire=CacheKeys.TTL_TEMPLATES, key_builder=user_key_builder)
-    async def list_templates(...): ...
+Caché L1 en proceso (app/core/local_cache.py):
+    Delante de ambos niveles hay una LRU/TTL en memoria para los namespaces
+    de CacheKeys.L1_POLICY (plantillas, app settings, feature flags). Las
+    invalidaciones se publican en el canal Redis L1_INVALIDATION_CHANNEL
+    para que todos los workers y réplicas borren su copia.
+
+Protección contra estampidas (single-flight + stale-while-revalidate):
+    Cada entrada tiene un TTL "soft" (el `expire` pedido) y uno "hard"
+    (soft + CacheKeys.swr_grace). Pasado el soft, un único proceso gana el
+    lock `lock:fill:<clave>` y recalcula; el resto sigue sirviendo el valor
+    anterior. Si la clave no existe, solo el ganador consulta Postgres y los
+    demás esperan a que aparezca el resultado. Si el handler del ganador
+    falla, @cached libera el lock para que otro lo intente sin esperar a
+    su TTL. Una petición con `Cache-Control: no-cache` recalcula sin lock
+    ni espera.
+
+Invalidación por tags:
+    Cada respuesta cacheada se registra en sets Redis por tag (usuario,
+    usuario+namespace, CV, plantillas). Invalidar un tag lee los miembros
+    del set y los borra en un pipeline: coste O(claves afectadas), sin
+    recorrer el keyspace con KEYS/SCAN. Los sets de tags que nunca se
+    invalidan se podan por muestreo al escribir (SRANDMEMBER + EXISTS):
+    las claves ya expiradas no se acumulan en ellos.
+
+GET condicional (ETag / 304):
+    Cada respuesta cacheada lleva un ETag fuerte (hash del cuerpo cacheado),
+    guardado también en la marca de frescura de la entrada. Con @cached, una
+    petición con If-None-Match se resuelve con un único GET a Redis: si
+    coincide se responde 304 sin ejecutar el handler ni serializar nada.
+
+Redis Cluster (REDIS_MODE=cluster):
+    Las claves por usuario y por CV llevan su id como hash tag (`{<id>}`):
+    respuestas, sets de tags, estado, locks y marcas de frescura de un mismo
+    usuario o CV caen en el mismo slot, así que sus operaciones multi-clave
+    van a un solo nodo. Las lecturas de varias claves de slots distintos
+    (get_many, get_cv_statuses) se reparten por nodo.
+
+Métricas (app/core/cache_metrics.py):
+    Hits (L1 / Redis), stale, misses, latencia de relleno y tamaño escrito
+    por capa (http / service) y namespace. Las claves HTTP llevan el
+    namespace en claro para poder agruparlas. Expuestas en /utils/metrics
+    (Prometheus) y resumidas en el endpoint de estado.
+
+Uso del decorador @cached en rutas (envuelve @cache de fastapi-cache2):
+    from app.core.cache import CacheKeys, cached, user_key_builder
+
+    @router.get("/projects")
+    @cached(
+        expire=CacheKeys.TTL_PROJECTS,
+        namespace=CacheKeys.NS_PROJECTS,
+        key_builder=user_key_builder,
+    )
+    async def list_projects(...): ...
 
 Uso de CacheService en servicios:
     from app.core.cache import cache_service
@@ -27,26 +73,47 @@ Uso de CacheService en servicios:
     status = await cache_service.get_cv_status(cv_id)
     if not status:
         ...
+
+    # Varias claves en un round-trip (MGET / pipeline)
+    statuses = await cache_service.get_cv_statuses(cv_ids)
+    values   = await cache_service.get_many([key_a, key_b])
+    await cache_service.set_many({key_a: a, key_b: b}, ttl={key_a: 60, key_b: 300})
 """
 from __future__ import annotations
 
+import asyncio
 import hashlib
+import inspect
 import json
+import random
+import secrets
+import time
+from collections.abc import Awaitable, Callable, Coroutine, Iterable
+from contextvars import ContextVar
+from functools import wraps
 from typing import Any
 from uuid import UUID
 
 from fastapi import Request, Response
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
-from redis.asyncio import ConnectionPool, Redis
-from redis.asyncio.retry import Retry
-from redis.backoff import ExponentialBackoff
+from fastapi_cache.decorator import cache
+from fastapi_cache.types import KeyBuilder
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
 
+from app.core import cache_codec
+from app.core.cache_metrics import cache_metrics
 from app.core.config import settings
+from app.core.local_cache import MISS, LocalCache
 from app.core.logging import get_logger
+from app.core.redis import queue_delete, redis_pools
 
 log = get_logger(__name__)
 
+HTTP_CACHE_PREFIX       = "cvgen:http:"
+L1_INVALIDATION_CHANNEL = "cache:l1:invalidate"
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # TTLs y constructores de claves centralizados
@@ -68,6 +135,29 @@ class CacheKeys:
     TTL_CV_STATUS      = 10      # Estado del job PDF: 10 seg (polling rápido)
     TTL_PDF_LOCK       = 300     # Lock de generación PDF: 5 min (máx. duración)
     TTL_HEALTH         = 15      # Health check: 15 seg
+    TTL_FEATURE_FLAGS  = 3600    # Reglas de feature flags (se invalidan al cambiar)
+    TTL_FILL_LOCK      = 10      # Lock single-flight de relleno de caché
+    TTL_STALE_MAX      = 300     # Máximo tiempo sirviendo un valor caducado
+    TTL_WARMUP_LOCK    = 300     # Un solo precalentamiento por despliegue
+    TTL_REPORT_LOCK    = 600     # Un solo informe de keyspace a la vez
+    TTL_PENDING_INVAL  = 300     # Invalidaciones diferidas aún sin ejecutar
+
+    # Espera máxima de los procesos que no ganan el lock de relleno
+    FILL_WAIT_TIMEOUT  = 3.0
+    FILL_WAIT_INTERVAL = 0.05
+
+    # TTL máximo en la L1 de cada proceso (acota la desincronización si se
+    # pierde un mensaje de invalidación)
+    TTL_L1_TEMPLATES   = 60
+    TTL_L1_SETTINGS    = 30
+    TTL_L1_FLAGS       = 30
+
+    # Usuarios activos recientes (ZSET por último acceso, para el warmup)
+    ACTIVE_USERS_MAX            = 10_000
+    ACTIVE_USERS_TOUCH_INTERVAL = 60     # como mucho un ZADD por usuario y minuto
+
+    # Índice de expiración de PDFs (ZSET cv_id → expires_at, epoch)
+    PDF_EXPIRY_BATCH            = 500    # entradas vencidas por lote de limpieza
 
     # ── Prefijos ──────────────────────────────────────────────────────────────
     _PFX_CV        = "cv:"
@@ -77,72 +167,527 @@ class CacheKeys:
     _PFX_PERSONAL  = "personal:"
     _PFX_STATUS    = "cv_status:"
     _PFX_LOCK      = "lock:"
+    _PFX_TAG       = "cache_tag:"
+    _PFX_SETTINGS  = "app_settings:"
+    _PFX_ACTIVITY  = "activity:"
+    _PFX_FLAGS     = "feature_flags:"
+    _PFX_PENDING   = "cache_pending:"
+    _PFX_PRESIGN   = "presigned:"
+    _PFX_EXPIRY    = "pdf_expiry:"
+
+    # ── Namespaces de @cache (usados también como tags de invalidación) ───────
+    NS_CV          = "cv"
+    NS_PROJECTS    = "project"
+    NS_SKILLS      = "skill"
+    NS_TEMPLATES   = "template"
+    NS_PERSONAL    = "personal"
+
+    # Vida mínima de un set de tags: cubre el TTL más largo de las respuestas
+    # etiquetadas. Se extiende (EXPIRE GT) si se etiqueta algo más duradero.
+    TTL_TAG_INDEX  = TTL_TEMPLATES + 60
+
+    # Poda de los sets de tags: en esta fracción de escrituras se comprueba
+    # una muestra de TAG_PRUNE_SAMPLE miembros por tag y se quitan los que
+    # ya expiraron
+    TAG_PRUNE_RATE   = 0.05
+    TAG_PRUNE_SAMPLE = 32
+
+    # ── Política L1: prefijo de clave → TTL máximo en memoria ────────────────
+    # Solo datos globales y poco volátiles. Nada por usuario ni de polling.
+    L1_POLICY: dict[str, int] = {
+        f"{HTTP_CACHE_PREFIX}:templates:": TTL_L1_TEMPLATES,
+        _PFX_SETTINGS:                     TTL_L1_SETTINGS,
+        _PFX_FLAGS:                        TTL_L1_FLAGS,
+    }
 
     # ── Claves compuestas ─────────────────────────────────────────────────────
 
+    @staticmethod
+    def slot(value: str | UUID) -> str:
+        """
+        Hash tag de Redis Cluster: solo `{…}` decide el slot, así que las
+        claves con el mismo id (usuario o CV) quedan en el mismo nodo.
+        """
+        return f"{{{value}}}"
+
     @staticmethod
     def cv_status(cv_id: str | UUID) -> str:
         """Estado del job de generación PDF de un CV."""
-        return f"{CacheKeys._PFX_STATUS}{cv_id}"
+        return f"{CacheKeys._PFX_STATUS}{CacheKeys.slot(cv_id)}"
 
     @staticmethod
     def pdf_lock(cv_id: str | UUID) -> str:
         """Lock distribuido para la generación PDF de un CV concreto."""
-        return f"{CacheKeys._PFX_LOCK}pdf:{cv_id}"
+        return f"{CacheKeys._PFX_LOCK}pdf:{CacheKeys.slot(cv_id)}"
 
     @staticmethod
     def user_projects(user_id: str | UUID) -> str:
         """Clave de caché para el listado de proyectos de un usuario."""
-        return f"{CacheKeys._PFX_PROJECT}user:{user_id}"
+        return f"{CacheKeys._PFX_PROJECT}user:{CacheKeys.slot(user_id)}"
 
     @staticmethod
     def user_skills(user_id: str | UUID) -> str:
         """Clave de caché para las skills de un usuario."""
-        return f"{CacheKeys._PFX_SKILL}user:{user_id}"
+        return f"{CacheKeys._PFX_SKILL}user:{CacheKeys.slot(user_id)}"
 
     @staticmethod
     def user_cv_list(user_id: str | UUID) -> str:
         """Clave de caché para la lista de CVs de un usuario."""
-        return f"{CacheKeys._PFX_CV}list:{user_id}"
+        return f"{CacheKeys._PFX_CV}list:{CacheKeys.slot(user_id)}"
 
     @staticmethod
     def cv_detail(cv_id: str | UUID) -> str:
         """Clave de caché para el detalle de un CV."""
-        return f"{CacheKeys._PFX_CV}detail:{cv_id}"
+        return f"{CacheKeys._PFX_CV}detail:{CacheKeys.slot(cv_id)}"
+
+    @staticmethod
+    def presigned_pdf_url(cv_id: str | UUID) -> str:
+        """Presigned URL de descarga del PDF de un CV (app/core/s3.py)."""
+        return f"{CacheKeys._PFX_PRESIGN}pdf:{CacheKeys.slot(cv_id)}"
+
+    @staticmethod
+    def pdf_expiry_index() -> str:
+        """ZSET cv_id → momento (epoch) en que caduca su PDF."""
+        return f"{CacheKeys._PFX_EXPIRY}pdfs"
+
+    @staticmethod
+    def feature_flags() -> str:
+        """Reglas de todos los feature flags (ver app/feature_flags.py)."""
+        return f"{CacheKeys._PFX_FLAGS}rules"
+
+    @staticmethod
+    def active_users() -> str:
+        """ZSET user_id → último acceso (epoch)."""
+        return f"{CacheKeys._PFX_ACTIVITY}users"
+
+    @staticmethod
+    def warmup_lock() -> str:
+        """Lock del precalentamiento (un solo worker/réplica lo ejecuta)."""
+        return f"{CacheKeys._PFX_LOCK}cache_warmup"
+
+    @staticmethod
+    def invalidation_pending(scope: str) -> str:
+        """
+        Invalidaciones diferidas pendientes de un usuario (o `global`).
+        ZSET; `zset:` lo separa de los SET que usaban versiones anteriores.
+        """
+        return f"{CacheKeys._PFX_PENDING}zset:{CacheKeys.slot(scope)}"
+
+    @staticmethod
+    def keyspace_report_lock() -> str:
+        """Lock del informe de memoria por prefijo (app/core/redis_report.py)."""
+        return f"{CacheKeys._PFX_LOCK}keyspace_report"
+
+    @staticmethod
+    def fresh_marker(key: str) -> str:
+        """
+        Marca de frescura: existe mientras la entrada no ha pasado su TTL soft.
+        Su valor es el ETag de la entrada.
+        """
+        return f"{key}:fresh"
+
+    @staticmethod
+    def fill_lock(key: str) -> str:
+        """Lock single-flight para recalcular una entrada de caché."""
+        return f"{CacheKeys._PFX_LOCK}fill:{key}"
+
+    @staticmethod
+    def swr_grace(ttl: int) -> int:
+        """Ventana stale-while-revalidate: la mitad del TTL, como máximo 5 min."""
+        return min(max(ttl // 2, 1), CacheKeys.TTL_STALE_MAX)
+
+    # ── Tags del índice de invalidación ───────────────────────────────────────
+
+    @staticmethod
+    def tag_user(user_id: str | UUID, namespace: str = "") -> str:
+        """Tag de todas las respuestas de un usuario (o de un namespace suyo)."""
+        base = f"{CacheKeys._PFX_TAG}user:{CacheKeys.slot(user_id)}"
+        return f"{base}:{namespace}" if namespace else base
+
+    @staticmethod
+    def tag_cv(cv_id: str | UUID) -> str:
+        """Tag de las respuestas que dependen de un CV concreto."""
+        return f"{CacheKeys._PFX_TAG}cv:{CacheKeys.slot(cv_id)}"
+
+    @staticmethod
+    def tag_templates() -> str:
+        """Tag de las respuestas del catálogo de plantillas (globales)."""
+        return f"{CacheKeys._PFX_TAG}templates"
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Connection pools
+# Clientes Redis (pools `cache` y `http_cache` de app/core/redis.py)
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _build_pool(db: int) -> ConnectionPool:
-    """Pool Redis con reintentos exponenciales y health check."""
-    base_url = (
-        f"redis://"
-        f"{(':' + settings.REDIS_PASSWORD.get_secret_value() + '@') if settings.REDIS_PASSWORD else ''}"
-        f"{settings.REDIS_HOST}:{settings.REDIS_PORT}/{db}"
-    )
-    return ConnectionPool.from_url(
-        base_url,
-        max_connections=20,
-        decode_responses=True,
-        retry=Retry(ExponentialBackoff(cap=10, base=0.5), retries=3),
-        retry_on_error=[ConnectionError, TimeoutError],
-        socket_connect_timeout=5,
-        socket_timeout=5,
-        health_check_interval=30,
+def get_redis_client() -> Redis:
+    """
+    Cliente Redis listo para usar en servicios y tareas Celery.
+    Retorna bytes: los valores se codifican con app.core.cache_codec.
+    """
+    return redis_pools.client("cache")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# L1 en proceso + invalidación por pub/sub
+# ─────────────────────────────────────────────────────────────────────────────
+
+local_cache = LocalCache(
+    max_entries=settings.L1_CACHE_MAX_ENTRIES,
+    max_bytes=settings.L1_CACHE_MAX_BYTES,
+    policy=CacheKeys.L1_POLICY,
+)
+
+_l1_listener_task: asyncio.Task[None] | None = None
+
+# Callbacks por clave L1: se lanzan en segundo plano al recibir su
+# invalidación (p. ej. recompilar las reglas de feature flags)
+_l1_hooks: dict[str, Callable[[], Coroutine[Any, Any, Any]]] = {}
+_l1_hook_tasks: set[asyncio.Task[Any]] = set()
+
+
+def on_l1_invalidation(key: str, hook: Callable[[], Coroutine[Any, Any, Any]]) -> None:
+    """Ejecuta `hook` en este proceso cada vez que se invalide `key`."""
+    _l1_hooks[key] = hook
+
+
+def _run_l1_hooks(keys: Iterable[str]) -> None:
+    for key in keys:
+        hook = _l1_hooks.get(key)
+        if hook is not None:
+            task = asyncio.create_task(hook())
+            _l1_hook_tasks.add(task)
+            task.add_done_callback(_l1_hook_tasks.discard)
+
+
+def _decode_keys(keys: Any) -> list[str]:
+    return [k.decode() if isinstance(k, bytes) else k for k in keys]
+
+
+def _l1_message(keys: Iterable[str]) -> str:
+    """Mensaje de invalidación L1 (solo claves que la política admite)."""
+    return json.dumps([k for k in keys if local_cache.ttl_for(k) is not None])
+
+
+async def _l1_invalidation_listener() -> None:
+    """
+    Suscripción al canal de invalidación L1. Mientras no hay suscripción
+    activa la L1 queda deshabilitada y vacía: al reconectar se pueden haber
+    perdido mensajes, así que se empieza desde cero.
+    """
+    backoff = 0.5
+    while True:
+        pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(L1_INVALIDATION_CHANNEL)
+            local_cache.clear()
+            local_cache.enabled = settings.L1_CACHE_ENABLED
+            backoff = 0.5
+            log.info("cache.l1.subscribed", channel=L1_INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    keys = json.loads(message["data"])
+                    local_cache.delete(*keys)
+                    _run_l1_hooks(keys)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            log.warning("cache.l1.subscription_lost", error=str(exc))
+        finally:
+            local_cache.enabled = False
+            local_cache.clear()
+            await pubsub.reset()
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, 10)
+
+
+async def start_l1_invalidation_listener() -> None:
+    """Arranca la suscripción L1 del proceso (lifespan de FastAPI)."""
+    global _l1_listener_task
+    if settings.L1_CACHE_ENABLED and _l1_listener_task is None:
+        _l1_listener_task = asyncio.create_task(_l1_invalidation_listener())
+
+
+async def stop_l1_invalidation_listener() -> None:
+    global _l1_listener_task
+    if _l1_listener_task is not None:
+        _l1_listener_task.cancel()
+        try:
+            await _l1_listener_task
+        except asyncio.CancelledError:
+            pass
+        _l1_listener_task = None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Single-flight (locks de relleno)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Borra el lock solo si sigue siendo nuestro (pudo expirar y pasar a otro)
+RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Saca del ZSET hasta ARGV[2] miembros con score <= ARGV[1] y los retorna
+# con su score. Atómico: dos limpiezas a la vez no reciben la misma entrada.
+_POP_DUE_LUA = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, ARGV[2])
+for i = 1, #due, 2 do
+    redis.call('ZREM', KEYS[1], due[i])
+end
+return due
+"""
+
+# Guarda un valor SWR solo si el contador KEYS[1] no cambió desde que se leyó
+# la fuente (ARGV[1], '' si no existía) y libera el lock de relleno.
+# KEYS: contador, clave, marca de frescura, lock.
+# ARGV: versión, valor, TTL hard, ETag, TTL soft, token del lock ('' si no hay).
+_STORE_IF_VERSION_LUA = """
+if redis.call('GET', KEYS[4]) == ARGV[6] then
+    redis.call('DEL', KEYS[4])
+end
+if (redis.call('GET', KEYS[1]) or '') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+redis.call('SET', KEYS[3], ARGV[4], 'EX', ARGV[5])
+return 1
+"""
+
+# (clave, token) del lock de relleno ganado por la petición en curso.
+# TaggedRedisBackend.set() lo libera en el mismo pipeline que guarda el valor.
+_held_fill_lock: ContextVar[tuple[str, str] | None] = ContextVar(
+    "cache_held_fill_lock", default=None
+)
+
+# La petición en curso pidió `Cache-Control: no-cache`: @cache va a ejecutar
+# el handler de todos modos, así que no compite por el lock ni espera.
+_skip_single_flight: ContextVar[bool] = ContextVar(
+    "cache_skip_single_flight", default=False
+)
+
+
+async def _acquire_fill_lock(redis: Redis, key: str) -> str | None:
+    """Intenta ganar el lock de relleno de `key`. Retorna el token o None."""
+    token = secrets.token_hex(8)
+    acquired = await redis.set(
+        CacheKeys.fill_lock(key), token, nx=True, ex=CacheKeys.TTL_FILL_LOCK
     )
+    return token if acquired else None
 
 
-# Pools independientes para fastapi-cache2 y CacheService
-# (misma DB Redis, distinto pool para no bloquear entre sí)
-_http_cache_pool = _build_pool(settings.REDIS_DB_CACHE)
-_service_pool    = _build_pool(settings.REDIS_DB_CACHE)
+def _etag_for(value: str | bytes) -> str:
+    """ETag fuerte y estable entre procesos (hash() de Python no lo es)."""
+    data = value.encode() if isinstance(value, str) else value
+    return f'"{hashlib.blake2b(data, digest_size=16).hexdigest()}"'
 
 
-def get_redis_client() -> Redis:
-    """Cliente Redis listo para usar en servicios y tareas Celery."""
-    return Redis(connection_pool=_service_pool)
+async def _read_swr(redis: Redis, key: str) -> tuple[int, Any]:
+    """
+    `(ttl_fresco, valor)` en un round-trip. ttl_fresco <= 0 indica que el
+    valor existe pero ya pasó su TTL soft (stale).
+    """
+    async with redis.pipeline(transaction=False) as pipe:
+        fresh_ttl, value = await pipe.ttl(CacheKeys.fresh_marker(key)).get(key).execute()
+    return fresh_ttl, value
+
+
+async def _wait_for_fill(redis: Redis, key: str) -> tuple[int, Any]:
+    """Espera a que el ganador del lock guarde el valor (o se agote el plazo)."""
+    deadline = time.monotonic() + CacheKeys.FILL_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(CacheKeys.FILL_WAIT_INTERVAL)
+        ttl, value = await _read_swr(redis, key)
+        if value is not None:
+            return ttl, value
+    log.warning("cache.fill.wait_timeout", key=key)
+    return 0, None
+
+
+def _queue_swr_write(
+    pipe: Any,
+    key: str,
+    value: Any,
+    ttl: int,
+    lock_token: str | None = None,
+) -> int:
+    """
+    Encola SET valor (TTL hard) + marca de frescura con el ETag (TTL soft).
+    Retorna el TTL hard.
+    """
+    hard_ttl = ttl + CacheKeys.swr_grace(ttl)
+    pipe.set(key, value, ex=hard_ttl)
+    pipe.set(CacheKeys.fresh_marker(key), _etag_for(value), ex=ttl)
+    if lock_token:
+        pipe.eval(RELEASE_LOCK_LUA, 1, CacheKeys.fill_lock(key), lock_token)
+    return hard_ttl
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Índice de tags
+# ─────────────────────────────────────────────────────────────────────────────
+
+# (clave, tags) registrados por el key builder de la petición en curso.
+# fastapi-cache llama al key builder y después a backend.set() dentro de la
+# misma tarea, así que el backend los recoge sin cambiar la firma de set().
+_pending_tags: ContextVar[tuple[str, tuple[str, ...]] | None] = ContextVar(
+    "cache_pending_tags", default=None
+)
+
+
+# (clave, ETag) de la última entrada leída o escrita por la petición en curso.
+# @cached lo usa para sustituir el ETag débil que pone fastapi-cache.
+_response_etag: ContextVar[tuple[str, str] | None] = ContextVar(
+    "cache_response_etag", default=None
+)
+
+
+# (clave, instante) del miss que obliga al handler a recalcular la entrada.
+# TaggedRedisBackend.set() lo usa para medir la latencia del relleno.
+_fill_started: ContextVar[tuple[str, float] | None] = ContextVar(
+    "cache_fill_started", default=None
+)
+
+
+def _register_tags(key: str, *tags: str) -> str:
+    """Asocia tags a la clave que se está construyendo. Retorna la clave."""
+    _pending_tags.set((key, tags))
+    return key
+
+
+class TaggedRedisBackend(RedisBackend):
+    """
+    RedisBackend que, al guardar una respuesta, añade su clave a los sets
+    de los tags registrados por el key builder. Todo en un solo pipeline.
+
+    Las claves que admite la política L1 se sirven desde memoria mientras
+    su copia local no expire; nunca sobreviven a la entrada de Redis.
+    """
+
+    async def get_with_ttl(self, key: str) -> tuple[int, Any]:
+        ttl, value = local_cache.get_with_ttl(key)
+        if value is not MISS:
+            cache_metrics.record("http", key, "hit_l1")
+            _response_etag.set((key, _etag_for(value)))
+            return ttl, value
+
+        ttl, value = await _read_swr(self.redis, key)
+        if _skip_single_flight.get() and (value is None or ttl <= 0):
+            return self._miss(key)
+        if value is None:
+            # Miss: solo el ganador del lock recalcula; el resto espera su resultado
+            if await self._claim_fill(key):
+                return self._miss(key)
+            ttl, value = await _wait_for_fill(self.redis, key)
+            if value is None:
+                return self._miss(key)
+        elif ttl <= 0:
+            # Stale: el ganador recalcula, los demás sirven el valor anterior
+            if await self._claim_fill(key):
+                return self._miss(key)
+            cache_metrics.record("http", key, "stale")
+            _response_etag.set((key, _etag_for(value)))
+            return 0, value
+
+        cache_metrics.record("http", key, "hit")
+        local_cache.set(key, value, ttl)
+        _response_etag.set((key, _etag_for(value)))
+        return ttl, value
+
+    @staticmethod
+    def _miss(key: str) -> tuple[int, None]:
+        """El handler va a calcular la entrada: cuenta el miss y arranca el cronómetro."""
+        cache_metrics.record("http", key, "miss")
+        _fill_started.set((key, time.monotonic()))
+        return 0, None
+
+    async def _claim_fill(self, key: str) -> bool:
+        token = await _acquire_fill_lock(self.redis, key)
+        if token is None:
+            return False
+        _held_fill_lock.set((key, token))
+        return True
+
+    async def release_fill_lock(self) -> None:
+        """Libera el lock de relleno de la petición en curso (el handler falló)."""
+        held = _held_fill_lock.get()
+        if held is None:
+            return
+        _held_fill_lock.set(None)
+        key, token = held
+        try:
+            await self.redis.eval(RELEASE_LOCK_LUA, 1, CacheKeys.fill_lock(key), token)
+        except RedisError as exc:
+            # Caduca solo (TTL_FILL_LOCK)
+            log.warning("cache.fill_lock.release_failed", key=key, error=str(exc))
+
+    async def set(self, key: str, value: Any, expire: int | None = None) -> None:
+        expire = expire or settings.CACHE_TTL_DEFAULT
+        local_cache.set(key, value, expire)
+
+        pending = _pending_tags.get()
+        tags    = pending[1] if pending and pending[0] == key else ()
+        held    = _held_fill_lock.get()
+        token   = held[1] if held and held[0] == key else None
+        if token:
+            _held_fill_lock.set(None)
+        started = _fill_started.get()
+        if started and started[0] == key:
+            _fill_started.set(None)
+            cache_metrics.record_fill("http", key, time.monotonic() - started[1])
+        cache_metrics.record_write("http", key, len(value))
+
+        _response_etag.set((key, _etag_for(value)))
+        async with self.redis.pipeline(transaction=False) as pipe:
+            hard_ttl = _queue_swr_write(pipe, key, value, expire, token)
+            tag_ttl  = max(hard_ttl, CacheKeys.TTL_TAG_INDEX)
+            for tag in tags:
+                pipe.sadd(tag, key)
+                pipe.expire(tag, tag_ttl, nx=True)
+                pipe.expire(tag, tag_ttl, gt=True)
+            await pipe.execute()
+
+        if tags and random.random() < CacheKeys.TAG_PRUNE_RATE:
+            await self._prune_tags(tags, keep=key)
+
+    async def _prune_tags(self, tags: tuple[str, ...], keep: str) -> int:
+        """
+        Quita de los sets una muestra de claves que ya no existen. Sin Lua:
+        en Redis Cluster el set y sus claves pueden estar en slots distintos.
+        Una clave recreada entre el EXISTS y el SREM (un round-trip) queda
+        fuera del set: una invalidación no la borraría antes de su TTL.
+
+        Returns:
+            Número de miembros eliminados.
+        """
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.srandmember(tag, CacheKeys.TAG_PRUNE_SAMPLE)
+            samples = [_decode_keys(members) for members in await pipe.execute()]
+
+        candidates = list({m for members in samples for m in members} - {keep})
+        if not candidates:
+            return 0
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for member in candidates:
+                pipe.exists(member)
+            exists = await pipe.execute()
+        gone = {m for m, found in zip(candidates, exists, strict=True) if not found}
+        if not gone:
+            return 0
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            queued = 0
+            for tag, members in zip(tags, samples, strict=True):
+                stale = [m for m in members if m in gone]
+                if stale:
+                    pipe.srem(tag, *stale)
+                    queued += 1
+            removed: int = sum(await pipe.execute())
+        log.debug("cache.tags.pruned", tags=len(tags), removed=removed)
+        return removed
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -154,7 +699,7 @@ async def setup_cache() -> None:
     Inicializa fastapi-cache2 con backend Redis.
     Llamar en el lifespan startup de FastAPI.
     """
-    redis = Redis(connection_pool=_http_cache_pool)
+    redis = redis_pools.client("http_cache")
     try:
         await redis.ping()
         log.info("cache.connected", host=settings.REDIS_HOST, db=settings.REDIS_DB_CACHE)
@@ -163,17 +708,21 @@ async def setup_cache() -> None:
         raise
 
     FastAPICache.init(
-        backend=RedisBackend(redis),
-        prefix="cvgen:http:",
+        backend=TaggedRedisBackend(redis),
+        prefix=HTTP_CACHE_PREFIX,
+        coder=cache_codec.CompactCoder,
     )
-    log.info("cache.initialized", backend="redis")
+    await start_l1_invalidation_listener()
+    log.info("cache.initialized", backend="redis", l1=settings.L1_CACHE_ENABLED)
 
 
 async def teardown_cache() -> None:
-    """Libera pools Redis. Llamar en el lifespan shutdown de FastAPI."""
-    await FastAPICache.clear()
-    await _http_cache_pool.aclose()
-    await _service_pool.aclose()
+    """
+    Libera pools Redis. Llamar en el lifespan shutdown de FastAPI.
+    No vacía la caché: Redis es compartido por todos los workers y réplicas.
+    """
+    await stop_l1_invalidation_listener()
+    await redis_pools.close("cache", "http_cache")
     log.info("cache.shutdown")
 
 
@@ -193,13 +742,30 @@ def user_key_builder(
     Clave de caché que incluye el user_id del header X-User-Id.
     Garantiza que cada usuario tenga su propia entrada de caché.
     Usar en todos los endpoints del dominio CV.
+
+    La clave lleva el namespace en claro (`<prefix>:<namespace>:{<user_id>}:<hash>`)
+    para poder medir y agrupar por namespace, y el usuario como hash tag
+    para que sus respuestas y sus tags compartan slot en Redis Cluster.
+
+    Tags: usuario, usuario+namespace y, si la ruta recibe cv_id, el CV.
     """
     prefix   = FastAPICache.get_prefix()
     user_id  = request.headers.get("X-User-Id", "anon") if request else "anon"
     path     = request.url.path if request else ""
     query    = str(sorted(request.query_params.items())) if request else ""
     raw      = f"{namespace}:{user_id}:{path}:{query}"
-    return f"{prefix}:{hashlib.md5(raw.encode()).hexdigest()}"
+    scope    = namespace.removeprefix(f"{prefix}:")
+    key      = (
+        f"{prefix}:{scope or 'user'}:{CacheKeys.slot(user_id)}:"
+        f"{hashlib.md5(raw.encode()).hexdigest()}"
+    )
+
+    tags  = [CacheKeys.tag_user(user_id)]
+    if scope:
+        tags.append(CacheKeys.tag_user(user_id, scope))
+    if kwargs.get("cv_id"):
+        tags.append(CacheKeys.tag_cv(kwargs["cv_id"]))
+    return _register_tags(key, *tags)
 
 
 def cv_detail_key_builder(
@@ -214,7 +780,12 @@ def cv_detail_key_builder(
     prefix  = FastAPICache.get_prefix()
     user_id = request.headers.get("X-User-Id", "anon") if request else "anon"
     cv_id   = kwargs.get("cv_id", "")
-    return f"{prefix}:cv:{user_id}:{cv_id}"
+    return _register_tags(
+        f"{prefix}:cv:{CacheKeys.slot(user_id)}:{cv_id}",
+        CacheKeys.tag_user(user_id),
+        CacheKeys.tag_user(user_id, CacheKeys.NS_CV),
+        CacheKeys.tag_cv(cv_id),
+    )
 
 
 def template_key_builder(
@@ -231,7 +802,109 @@ def template_key_builder(
     """
     prefix = FastAPICache.get_prefix()
     path   = request.url.path if request else ""
-    return f"{prefix}:templates:{hashlib.md5(path.encode()).hexdigest()}"
+    return _register_tags(
+        f"{prefix}:templates:{hashlib.md5(path.encode()).hexdigest()}",
+        CacheKeys.tag_templates(),
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Decorador @cached — @cache + GET condicional
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _param_name(signature: inspect.Signature, annotation: type, default: str) -> str:
+    """Nombre del parámetro Request/Response que usa fastapi-cache en el endpoint."""
+    return next(
+        (p.name for p in signature.parameters.values() if p.annotation is annotation),
+        default,
+    )
+
+
+def cached(
+    expire: int,
+    namespace: str = "",
+    key_builder: KeyBuilder = user_key_builder,
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """
+    Igual que `@cache` de fastapi-cache2, con ETag fuerte y respuestas 304.
+
+      - If-None-Match igual al ETag de la entrada fresca → 304 tras un único
+        GET a Redis, sin ejecutar el handler ni leer el cuerpo cacheado.
+      - En el resto de casos delega en @cache y sustituye su ETag débil
+        (hash() de Python, distinto en cada worker) por el fuerte.
+      - Si el handler falla libera el lock de relleno que ganó esta
+        petición; con `Cache-Control: no-cache` no lo pide ni espera.
+    """
+
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        inner         = cache(expire=expire, namespace=namespace, key_builder=key_builder)(func)
+        signature     = inspect.signature(inner)
+        request_name  = _param_name(signature, Request, "__fastapi_cache_request")
+        response_name = _param_name(signature, Response, "__fastapi_cache_response")
+
+        @wraps(inner)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            request:  Request | None  = kwargs.get(request_name)
+            response: Response | None = kwargs.get(response_name)
+            if_none_match = request.headers.get("if-none-match") if request else None
+
+            if (
+                if_none_match
+                and request is not None
+                and request.method == "GET"
+                and FastAPICache.get_enable()
+            ):
+                builder_kwargs = {
+                    k: v for k, v in kwargs.items() if k not in (request_name, response_name)
+                }
+                key = key_builder(
+                    func,
+                    f"{FastAPICache.get_prefix()}:{namespace}",
+                    request=request,
+                    response=response,
+                    args=args,
+                    kwargs=builder_kwargs,
+                )
+                if inspect.isawaitable(key):
+                    key = await key
+                # Mismo cliente que escribió la marca de frescura
+                backend = FastAPICache.get_backend()
+                redis   = backend.redis if isinstance(backend, RedisBackend) else get_redis_client()
+                async with redis.pipeline(transaction=False) as pipe:
+                    etag, ttl = await (
+                        pipe.get(CacheKeys.fresh_marker(key))
+                        .ttl(CacheKeys.fresh_marker(key))
+                        .execute()
+                    )
+                etag = etag.decode() if etag else None
+                if etag and etag in {t.strip() for t in if_none_match.split(",")}:
+                    cache_metrics.record("http", key, "hit")
+                    return Response(
+                        status_code=304,
+                        headers={"ETag": etag, "Cache-Control": f"max-age={max(ttl, 0)}"},
+                    )
+
+            _response_etag.set(None)
+            _held_fill_lock.set(None)
+            _skip_single_flight.set(
+                request is not None and "no-cache" in request.headers.get("cache-control", "")
+            )
+            try:
+                result = await inner(*args, **kwargs)
+            except Exception:
+                if _held_fill_lock.get() is not None:
+                    backend = FastAPICache.get_backend()
+                    if isinstance(backend, TaggedRedisBackend):
+                        await backend.release_fill_lock()
+                raise
+            current = _response_etag.get()
+            if response is not None and current is not None:
+                response.headers["ETag"] = current[1]
+            return result
+
+        return wrapper
+
+    return decorator
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -246,6 +919,10 @@ class CacheService:
 
     def __init__(self) -> None:
         self._redis = get_redis_client()
+        # Referencias fuertes a las tareas de refresco en segundo plano
+        self._background: set[asyncio.Task[Any]] = set()
+        # user_id → último ZADD de actividad de este proceso
+        self._activity_touched: dict[str, float] = {}
 
     # ── Estado de generación PDF ──────────────────────────────────────────────
 
@@ -263,14 +940,34 @@ class CacheService:
         payload = {"status": status, "cv_id": str(cv_id)}
         if error:
             payload["error"] = error
-        await self._redis.setex(key, CacheKeys.TTL_CV_STATUS, json.dumps(payload))
+        raw = cache_codec.dumps(payload)
+        await self._redis.setex(key, CacheKeys.TTL_CV_STATUS, raw)
+        cache_metrics.record_write("service", key, len(raw))
         log.debug("cache.cv_status.set", cv_id=str(cv_id), status=status)
 
     async def get_cv_status(self, cv_id: str | UUID) -> dict | None:
         """Retorna el estado cacheado del job PDF o None si expiró."""
         key   = CacheKeys.cv_status(cv_id)
         value = await self._redis.get(key)
-        return json.loads(value) if value else None
+        cache_metrics.record("service", key, "hit" if value else "miss")
+        return cache_codec.loads(value) if value else None
+
+    async def get_cv_statuses(self, cv_ids: list[str | UUID]) -> dict[str, dict[str, Any] | None]:
+        """
+        Estado del job PDF de varios CVs con un único MGET.
+
+        Returns:
+            cv_id (str) → estado, o None si no hay job en curso / expiró.
+        """
+        if not cv_ids:
+            return {}
+        keys   = [CacheKeys.cv_status(cv_id) for cv_id in cv_ids]
+        values = await self._redis.mget(keys)
+        result: dict[str, dict[str, Any] | None] = {}
+        for cv_id, key, value in zip(cv_ids, keys, values, strict=True):
+            cache_metrics.record("service", key, "hit" if value else "miss")
+            result[str(cv_id)] = cache_codec.loads(value) if value else None
+        return result
 
     # ── Locks distribuidos ────────────────────────────────────────────────────
 
@@ -297,34 +994,371 @@ class CacheService:
         await self._redis.delete(key)
         log.debug("cache.pdf_lock.released", cv_id=str(cv_id))
 
-    # ── Invalidación granular ─────────────────────────────────────────────────
+    # ── Invalidación granular (índice de tags) ────────────────────────────────
+
+    async def invalidate_user(self, user_id: str | UUID) -> None:
+        """Invalida todas las respuestas cacheadas de un usuario."""
+        await self.invalidate_tags(CacheKeys.tag_user(user_id))
+        log.debug("cache.invalidated.user", user_id=str(user_id))
 
     async def invalidate_user_projects(self, user_id: str | UUID) -> None:
         """Invalida el caché de proyectos de un usuario (tras crear/editar/borrar)."""
-        await self._invalidate_pattern(f"cvgen:http:*project*{user_id}*")
+        await self.invalidate_tags(CacheKeys.tag_user(user_id, CacheKeys.NS_PROJECTS))
         log.debug("cache.invalidated.projects", user_id=str(user_id))
 
     async def invalidate_user_skills(self, user_id: str | UUID) -> None:
         """Invalida el caché de skills de un usuario."""
-        await self._invalidate_pattern(f"cvgen:http:*skill*{user_id}*")
+        await self.invalidate_tags(CacheKeys.tag_user(user_id, CacheKeys.NS_SKILLS))
         log.debug("cache.invalidated.skills", user_id=str(user_id))
 
     async def invalidate_cv(self, cv_id: str | UUID, user_id: str | UUID) -> None:
         """Invalida el caché de un CV concreto y la lista de CVs del usuario."""
-        await self._invalidate_pattern(f"cvgen:http:*cv*{user_id}*")
-        await self._invalidate_pattern(f"cvgen:http:*cv*{cv_id}*")
+        await self.invalidate_tags(
+            CacheKeys.tag_user(user_id, CacheKeys.NS_CV),
+            CacheKeys.tag_cv(cv_id),
+        )
         log.debug("cache.invalidated.cv", cv_id=str(cv_id), user_id=str(user_id))
 
     async def invalidate_templates(self) -> None:
         """Invalida el caché de plantillas (solo admin lo necesita)."""
-        await self._invalidate_pattern("cvgen:http:*templates*")
+        await self.invalidate_tags(CacheKeys.tag_templates())
         log.debug("cache.invalidated.templates")
 
-    async def _invalidate_pattern(self, pattern: str) -> None:
-        """Borra todas las claves que coincidan con el patrón glob."""
-        keys = await self._redis.keys(pattern)
-        if keys:
-            await self._redis.delete(*keys)
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Borra las respuestas asociadas a los tags (con sus marcas de
+        frescura: sin ellas un If-None-Match con el ETag viejo ya no da 304)
+        y los propios sets. Dos round-trips (SMEMBERS + DEL) sea cual sea el
+        tamaño del keyspace.
+
+        Returns:
+            Número de claves de respuesta eliminadas.
+        """
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.smembers(tag)
+            members = await pipe.execute()
+
+        keys = set(_decode_keys(set().union(*members))) if members else set()
+        local_cache.delete(*keys)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            queued = queue_delete(pipe, keys) if keys else 0
+            if keys:
+                queue_delete(pipe, [CacheKeys.fresh_marker(k) for k in keys])
+                pipe.publish(L1_INVALIDATION_CHANNEL, _l1_message(keys))
+            queue_delete(pipe, tags)
+            results = await pipe.execute()
+        return sum(results[:queued])
+
+    # ── Valores JSON genéricos (con L1 según política) ────────────────────────
+
+    async def get_json(self, key: str) -> Any:
+        """
+        Lee un valor JSON. Si la clave admite L1 se sirve desde memoria.
+        Retorna None si no existe; el texto crudo si no es JSON válido.
+        """
+        value = local_cache.get(key)
+        if value is not MISS:
+            cache_metrics.record("service", key, "hit_l1")
+            return value
+
+        async with self._redis.pipeline(transaction=False) as pipe:
+            ttl, raw = await pipe.ttl(key).get(key).execute()
+        cache_metrics.record("service", key, "miss" if raw is None else "hit")
+        if raw is None:
+            return None
+        try:
+            value = cache_codec.loads(raw)
+        except ValueError:
+            log.warning("cache.json.invalid", key=key)
+            value = raw.decode(errors="replace")
+        local_cache.set(key, value, ttl, size=len(raw))
+        return value
+
+    async def get_many(self, keys: list[str]) -> dict[str, Any]:
+        """
+        Lee varios valores JSON en un round-trip (MGET, más TTL de las claves
+        que admiten L1). Las que están en la L1 no llegan a Redis.
+
+        Returns:
+            clave → valor, solo para las claves que existen.
+        """
+        found: dict[str, Any] = {}
+        remote: list[str] = []
+        for key in dict.fromkeys(keys):
+            value = local_cache.get(key)
+            if value is MISS:
+                remote.append(key)
+            else:
+                cache_metrics.record("service", key, "hit_l1")
+                found[key] = value
+        if not remote:
+            return found
+
+        l1_keys = [k for k in remote if local_cache.ttl_for(k) is not None]
+        async with self._redis.pipeline(transaction=False) as pipe:
+            if redis_pools.clustered:
+                # En cluster MGET exige un solo slot: un GET por clave, que
+                # el pipeline agrupa por nodo
+                for key in remote:
+                    pipe.get(key)
+            else:
+                pipe.mget(remote)
+            for key in l1_keys:
+                pipe.ttl(key)
+            results = await pipe.execute()
+        if redis_pools.clustered:
+            raws, ttls = results[: len(remote)], results[len(remote) :]
+        else:
+            raws, *ttls = results
+        remote_ttls = dict(zip(l1_keys, ttls, strict=True))
+
+        for key, raw in zip(remote, raws, strict=True):
+            cache_metrics.record("service", key, "miss" if raw is None else "hit")
+            if raw is None:
+                continue
+            try:
+                value = cache_codec.loads(raw)
+            except ValueError:
+                log.warning("cache.json.invalid", key=key)
+                value = raw.decode(errors="replace")
+            found[key] = value
+            if key in remote_ttls:
+                local_cache.set(key, value, remote_ttls[key], size=len(raw))
+        return found
+
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        version_key: str | None = None,
+    ) -> Any:
+        """
+        Lee un valor JSON con protección contra estampidas.
+
+          - Fresco  → se retorna tal cual.
+          - Stale   → se retorna el valor anterior y un único proceso lo
+                      recalcula en una tarea de fondo.
+          - Ausente → solo el ganador del lock llama a `loader`; el resto
+                      espera su resultado (o lo calcula si se agota el plazo).
+
+        `loader` debe abrir sus propios recursos (sesión de BD…): la tarea de
+        fondo puede terminar después de que la petición original haya acabado.
+
+        `version_key`: contador que los escritores incrementan tras cambiar la
+        fuente. El valor cargado solo se guarda si el contador sigue igual que
+        antes de llamar a `loader` (comprobación atómica en Lua), así que un
+        relleno que leyó datos anteriores a un cambio no los deja en caché.
+        En Redis Cluster debe compartir hash tag con `key`.
+        """
+        value = local_cache.get(key)
+        if value is not MISS:
+            cache_metrics.record("service", key, "hit_l1")
+            return value
+
+        fresh_ttl, raw = await _read_swr(self._redis, key)
+        if raw is None:
+            token = await _acquire_fill_lock(self._redis, key)
+            if token is None:
+                fresh_ttl, raw = await _wait_for_fill(self._redis, key)
+            if raw is None:
+                cache_metrics.record("service", key, "miss")
+                return await self._fill(key, loader, ttl, token, version_key)
+        elif fresh_ttl <= 0:
+            cache_metrics.record("service", key, "stale")
+            token = await _acquire_fill_lock(self._redis, key)
+            if token is not None:
+                task = asyncio.create_task(
+                    self._fill(key, loader, ttl, token, version_key)
+                )
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+            return cache_codec.loads(raw)
+
+        cache_metrics.record("service", key, "hit")
+        value = cache_codec.loads(raw)
+        if fresh_ttl > 0:
+            local_cache.set(key, value, fresh_ttl, size=len(raw))
+        return value
+
+    async def _fill(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int,
+        lock_token: str | None,
+        version_key: str | None = None,
+    ) -> Any:
+        started = time.monotonic()
+        try:
+            version = await self._redis.get(version_key) if version_key else None
+            value   = await loader()
+        except Exception:
+            if lock_token:
+                await self._redis.eval(
+                    RELEASE_LOCK_LUA, 1, CacheKeys.fill_lock(key), lock_token
+                )
+            log.exception("cache.fill.failed", key=key)
+            raise
+        cache_metrics.record_fill("service", key, time.monotonic() - started)
+        raw = cache_codec.dumps(value)
+        cache_metrics.record_write("service", key, len(raw))
+        if version_key and not await self._store_if_version(
+            version_key, version, key, raw, ttl, lock_token
+        ):
+            log.info("cache.fill.version_changed", key=key)
+            return value
+        async with self._redis.pipeline(transaction=False) as pipe:
+            if not version_key:
+                _queue_swr_write(pipe, key, raw, ttl, lock_token)
+            if local_cache.ttl_for(key) is not None:
+                pipe.publish(L1_INVALIDATION_CHANNEL, _l1_message([key]))
+            await pipe.execute()
+        local_cache.set(key, value, ttl, size=len(raw))
+        return value
+
+    async def _store_if_version(
+        self,
+        version_key: str,
+        version: str | bytes | None,
+        key: str,
+        raw: str | bytes,
+        ttl: int,
+        lock_token: str | None,
+    ) -> bool:
+        """Escritura SWR condicionada a que `version_key` siga valiendo `version`."""
+        stored = await self._redis.eval(
+            _STORE_IF_VERSION_LUA,
+            4,
+            version_key,
+            key,
+            CacheKeys.fresh_marker(key),
+            CacheKeys.fill_lock(key),
+            version or "",
+            raw,
+            ttl + CacheKeys.swr_grace(ttl),
+            _etag_for(raw),
+            ttl,
+            lock_token or "",
+        )
+        return bool(stored)
+
+    async def set_json(self, key: str, value: Any, ttl: int) -> None:
+        """Guarda un valor JSON y avisa al resto de procesos para que lo relean."""
+        raw = cache_codec.dumps(value)
+        cache_metrics.record_write("service", key, len(raw))
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.set(key, raw, ex=ttl)
+            if local_cache.ttl_for(key) is not None:
+                pipe.publish(L1_INVALIDATION_CHANNEL, _l1_message([key]))
+            await pipe.execute()
+        local_cache.set(key, value, ttl, size=len(raw))
+
+    async def set_many(self, values: dict[str, Any], ttl: int | dict[str, int]) -> None:
+        """
+        Guarda varios valores JSON en un solo pipeline.
+
+        Args:
+            values: clave → valor.
+            ttl:    TTL común o clave → TTL (cada clave debe tener el suyo).
+        """
+        if not values:
+            return
+        encoded = {key: cache_codec.dumps(value) for key, value in values.items()}
+        ttls    = ttl if isinstance(ttl, dict) else dict.fromkeys(values, ttl)
+        l1_keys = [key for key in values if local_cache.ttl_for(key) is not None]
+
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for key, raw in encoded.items():
+                pipe.set(key, raw, ex=ttls[key])
+                cache_metrics.record_write("service", key, len(raw))
+            if l1_keys:
+                pipe.publish(L1_INVALIDATION_CHANNEL, _l1_message(l1_keys))
+            await pipe.execute()
+        for key in l1_keys:
+            local_cache.set(key, values[key], ttls[key], size=len(encoded[key]))
+
+    async def delete(self, *keys: str) -> int:
+        """
+        Borra claves en Redis (con sus marcas de frescura) y en la L1 de
+        todos los procesos.
+        """
+        if not keys:
+            return 0
+        local_cache.delete(*keys)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            queued = queue_delete(pipe, keys)
+            queue_delete(pipe, [CacheKeys.fresh_marker(k) for k in keys])
+            if any(local_cache.ttl_for(k) is not None for k in keys):
+                pipe.publish(L1_INVALIDATION_CHANNEL, _l1_message(keys))
+            results = await pipe.execute()
+        return sum(results[:queued])
+
+    # ── Actividad de usuarios (para el precalentamiento) ──────────────────────
+
+    async def mark_user_active(self, user_id: str | UUID) -> None:
+        """
+        Registra el acceso de un usuario en el ZSET de actividad.
+        Limitado a un ZADD por usuario y ACTIVE_USERS_TOUCH_INTERVAL por proceso.
+        """
+        user_id = str(user_id)
+        now     = time.time()
+        last    = self._activity_touched.get(user_id)
+        if last is not None and now - last < CacheKeys.ACTIVE_USERS_TOUCH_INTERVAL:
+            return
+        if len(self._activity_touched) >= CacheKeys.ACTIVE_USERS_MAX:
+            self._activity_touched.clear()
+        self._activity_touched[user_id] = now
+
+        key = CacheKeys.active_users()
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.zadd(key, {user_id: now})
+            pipe.zremrangebyrank(key, 0, -CacheKeys.ACTIVE_USERS_MAX - 1)
+            await pipe.execute()
+
+    async def recent_users(self, limit: int) -> list[str]:
+        """Los `limit` usuarios con acceso más reciente."""
+        if limit <= 0:
+            return []
+        members = await self._redis.zrevrange(CacheKeys.active_users(), 0, limit - 1)
+        return _decode_keys(members)
+
+    # ── Índice de expiración de PDFs ──────────────────────────────────────────
+
+    async def schedule_pdf_expiry(self, cv_id: str | UUID, expires_at: float) -> None:
+        """Registra (o retrasa) el momento en que caduca el PDF de un CV."""
+        await self._redis.zadd(CacheKeys.pdf_expiry_index(), {str(cv_id): expires_at})
+
+    async def requeue_pdf_expiry(self, entries: dict[str, float]) -> None:
+        """
+        Devuelve al índice entradas sacadas por pop_expired_pdfs (ZADD GT):
+        si el PDF se volvió a subir entretanto, su nueva expiración, más
+        tardía, no se pisa con la antigua.
+        """
+        if entries:
+            await self._redis.zadd(CacheKeys.pdf_expiry_index(), entries, gt=True)
+
+    async def scheduled_pdfs(self, cv_ids: list[str]) -> set[str]:
+        """CVs de `cv_ids` que vuelven a estar en el índice (un ZMSCORE)."""
+        if not cv_ids:
+            return set()
+        scores = await self._redis.zmscore(CacheKeys.pdf_expiry_index(), cv_ids)
+        return {cv_id for cv_id, score in zip(cv_ids, scores, strict=True) if score is not None}
+
+    async def pop_expired_pdfs(self, now: float, limit: int) -> dict[str, float]:
+        """
+        Saca del índice como mucho `limit` CVs cuyo PDF caducó antes de `now`.
+        Coste proporcional a las entradas vencidas, no al total del índice.
+
+        Returns:
+            cv_id → expires_at, de los más antiguos a los más recientes.
+        """
+        due = await self._redis.eval(
+            _POP_DUE_LUA, 1, CacheKeys.pdf_expiry_index(), now, limit
+        )
+        members = _decode_keys(due[0::2])
+        return {cv_id: float(score) for cv_id, score in zip(members, due[1::2], strict=True)}
 
     # ── Health ────────────────────────────────────────────────────────────────
 
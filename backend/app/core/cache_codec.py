@@ -0,0 +1,141 @@
+"""
+app/core/cache_codec.py
+
+Codec binario de los valores cacheados en Redis.
+
+Formato:
+    b"\\xca" + <id de codec (1 byte)> + <payload>
+
+    id 1 — orjson sin comprimir
+    id 2 — orjson + zlib
+    id 3 — orjson + zstd
+
+Los valores se comprimen solo por encima de CACHE_COMPRESSION_THRESHOLD
+bytes: por debajo la compresión no compensa la CPU.
+
+La cabecera permite cambiar de codec sin vaciar Redis: el lector entiende
+todos los ids conocidos y también el JSON plano que se guardaba antes
+(0xCA nunca es el primer byte de un texto JSON en UTF-8). Para añadir un
+codec nuevo se despliega primero el lector y después se cambia el escritor
+con CACHE_COMPRESSION.
+
+zstd requiere el paquete `zstandard`; si no está instalado se usa zlib.
+
+Uso:
+    from app.core import cache_codec
+
+    data  = cache_codec.dumps({"status": "ready"})
+    value = cache_codec.loads(data)
+"""
+from __future__ import annotations
+
+import zlib
+from typing import Any
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi_cache.coder import Coder
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depende del entorno
+    zstandard = None  # type: ignore[assignment]
+
+log = get_logger(__name__)
+
+MAGIC = 0xCA
+
+CODEC_JSON      = 1
+CODEC_JSON_ZLIB = 2
+CODEC_JSON_ZSTD = 3
+
+_ZLIB_LEVEL = 6
+_ZSTD_LEVEL = 3
+
+_zstd_compressor   = zstandard.ZstdCompressor(level=_ZSTD_LEVEL) if zstandard else None
+_zstd_decompressor = zstandard.ZstdDecompressor() if zstandard else None
+
+
+def _writer_codec() -> int:
+    """Codec de compresión configurado para escribir."""
+    if settings.CACHE_COMPRESSION == "zstd":
+        if _zstd_compressor is not None:
+            return CODEC_JSON_ZSTD
+        log.warning("cache.codec.zstd_unavailable", fallback="zlib")
+        return CODEC_JSON_ZLIB
+    if settings.CACHE_COMPRESSION == "zlib":
+        return CODEC_JSON_ZLIB
+    return CODEC_JSON
+
+
+_COMPRESSED_CODEC = _writer_codec()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Empaquetado de JSON ya serializado
+# ─────────────────────────────────────────────────────────────────────────────
+
+def pack(raw_json: bytes) -> bytes:
+    """Añade cabecera y comprime si el JSON supera el umbral."""
+    codec = CODEC_JSON
+    if len(raw_json) >= settings.CACHE_COMPRESSION_THRESHOLD:
+        codec = _COMPRESSED_CODEC
+    if codec == CODEC_JSON_ZSTD and _zstd_compressor is not None:
+        payload = _zstd_compressor.compress(raw_json)
+    elif codec == CODEC_JSON_ZLIB:
+        payload = zlib.compress(raw_json, _ZLIB_LEVEL)
+    else:
+        payload = raw_json
+    return bytes((MAGIC, codec)) + payload
+
+
+def unpack(data: bytes | str) -> bytes:
+    """JSON serializado a partir de un valor con o sin cabecera."""
+    if isinstance(data, str):
+        return data.encode()
+    if len(data) < 2 or data[0] != MAGIC:
+        return data  # JSON plano (formato anterior)
+
+    codec, payload = data[1], data[2:]
+    if codec == CODEC_JSON:
+        return payload
+    if codec == CODEC_JSON_ZLIB:
+        return zlib.decompress(payload)
+    if codec == CODEC_JSON_ZSTD:
+        if _zstd_decompressor is None:
+            raise RuntimeError("Valor comprimido con zstd y 'zstandard' no está instalado")
+        return _zstd_decompressor.decompress(payload)
+    raise ValueError(f"Codec de caché desconocido: {codec}")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Valores Python
+# ─────────────────────────────────────────────────────────────────────────────
+
+def dumps(value: Any) -> bytes:
+    return pack(orjson.dumps(value))
+
+
+def loads(data: bytes | str) -> Any:
+    return orjson.loads(unpack(data))
+
+
+class CompactCoder(Coder):
+    """
+    Coder de fastapi-cache2 con el formato de este módulo.
+    Sustituye a JsonCoder: orjson en vez de json y compresión por umbral.
+    """
+
+    @classmethod
+    def encode(cls, value: Any) -> bytes:
+        if isinstance(value, JSONResponse):
+            return pack(bytes(value.body))
+        return pack(orjson.dumps(jsonable_encoder(value)))
+
+    @classmethod
+    def decode(cls, value: bytes | str) -> Any:
+        return loads(value)
@@ -0,0 +1,196 @@
+"""
+app/core/cache_invalidation.py
+
+Invalidación de caché diferida y agrupada, con read-your-writes.
+
+Una escritura no espera a la invalidación (SCAN por patrón o tags): solo
+la registra y responde. El trabajo se hace en segundo plano, tras una
+ventana corta (CACHE_INVALIDATION_COALESCE_MS) en la que se agrupan los
+patrones y tags repetidos de una ráfaga de ediciones: cada uno se procesa
+una sola vez.
+
+Registro pendiente por ámbito (usuario del X-User-Id, o `global`):
+    cache_pending:zset:<ámbito>   ZSET con "p:<patrón>" / "t:<tag>"; el score
+                                  cuenta las veces que se registró la entrada
+
+El registro vive en Redis, no solo en memoria, para que la garantía valga
+entre workers y réplicas: antes de servir una lectura afectada, el proceso
+que la atiende mira los pendientes de su ámbito (un SMEMBERS) y, si hay,
+los ejecuta él mismo antes de continuar. Las invalidaciones son
+idempotentes, así que si dos procesos hacen la misma no pasa nada. Cada
+entrada se retira solo después de ejecutarla, de modo que nadie puede ver
+el registro vacío con una invalidación a medias; y solo si su score no
+cambió desde que se leyó: una escritura registrada durante la ejecución
+(que pudo empezar su SCAN antes de esa escritura) la deja pendiente para
+otra pasada. Si una invalidación falla, su entrada tampoco se retira.
+
+Uso:
+    from app.core.cache_invalidation import deferred_invalidation
+
+    # tras una escritura correcta
+    await deferred_invalidation.enqueue(user_id, patterns=["cvgen:http:*cv*"])
+
+    # antes de una lectura afectada
+    await deferred_invalidation.settle(user_id, GLOBAL_SCOPE)
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+
+from app.core.cache import CacheKeys, cache_service
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.redis import redis_client
+from app.utils.cache import invalidate_cache_pattern
+
+log = get_logger(__name__)
+
+GLOBAL_SCOPE = "global"
+
+_PATTERN = "p:"
+_TAG     = "t:"
+
+# Retira las entradas ejecutadas cuyo score no cambió desde que se leyeron
+# (ARGV: entrada, score, entrada, score…). Una sola clave: vale en Cluster.
+_REMOVE_SETTLED_LUA = """
+local removed = 0
+for i = 1, #ARGV, 2 do
+    local score = redis.call('ZSCORE', KEYS[1], ARGV[i])
+    if score and tonumber(score) <= tonumber(ARGV[i + 1]) then
+        removed = removed + redis.call('ZREM', KEYS[1], ARGV[i])
+    end
+end
+return removed
+"""
+
+
+class DeferredInvalidation:
+    """Cola de invalidaciones del proceso, respaldada por un ZSET por ámbito."""
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._scopes: set[str] = set()
+        self._drain_task: asyncio.Task[None] | None = None
+        # Una sola ejecución por ámbito a la vez dentro del proceso
+        self._settling: dict[str, asyncio.Task[int]] = {}
+
+    async def enqueue(
+        self,
+        scope: str | None,
+        patterns: Iterable[str] = (),
+        tags: Iterable[str] = (),
+    ) -> None:
+        """
+        Registra una invalidación (un round-trip) y programa su ejecución.
+        Las entradas repetidas se agrupan en el ZSET (suben su score).
+        """
+        scope = scope or GLOBAL_SCOPE
+        items = [f"{_PATTERN}{p}" for p in patterns] + [f"{_TAG}{t}" for t in tags]
+        if not items:
+            return
+        key = CacheKeys.invalidation_pending(scope)
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for item in items:
+                pipe.zincrby(key, 1, item)
+            pipe.expire(key, CacheKeys.TTL_PENDING_INVAL)
+            await pipe.execute()
+
+        self._scopes.add(scope)
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.create_task(self._drain_later())
+
+    async def settle(self, *scopes: str | None) -> int:
+        """
+        Ejecuta lo pendiente de los ámbitos indicados antes de una lectura.
+        Un round-trip si no hay nada pendiente. Retorna entradas ejecutadas.
+
+        Raises:
+            RedisError: si falla una invalidación; lo que no se ejecutó sigue
+                pendiente.
+        """
+        wanted = tuple(dict.fromkeys(s for s in scopes if s))
+        if not wanted:
+            return 0
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for scope in wanted:
+                pipe.zrange(CacheKeys.invalidation_pending(scope), 0, -1, withscores=True)
+            pending = await pipe.execute()
+
+        done = 0
+        for scope, items in zip(wanted, pending, strict=True):
+            if items:
+                done += await self._settle_scope(scope, dict(items))
+        return done
+
+    async def flush(self) -> None:
+        """Ejecuta ya todo lo pendiente del proceso (apagado, tests)."""
+        if self._drain_task is not None and not self._drain_task.done():
+            self._drain_task.cancel()
+            try:
+                await self._drain_task
+            except asyncio.CancelledError:
+                pass
+        self._drain_task = None
+        await self._drain()
+
+    # ── Internos ──────────────────────────────────────────────────────────────
+
+    async def _drain_later(self) -> None:
+        await asyncio.sleep(self.window)
+        await self._drain()
+
+    async def _drain(self) -> None:
+        scopes, self._scopes = self._scopes, set()
+        if not scopes:
+            return
+        try:
+            done = await self.settle(*scopes)
+            log.info("cache.invalidation.drained", scopes=len(scopes), items=done)
+        except Exception as exc:
+            # Lo pendiente sigue en Redis: lo ejecutará la siguiente lectura
+            log.warning("cache.invalidation.drain_failed", error=str(exc))
+
+    async def _settle_scope(self, scope: str, items: dict[str, float]) -> int:
+        running = self._settling.get(scope)
+        if running is not None and not running.done():
+            await asyncio.shield(running)
+            # Pudieron llegar entradas nuevas mientras tanto
+            return await self.settle(scope)
+
+        task = asyncio.create_task(self._execute(scope, items))
+        self._settling[scope] = task
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if self._settling.get(scope) is task:
+                del self._settling[scope]
+
+    @staticmethod
+    async def _execute(scope: str, items: dict[str, float]) -> int:
+        """
+        Ejecuta las entradas leídas (entrada → score) y retira las hechas.
+        Si una falla, retira las anteriores y relanza el error.
+        """
+        patterns = sorted(i for i in items if i.startswith(_PATTERN))
+        tags     = sorted(i for i in items if i.startswith(_TAG))
+        done: list[str] = []
+        try:
+            for item in patterns:
+                await invalidate_cache_pattern(redis_client, item.removeprefix(_PATTERN))
+                done.append(item)
+            if tags:
+                await cache_service.invalidate_tags(*(t.removeprefix(_TAG) for t in tags))
+                done.extend(tags)
+        finally:
+            if done:
+                args = [v for item in done for v in (item, items[item])]
+                await redis_client.eval(
+                    _REMOVE_SETTLED_LUA, 1, CacheKeys.invalidation_pending(scope), *args
+                )
+        return len(done)
+
+
+deferred_invalidation = DeferredInvalidation(
+    window=settings.CACHE_INVALIDATION_COALESCE_MS / 1000,
+)
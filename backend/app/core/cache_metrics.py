@@ -0,0 +1,213 @@
+"""
+app/core/cache_metrics.py
+
+Métricas de caché por capa y namespace, en memoria del proceso.
+
+Capas:
+    http     — respuestas de endpoints (@cache / @cached, TaggedRedisBackend)
+    service  — CacheService (get_json, get_or_set, estado PDF…)
+
+Por cada (capa, namespace) se cuentan:
+    hits_l1   servidos desde la L1 en proceso
+    hits      servidos desde Redis con el valor fresco
+    stale     servidos caducados mientras otro proceso recalcula
+    misses    sin valor: el handler / loader tuvo que calcularlo
+    fills     rellenos completados, con su latencia (suma y máximo)
+    writes    escrituras y tamaño de los valores escritos (ya codificados)
+
+El namespace sale de la propia clave:
+    cvgen:http::project:<hash>   → project
+    cv_status:<cv_id>            → cv_status
+
+Los contadores son por proceso (cada worker de gunicorn tiene los suyos):
+Prometheus los agrega por instancia, y /utils/status muestra los del worker
+que atiende la petición.
+
+Uso:
+    from app.core.cache_metrics import cache_metrics
+
+    cache_metrics.record("service", key, "hit")
+    cache_metrics.record_fill("service", key, seconds=0.012)
+    cache_metrics.record_write("service", key, size=512)
+    text = cache_metrics.render_prometheus()
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Final, Literal
+
+CacheLayer   = Literal["http", "service"]
+CacheOutcome = Literal["hit_l1", "hit", "stale", "miss"]
+
+# HTTP_CACHE_PREFIX de app/core/cache.py + el separador que añade fastapi-cache
+_HTTP_PREFIX: Final = "cvgen:http::"
+_UNKNOWN_NS:  Final = "other"
+
+
+def namespace_of(key: str) -> str:
+    """Namespace de una clave de caché (primer segmento tras el prefijo HTTP)."""
+    key = key.removeprefix(_HTTP_PREFIX)
+    head, sep, _ = key.partition(":")
+    return head if sep and head else _UNKNOWN_NS
+
+
+@dataclass
+class NamespaceStats:
+    hits_l1:       int   = 0
+    hits:          int   = 0
+    stale:         int   = 0
+    misses:        int   = 0
+    fills:         int   = 0
+    fill_seconds:  float = 0.0
+    fill_max:      float = 0.0
+    writes:        int   = 0
+    bytes_written: int   = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits_l1 + self.hits + self.stale + self.misses
+
+    @property
+    def hit_ratio(self) -> float | None:
+        lookups = self.lookups
+        return round((lookups - self.misses) / lookups, 4) if lookups else None
+
+    @property
+    def avg_fill_ms(self) -> float | None:
+        return round(self.fill_seconds / self.fills * 1000, 2) if self.fills else None
+
+    @property
+    def avg_payload_bytes(self) -> int | None:
+        return self.bytes_written // self.writes if self.writes else None
+
+
+class CacheMetrics:
+    """Contadores por (capa, namespace), seguros entre hilos."""
+
+    def __init__(self) -> None:
+        self._stats: dict[tuple[str, str], NamespaceStats] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, layer: str, key: str) -> NamespaceStats:
+        ident = (layer, namespace_of(key))
+        stats = self._stats.get(ident)
+        if stats is None:
+            stats = self._stats.setdefault(ident, NamespaceStats())
+        return stats
+
+    # ── Registro ──────────────────────────────────────────────────────────────
+
+    def record(self, layer: CacheLayer, key: str, outcome: CacheOutcome) -> None:
+        with self._lock:
+            stats = self._get(layer, key)
+            if outcome == "hit_l1":
+                stats.hits_l1 += 1
+            elif outcome == "hit":
+                stats.hits += 1
+            elif outcome == "stale":
+                stats.stale += 1
+            else:
+                stats.misses += 1
+
+    def record_fill(self, layer: CacheLayer, key: str, seconds: float) -> None:
+        """Relleno completado: tiempo desde el miss hasta tener el valor."""
+        with self._lock:
+            stats = self._get(layer, key)
+            stats.fills        += 1
+            stats.fill_seconds += seconds
+            stats.fill_max      = max(stats.fill_max, seconds)
+
+    def record_write(self, layer: CacheLayer, key: str, size: int) -> None:
+        """Valor guardado en Redis, con su tamaño codificado en bytes."""
+        with self._lock:
+            stats = self._get(layer, key)
+            stats.writes        += 1
+            stats.bytes_written += size
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    # ── Lectura ───────────────────────────────────────────────────────────────
+
+    def snapshot(self) -> dict[tuple[str, str], NamespaceStats]:
+        """Copia de los contadores: (capa, namespace) → NamespaceStats."""
+        with self._lock:
+            return {
+                ident: NamespaceStats(**vars(stats)) for ident, stats in sorted(self._stats.items())
+            }
+
+    def summary(self) -> list[dict[str, Any]]:
+        """Resumen legible por namespace (para el endpoint de estado)."""
+        return [
+            {
+                "layer":             layer,
+                "namespace":         namespace,
+                "lookups":           stats.lookups,
+                "hits_l1":           stats.hits_l1,
+                "hits":              stats.hits,
+                "stale":             stats.stale,
+                "misses":            stats.misses,
+                "hit_ratio":         stats.hit_ratio,
+                "avg_fill_ms":       stats.avg_fill_ms,
+                "max_fill_ms":       round(stats.fill_max * 1000, 2) if stats.fills else None,
+                "avg_payload_bytes": stats.avg_payload_bytes,
+            }
+            for (layer, namespace), stats in self.snapshot().items()
+        ]
+
+    def render_prometheus(self, l1_entries: int = 0, l1_bytes: int = 0) -> str:
+        """Exposición en formato de texto de Prometheus (versión 0.0.4)."""
+        snapshot = self.snapshot()
+        lines: list[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        family("cache_requests_total", "counter", "Lecturas de caché por resultado.")
+        for (layer, ns), stats in snapshot.items():
+            for result, value in (
+                ("hit_l1", stats.hits_l1),
+                ("hit",    stats.hits),
+                ("stale",  stats.stale),
+                ("miss",   stats.misses),
+            ):
+                lines.append(
+                    f'cache_requests_total{{layer="{layer}",namespace="{ns}",result="{result}"}} {value}'
+                )
+
+        family("cache_fill_seconds", "summary", "Tiempo de cálculo de los valores cacheados.")
+        for (layer, ns), stats in snapshot.items():
+            labels = f'layer="{layer}",namespace="{ns}"'
+            lines.append(f"cache_fill_seconds_count{{{labels}}} {stats.fills}")
+            lines.append(f"cache_fill_seconds_sum{{{labels}}} {stats.fill_seconds:.6f}")
+
+        family("cache_fill_seconds_max", "gauge", "Relleno más lento desde el arranque.")
+        for (layer, ns), stats in snapshot.items():
+            lines.append(
+                f'cache_fill_seconds_max{{layer="{layer}",namespace="{ns}"}} {stats.fill_max:.6f}'
+            )
+
+        family("cache_writes_total", "counter", "Valores escritos en caché.")
+        for (layer, ns), stats in snapshot.items():
+            lines.append(
+                f'cache_writes_total{{layer="{layer}",namespace="{ns}"}} {stats.writes}'
+            )
+
+        family("cache_payload_bytes_total", "counter", "Bytes escritos en caché (codificados).")
+        for (layer, ns), stats in snapshot.items():
+            lines.append(
+                f'cache_payload_bytes_total{{layer="{layer}",namespace="{ns}"}} {stats.bytes_written}'
+            )
+
+        family("cache_l1_entries", "gauge", "Entradas en la caché L1 del proceso.")
+        lines.append(f"cache_l1_entries {l1_entries}")
+        family("cache_l1_bytes", "gauge", "Bytes estimados en la caché L1 del proceso.")
+        lines.append(f"cache_l1_bytes {l1_bytes}")
+        return "\n".join(lines) + "\n"
+
+
+# ── Singleton ─────────────────────────────────────────────────────────────────
+cache_metrics = CacheMetrics()
@@ -0,0 +1,185 @@
+"""
+app/core/cache_warmup.py
+
+Precalentamiento de caché tras un arranque o despliegue.
+
+Qué se calienta:
+  - App settings: snapshot de toda la tabla `app_settings` (una consulta).
+  - Rutas GET globales (settings.CACHE_WARMUP_PATHS; por defecto el manifest
+    de /reference, que sirve el catálogo de plantillas y las opciones de
+    enums). Se piden a la propia app por ASGI, sin red, así que pasan por su
+    handler, su key builder y su @cached como una petición real.
+  - Rutas GET por usuario (settings.CACHE_WARMUP_USER_PATHS) para los
+    CACHE_WARMUP_RECENT_USERS usuarios con actividad más reciente (ZSET que
+    mantiene CacheService.mark_user_active desde get_user_id).
+
+Todas las peticiones comparten un semáforo de CACHE_WARMUP_CONCURRENCY: como
+mucho esas consultas a Postgres a la vez, haya los workers que haya.
+
+Solo un proceso calienta a la vez: el que gana el lock `lock:cache_warmup`
+(TTL CacheKeys.TTL_WARMUP_LOCK, se libera al terminar). Los workers de
+gunicorn y réplicas que arrancan mientras tanto lo omiten.
+
+Las peticiones llevan el header X-Cache-Warmup con un secreto del proceso
+(is_warmup_request): no cuentan como actividad del usuario ni consumen
+sus límites de rate limiting.
+
+Uso:
+    # lifespan de FastAPI (en segundo plano, no retrasa el arranque)
+    start_cache_warmup(app)
+
+    # tras un despliegue, desde Celery
+    celery -A app.core.celery.celery_app call app.tasks.maintenance.warm_cache
+"""
+from __future__ import annotations
+
+import asyncio
+import secrets
+import time
+from typing import Any
+
+import httpx
+from fastapi import FastAPI
+from starlette.types import Scope
+
+from app.core.cache import RELEASE_LOCK_LUA, CacheKeys, cache_service, get_redis_client
+from app.core.config import settings
+from app.core.logging import get_logger
+
+log = get_logger(__name__)
+
+_warmup_task: asyncio.Task[Any] | None = None
+
+# Marca de las peticiones del precalentamiento. El valor es un secreto de
+# este proceso (las peticiones no salen de él), así que un cliente no puede
+# enviar el header para saltarse el rate limiting.
+WARMUP_HEADER = "X-Cache-Warmup"
+_WARMUP_TOKEN = secrets.token_urlsafe(16).encode()
+
+
+def is_warmup_request(scope: Scope) -> bool:
+    """True si la petición la hace el precalentamiento (warm_paths)."""
+    for key, value in scope.get("headers", ()):
+        if key == b"x-cache-warmup":
+            return secrets.compare_digest(value, _WARMUP_TOKEN)
+    return False
+
+
+async def warm_app_settings(semaphore: asyncio.Semaphore) -> int:
+    """Carga el snapshot de app settings (una consulta) y lo deja en caché."""
+    from app.services.settings import load_settings_snapshot
+
+    async with semaphore:
+        snapshot = await load_settings_snapshot()
+    return len(snapshot)
+
+
+async def warm_paths(
+    app: FastAPI,
+    paths: list[str],
+    semaphore: asyncio.Semaphore,
+    user_ids: list[str] | None = None,
+) -> int:
+    """
+    Pide cada ruta a la app (una vez por usuario si se indican) para que
+    @cached guarde la respuesta. Retorna el número de respuestas 2xx.
+    """
+    identities: list[str | None] = list(user_ids) if user_ids else [None]
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://cache-warmup") as client:
+
+        async def fetch(path: str, user_id: str | None) -> bool:
+            headers = {WARMUP_HEADER: _WARMUP_TOKEN.decode()}
+            if user_id:
+                headers["X-User-Id"] = user_id
+            async with semaphore:
+                try:
+                    response = await client.get(path, headers=headers)
+                except Exception as exc:
+                    log.warning("cache.warmup.request_failed", path=path, error=str(exc))
+                    return False
+            if response.status_code >= 300:
+                log.warning("cache.warmup.bad_status", path=path, status=response.status_code)
+                return False
+            return True
+
+        results = await asyncio.gather(
+            *(fetch(path, user_id) for path in paths for user_id in identities)
+        )
+    return sum(results)
+
+
+async def warm_cache(app: FastAPI, include_users: bool = True) -> dict[str, int] | None:
+    """
+    Ejecuta el precalentamiento completo si este proceso gana el lock.
+    Retorna un resumen por grupo, o None si otro proceso ya lo está haciendo.
+    """
+    redis    = get_redis_client()
+    token    = secrets.token_hex(8)
+    acquired = await redis.set(
+        CacheKeys.warmup_lock(), token, nx=True, ex=CacheKeys.TTL_WARMUP_LOCK
+    )
+    if not acquired:
+        log.info("cache.warmup.skipped", reason="already_running")
+        return None
+    try:
+        return await _warm_all(app, include_users)
+    finally:
+        await redis.eval(RELEASE_LOCK_LUA, 1, CacheKeys.warmup_lock(), token)
+
+
+async def _warm_all(app: FastAPI, include_users: bool) -> dict[str, int]:
+    started   = time.monotonic()
+    semaphore = asyncio.Semaphore(settings.CACHE_WARMUP_CONCURRENCY)
+    summary: dict[str, int] = {}
+
+    try:
+        summary["app_settings"] = await warm_app_settings(semaphore)
+    except Exception as exc:
+        log.warning("cache.warmup.app_settings_failed", error=str(exc))
+
+    if settings.CACHE_WARMUP_PATHS:
+        summary["global_paths"] = await warm_paths(app, settings.CACHE_WARMUP_PATHS, semaphore)
+
+    if include_users and settings.CACHE_WARMUP_USER_PATHS and settings.CACHE_WARMUP_RECENT_USERS:
+        users = await cache_service.recent_users(settings.CACHE_WARMUP_RECENT_USERS)
+        summary["users"] = len(users)
+        if users:
+            summary["user_paths"] = await warm_paths(
+                app, settings.CACHE_WARMUP_USER_PATHS, semaphore, user_ids=users
+            )
+
+    log.info(
+        "cache.warmup.finished",
+        duration_ms=round((time.monotonic() - started) * 1000, 1),
+        **summary,
+    )
+    return summary
+
+
+def start_cache_warmup(app: FastAPI) -> None:
+    """Lanza el precalentamiento en segundo plano (lifespan de FastAPI)."""
+    global _warmup_task
+    if not settings.CACHE_WARMUP_ON_STARTUP or _warmup_task is not None:
+        return
+
+    async def run() -> None:
+        try:
+            await warm_cache(app)
+        except Exception as exc:
+            log.warning("cache.warmup.failed", error=str(exc))
+
+    _warmup_task = asyncio.create_task(run())
+
+
+async def stop_cache_warmup() -> None:
+    """Cancela el precalentamiento si sigue en curso al apagar."""
+    global _warmup_task
+    if _warmup_task is not None:
+        _warmup_task.cancel()
+        try:
+            await _warmup_task
+        except asyncio.CancelledError:
+            pass
+        _warmup_task = None
@@ -39,6 +39,7 @@ celery_app = Celery(
     include=[
         "app.tasks.pdf",
         "app.tasks.cleanup",
+        "app.tasks.maintenance",
     ],
 )
 
@@ -64,6 +65,8 @@ celery_app.conf.update(
     # ── Broker / Backend ──────────────────────────────────────────────────────
     broker_url=settings.REDIS_URL_BROKER,
     result_backend=settings.REDIS_URL_BACKEND,
+    broker_transport_options=settings.CELERY_REDIS_TRANSPORT_OPTIONS,
+    result_backend_transport_options=settings.CELERY_REDIS_TRANSPORT_OPTIONS,
     broker_connection_retry_on_startup=True,
     broker_connection_max_retries=10,
     # ── Serialización ─────────────────────────────────────────────────────────
@@ -93,6 +96,10 @@ celery_app.conf.update(
             "queue": "maintenance",
             "routing_key": "maintenance",
         },
+        "app.tasks.maintenance.warm_cache": {
+            "queue": "maintenance",
+            "routing_key": "maintenance",
+        },
     },
     # ── Tiempos límite ────────────────────────────────────────────────────────
     # pdf_tasks necesita más tiempo que las tareas de CRUD
@@ -127,13 +134,36 @@ celery_app.conf.beat_schedule = BEAT_SCHEDULE
 # ─────────────────────────────────────────────────────────────────────────────
 
 
+async def _load_feature_flags() -> None:
+    from app.core.db import a_engine
+    from app.core.redis import redis_pools
+    from app.feature_flags import setup_feature_flags
+
+    try:
+        await setup_feature_flags()
+    finally:
+        # Sus conexiones son de un event loop que se cierra al volver
+        await redis_pools.close("cache")
+        await a_engine.dispose()
+
+
 @worker_process_init.connect
 def init_worker_process(**kwargs: object) -> None:
     """
     Inicializa logging estructurado en cada proceso worker.
     Se dispara cuando Celery hace fork de un proceso hijo.
+
+    Descarta los pools Redis heredados del padre: el hijo crea los suyos
+    al primer uso (sus sockets no se pueden compartir entre procesos).
+    Compila las reglas de feature flags para app.feature_flags.is_enabled.
     """
+    import asyncio
+
+    from app.core.redis import redis_pools
+
     setup_logging()
+    redis_pools.reset()
+    asyncio.run(_load_feature_flags())
     log.info("celery.worker.started")
 
 
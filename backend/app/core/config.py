@@ -1,6 +1,6 @@
 import secrets
 import warnings
-from typing import Annotated, Any
+from typing import Annotated, Any, Literal
 from functools import lru_cache
 
 from pydantic import (
@@ -129,11 +129,121 @@ class Settings(BaseSettings):
         default=2, description="Base de datos Redis para caché de la app"
     )
 
+    # Topología:
+    #   standalone  un único servidor (REDIS_HOST:REDIS_PORT)
+    #   sentinel    maestro descubierto por Sentinel, con failover automático
+    #   cluster     Redis Cluster para la caché y el rate limiter. Celery no
+    #               soporta Cluster: broker y backend siguen en REDIS_HOST.
+    #               Cluster solo tiene la DB 0: REDIS_DB_CACHE se ignora.
+    REDIS_MODE: Literal["standalone", "sentinel", "cluster"] = "standalone"
+    REDIS_SENTINELS: list[str] = Field(
+        default_factory=list,
+        description="Sentinels como host:puerto (REDIS_MODE=sentinel)",
+    )
+    REDIS_SENTINEL_MASTER: str = "mymaster"
+    REDIS_SENTINEL_PASSWORD: SecretStr | None = None
+    REDIS_CLUSTER_NODES: list[str] = Field(
+        default_factory=list,
+        description="Nodos semilla del cluster como host:puerto (REDIS_MODE=cluster)",
+    )
+
+    # Pools de conexiones (ver app/core/redis.py)
+    REDIS_POOL_MAX_CONNECTIONS: dict[str, int] = Field(
+        default_factory=lambda: {
+            "app": 20, "request": 10, "cache": 20, "http_cache": 20, "rate_limit": 20,
+        },
+        description="Conexiones máximas por pool y proceso",
+    )
+    REDIS_POOL_TIMEOUT: float = Field(
+        default=2.0,
+        gt=0,
+        description="Segundos de espera por una conexión libre antes de fallar",
+    )
+    REDIS_SOCKET_TIMEOUT: float = 5.0
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+
     # TTL de caché
     CACHE_TTL_SHORT: int = 60  # 1 min  — datos muy volátiles
     CACHE_TTL_DEFAULT: int = 300  # 5 min  — listados, etc.
     CACHE_TTL_LONG: int = 3600  # 1 hora — plantillas, config estática
 
+    # Codec de los valores cacheados (ver app/core/cache_codec.py)
+    CACHE_COMPRESSION: Literal["zstd", "zlib", "none"] = "zstd"
+    CACHE_COMPRESSION_THRESHOLD: int = Field(
+        default=1024,
+        ge=0,
+        description="Bytes de JSON a partir de los cuales se comprime el valor",
+    )
+
+    # Caché L1 en memoria de cada proceso, delante de Redis
+    L1_CACHE_ENABLED: bool = True
+    L1_CACHE_MAX_ENTRIES: int = Field(default=2048, ge=1)
+    L1_CACHE_MAX_BYTES: int = Field(
+        default=32 * 1024 * 1024,
+        ge=1024,
+        description="Memoria máxima (bytes estimados) de la L1 por proceso",
+    )
+
+    # Precalentamiento de caché tras un arranque / despliegue
+    # (ver app/core/cache_warmup.py)
+    CACHE_WARMUP_ON_STARTUP: bool = True
+    CACHE_WARMUP_CONCURRENCY: int = Field(
+        default=4,
+        ge=1,
+        description="Peticiones de calentamiento simultáneas (acota la carga en Postgres)",
+    )
+    # Plantillas y enums salen del bundle de referencia (se construye en cada
+    # proceso, no en Redis): pedir su manifest lo deja listo en el proceso que
+    # calienta. Las rutas con @cached que se añadan aquí sí quedan en Redis.
+    CACHE_WARMUP_PATHS: list[str] = Field(
+        default_factory=lambda: ["/api/v1/reference/manifest"],
+        description="Rutas GET globales a precalentar (vacío = solo app settings)",
+    )
+    CACHE_WARMUP_USER_PATHS: list[str] = Field(
+        default_factory=list,
+        description="Rutas GET por usuario a precalentar (lista de CVs…)",
+    )
+    CACHE_WARMUP_RECENT_USERS: int = Field(
+        default=0,
+        ge=0,
+        description="Usuarios activos recientes a precalentar (0 = solo datos globales)",
+    )
+
+    # Invalidación diferida tras escrituras (ver app/core/cache_invalidation.py)
+    CACHE_INVALIDATION_COALESCE_MS: int = Field(
+        default=100,
+        ge=0,
+        description="Ventana en la que se agrupan invalidaciones repetidas",
+    )
+
+    # Rate limit híbrido: tokens locales por proceso (ver app/middlewares/rate_limit.py)
+    RATE_LIMIT_LOCAL_BATCH: int = Field(
+        default=0,
+        ge=0,
+        description=(
+            "Hits por cliente y proceso servidos sin consultar Redis antes de "
+            "sincronizar (0 = desactivado). Es también el exceso máximo por proceso"
+        ),
+    )
+    RATE_LIMIT_LOCAL_SYNC_MS: int = Field(
+        default=1000,
+        ge=50,
+        description="Antigüedad máxima de la respuesta de Redis usada en local",
+    )
+
+    # Informe de memoria por prefijo (ver app/core/redis_report.py)
+    REDIS_REPORT_MAX_KEYS: int = Field(
+        default=100_000,
+        ge=1,
+        description="Claves examinadas como máximo; por encima se extrapola con DBSIZE",
+    )
+    REDIS_REPORT_SCAN_COUNT: int = Field(default=500, ge=10, le=10_000)
+    REDIS_REPORT_PAUSE_MS: int = Field(
+        default=10,
+        ge=0,
+        description="Pausa entre lotes de SCAN para no acaparar Redis",
+    )
+
     @property
     def REDIS_URL_BROKER(self) -> str:
         """URL Redis para el broker de Celery."""
@@ -149,9 +259,24 @@ class Settings(BaseSettings):
         """URL Redis para caché de la aplicación."""
         return self._build_redis_url(self.REDIS_DB_CACHE)
 
+    @property
+    def CELERY_REDIS_TRANSPORT_OPTIONS(self) -> dict[str, Any]:
+        """Opciones de transporte de broker y backend (Sentinel)."""
+        if self.REDIS_MODE != "sentinel":
+            return {}
+        options: dict[str, Any] = {"master_name": self.REDIS_SENTINEL_MASTER}
+        if self.REDIS_SENTINEL_PASSWORD is not None:
+            options["sentinel_kwargs"] = {
+                "password": self.REDIS_SENTINEL_PASSWORD.get_secret_value()
+            }
+        return options
+
     def _build_redis_url(self, db: int) -> str:
         password = self.REDIS_PASSWORD
         auth = f":{password.get_secret_value()}@" if password else ""
+        if self.REDIS_MODE == "sentinel":
+            # Kombu: una URL por Sentinel separadas por ';'
+            return ";".join(f"sentinel://{auth}{node}/{db}" for node in self.REDIS_SENTINELS)
         return f"redis://{auth}{self.REDIS_HOST}:{self.REDIS_PORT}/{db}"
 
     # ── MinIO (object storage) ────────────────────────────────────────────────
@@ -173,6 +298,46 @@ class Settings(BaseSettings):
         le=604800,
         description="Validez del link de descarga. Máx 7 días.",
     )
+    # El URL firmado se reutiliza (Redis) hasta que le quede este margen
+    MINIO_PRESIGN_REFRESH_MARGIN: int = Field(
+        default=300,
+        ge=0,
+        description="Validez mínima restante de un URL servido desde caché",
+    )
+
+    # Subidas directas del navegador a 'cv-assets' (presigned POST)
+    ASSET_UPLOAD_MAX_BYTES: int = Field(default=5 * 1024**2, ge=1024)
+    ASSET_UPLOAD_TTL: int = Field(
+        default=600,
+        ge=60,
+        le=86400,
+        description="Validez de la política de subida (segundos)",
+    )
+    ASSET_UPLOAD_CONTENT_TYPES: list[str] = Field(
+        default_factory=lambda: ["image/jpeg", "image/png", "image/webp"],
+    )
+
+    # Cliente de la API (ver app/core/s3.py). En Celery se usa MinIOClient (SDK síncrono)
+    STORAGE_CLIENT: Literal["aioboto3", "minio"] = "aioboto3"
+    STORAGE_MAX_POOL_CONNECTIONS: int = Field(
+        default=64,
+        ge=1,
+        description="Conexiones HTTP keep-alive a MinIO por proceso (aioboto3)",
+    )
+    STORAGE_CONNECT_TIMEOUT: float = 5.0
+    STORAGE_READ_TIMEOUT: float = 30.0
+
+    # Caché de PDFs en disco del nodo (ver app/core/pdf_disk_cache.py)
+    PDF_DISK_CACHE_DIR: Path | None = None  # None = desactivada
+    PDF_DISK_CACHE_MAX_BYTES: int = Field(
+        default=2 * 1024**3,
+        ge=1024**2,
+        description="Tamaño máximo del directorio de caché; se desaloja por LRU",
+    )
+    PDF_DISK_CACHE_ACCEL_PREFIX: str | None = Field(
+        default=None,
+        description="Location interna de nginx para X-Accel-Redirect (p. ej. /_pdf_cache/)",
+    )
 
     # ── Celery ────────────────────────────────────────────────────────────────
     CELERY_TASK_SOFT_TIME_LIMIT: int = 120  # segundos — warning antes de matar
@@ -281,6 +446,14 @@ class Settings(BaseSettings):
                 )
         return self
 
+    @model_validator(mode="after")
+    def _validate_redis_topology(self) -> Self:
+        if self.REDIS_MODE == "sentinel" and not self.REDIS_SENTINELS:
+            raise ValueError("REDIS_MODE=sentinel requiere REDIS_SENTINELS")
+        if self.REDIS_MODE == "cluster" and not self.REDIS_CLUSTER_NODES:
+            raise ValueError("REDIS_MODE=cluster requiere REDIS_CLUSTER_NODES")
+        return self
+
     @model_validator(mode="after")
     def _set_default_emails_from(self) -> Self:
         if not self.EMAILS_FROM_NAME:
@@ -0,0 +1,179 @@
+"""
+app/core/local_cache.py
+
+Caché L1 en memoria del proceso, delante de Redis.
+
+  - LRU acotada por número de entradas y por bytes.
+  - TTL por entrada, limitado por la política del namespace.
+  - Solo admite claves cuyo prefijo aparece en la política: datos globales
+    que casi nunca cambian (plantillas, app settings…). Los datos por
+    usuario o de polling (estado PDF) nunca viven en L1.
+
+La coherencia entre workers de gunicorn y réplicas la da el canal Redis
+pub/sub de app/core/cache.py: cada invalidación se publica y todos los
+procesos borran la clave de su L1. Mientras el proceso no está suscrito
+(arranque, Celery, reconexión) la L1 está deshabilitada y vacía.
+
+Uso (el singleton y su política viven en app/core/cache.py):
+    from app.core.cache import local_cache
+    from app.core.local_cache import MISS
+
+    value = local_cache.get(key)
+    if value is MISS:
+        value = await redis.get(key)
+        local_cache.set(key, value)
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Final
+
+
+class _Miss:
+    """Centinela de fallo de caché (None es un valor cacheable)."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISS"
+
+
+MISS: Final = _Miss()
+
+
+class LocalCache:
+    """
+    LRU + TTL en memoria, segura entre hilos (endpoints síncronos de FastAPI
+    se ejecutan en el threadpool).
+
+    Args:
+        max_entries: máximo de entradas simultáneas.
+        max_bytes:   máximo de bytes (tamaño estimado de los valores).
+        policy:      prefijo de clave → TTL máximo en L1 (segundos).
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        policy: dict[str, int] | None = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes   = max_bytes
+        self.policy: dict[str, int] = dict(policy or {})
+        self.enabled     = False
+
+        # clave → (valor, expira_en, tamaño)
+        self._data: OrderedDict[str, tuple[Any, float, int]] = OrderedDict()
+        self._nbytes = 0
+        self._lock   = threading.Lock()
+
+    # ── Política ──────────────────────────────────────────────────────────────
+
+    def ttl_for(self, key: str) -> int | None:
+        """TTL máximo permitido en L1 para la clave, o None si no admite L1."""
+        for prefix, ttl in self.policy.items():
+            if key.startswith(prefix):
+                return ttl
+        return None
+
+    # ── Lectura / escritura ───────────────────────────────────────────────────
+
+    def get_with_ttl(self, key: str) -> tuple[int, Any]:
+        """`(segundos_restantes, valor)` o `(0, MISS)`."""
+        if not self.enabled:
+            return 0, MISS
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return 0, MISS
+            value, expires_at, size = entry
+            remaining = expires_at - time.monotonic()
+            if remaining <= 0:
+                del self._data[key]
+                self._nbytes -= size
+                return 0, MISS
+            self._data.move_to_end(key)
+            return max(int(remaining), 1), value
+
+    def get(self, key: str) -> Any:
+        """Valor cacheado o `MISS`."""
+        return self.get_with_ttl(key)[1]
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: int | None = None,
+        size: int | None = None,
+    ) -> bool:
+        """
+        Guarda el valor si la política lo permite.
+
+        Args:
+            ttl:  TTL deseado (p. ej. el TTL restante en Redis). Se recorta
+                  al máximo de la política.
+            size: tamaño en bytes; por defecto len() de str/bytes o
+                  sys.getsizeof() para otros objetos.
+
+        Returns:
+            True si el valor quedó en L1.
+        """
+        if not self.enabled:
+            return False
+        max_ttl = self.ttl_for(key)
+        if max_ttl is None:
+            return False
+        ttl = min(ttl, max_ttl) if ttl and ttl > 0 else max_ttl
+        if size is None:
+            size = len(value) if isinstance(value, (str, bytes)) else sys.getsizeof(value)
+        if size > self.max_bytes:
+            return False
+
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._nbytes -= old[2]
+            self._data[key] = (value, time.monotonic() + ttl, size)
+            self._nbytes += size
+            self._evict()
+        return True
+
+    def _evict(self) -> None:
+        while self._data and (
+            len(self._data) > self.max_entries or self._nbytes > self.max_bytes
+        ):
+            _, (_, _, size) = self._data.popitem(last=False)
+            self._nbytes -= size
+
+    # ── Invalidación ──────────────────────────────────────────────────────────
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                entry = self._data.pop(key, None)
+                if entry is not None:
+                    self._nbytes -= entry[2]
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                self._nbytes -= self._data.pop(key)[2]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._nbytes = 0
+
+    # ── Introspección ─────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
@@ -0,0 +1,218 @@
+"""
+app/core/pdf_disk_cache.py
+
+Caché en disco local del nodo para los PDFs más descargados.
+
+Un PDF recién generado suele descargarse varias veces en pocos minutos;
+con esta caché solo la primera descarga de cada versión llega a MinIO.
+
+  - Clave: nombre del objeto + ETag. Un PDF regenerado tiene otro ETag, así
+    que nunca se sirve una versión vieja; al guardar la nueva se borran las
+    anteriores del mismo objeto.
+  - Acotada por bytes (PDF_DISK_CACHE_MAX_BYTES) con desalojo LRU: cada
+    acierto actualiza el mtime del fichero y al guardar se borran los de
+    mtime más antiguo hasta volver al límite. Un fichero con un acierto en
+    el último minuto no se borra (ni como versión anterior): otro worker
+    puede estar a punto de enviarlo. Los temporales de escrituras que no
+    terminaron (worker caído) se borran pasados unos minutos.
+  - El directorio es la única fuente de verdad, así que la comparten todos
+    los workers del nodo. Las escrituras son atómicas (fichero temporal +
+    rename): nadie ve un PDF a medias.
+
+Servir un acierto no copia el fichero por Python (ver
+app/api/v1/routes/cvs.py): con PDF_DISK_CACHE_ACCEL_PREFIX nginx lo envía
+él mismo (X-Accel-Redirect); sin él se responde con un FileResponse, que
+el servidor ASGI envía con sendfile/pathsend si lo soporta.
+
+    # nginx: location interna con el mismo directorio
+    location /_pdf_cache/ {
+        internal;
+        alias /var/cache/cv-pdfs/;
+    }
+
+Desactivada si PDF_DISK_CACHE_DIR no está configurado.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import IO
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+log = get_logger(__name__)
+
+_SUFFIX = ".pdf"
+_TMP_PREFIX = ".tmp-"
+
+# Margen para enviar un acierto antes de que se pueda borrar (segundos)
+_HIT_GRACE = 60
+# Edad a partir de la cual un temporal se da por abandonado (segundos)
+_STALE_TMP_AGE = 10 * 60
+
+
+def _safe_etag(etag: str) -> str:
+    """ETag apto para nombre de fichero (sin comillas: hex y '-')."""
+    return re.sub(r"[^0-9A-Za-z-]", "", etag)
+
+
+class PdfDiskCache:
+    """
+    Ficheros `<hash del objeto>-<etag>.pdf` en un directorio.
+
+    Args:
+        directory: directorio de la caché (se crea al primer uso).
+        max_bytes: tamaño máximo del directorio.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def path_for(self, object_name: str, etag: str) -> Path:
+        return self.directory / f"{self._stem(object_name)}-{_safe_etag(etag)}{_SUFFIX}"
+
+    @staticmethod
+    def _stem(object_name: str) -> str:
+        return hashlib.sha256(object_name.encode()).hexdigest()[:32]
+
+    # ── Lectura ───────────────────────────────────────────────────────────────
+
+    async def get(self, object_name: str, etag: str) -> Path | None:
+        """Ruta del fichero cacheado de esa versión, o None."""
+        return await asyncio.to_thread(self._get_sync, self.path_for(object_name, etag))
+
+    @staticmethod
+    def _get_sync(path: Path) -> Path | None:
+        try:
+            os.utime(path)  # LRU: el acierto lo hace el más reciente
+        except FileNotFoundError:
+            return None
+        return path
+
+    # ── Escritura ─────────────────────────────────────────────────────────────
+
+    async def tee(
+        self,
+        object_name: str,
+        etag: str,
+        chunks: AsyncIterator[bytes],
+    ) -> AsyncIterator[bytes]:
+        """
+        Reenvía `chunks` (la descarga desde MinIO) guardando una copia. El
+        fichero solo se publica si el stream termina entero; si el cliente
+        se desconecta o falla la lectura se descarta.
+        """
+        tmp = await asyncio.to_thread(self._open_tmp)
+        complete = False
+        try:
+            async for chunk in chunks:
+                if tmp is not None:
+                    try:
+                        await asyncio.to_thread(tmp.write, chunk)
+                    except OSError as exc:
+                        # Sin espacio, permisos…: se sigue sirviendo sin caché
+                        log.warning("pdf_disk_cache.write_failed", error=str(exc))
+                        await asyncio.to_thread(self._discard, tmp)
+                        tmp = None
+                yield chunk
+            complete = True
+        finally:
+            if tmp is not None:
+                if complete:
+                    await asyncio.to_thread(self._commit, tmp, object_name, etag)
+                else:
+                    # Sin await: al desconectarse el cliente la tarea está
+                    # cancelada y cualquier await volvería a cancelarse
+                    self._discard(tmp)
+
+    def _open_tmp(self) -> IO[bytes] | None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            return tempfile.NamedTemporaryFile(
+                dir=self.directory, prefix=_TMP_PREFIX, suffix=_SUFFIX, delete=False
+            )
+        except OSError as exc:
+            log.warning("pdf_disk_cache.write_failed", error=str(exc))
+            return None
+
+    @staticmethod
+    def _discard(tmp: IO[bytes]) -> None:
+        tmp.close()
+        Path(tmp.name).unlink(missing_ok=True)
+
+    def _commit(self, tmp: IO[bytes], object_name: str, etag: str) -> None:
+        path = self.path_for(object_name, etag)
+        try:
+            tmp.close()
+            size = os.path.getsize(tmp.name)
+            os.replace(tmp.name, path)
+            # Versiones anteriores del mismo objeto (las que se estén
+            # sirviendo se quedan; el LRU las borrará después)
+            for old in self.directory.glob(f"{self._stem(object_name)}-*{_SUFFIX}"):
+                if old != path:
+                    self._unlink_unused(old, time.time())
+            self._evict()
+        except OSError as exc:
+            log.warning("pdf_disk_cache.write_failed", error=str(exc))
+            Path(tmp.name).unlink(missing_ok=True)
+            return
+        log.debug("pdf_disk_cache.stored", object_name=object_name, size=size)
+
+    @staticmethod
+    def _unlink_unused(path: Path, now: float) -> bool:
+        """Borra `path` salvo que haya tenido un acierto hace menos de _HIT_GRACE."""
+        try:
+            if now - path.stat().st_mtime < _HIT_GRACE:
+                return False
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _evict(self) -> None:
+        """
+        Borra los temporales abandonados y los ficheros menos usados hasta
+        volver a max_bytes. Los que tienen un acierto reciente se saltan,
+        aunque eso deje el directorio por encima del límite un momento.
+        """
+        now     = time.time()
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(_SUFFIX):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if entry.name.startswith(_TMP_PREFIX):
+                if now - stat.st_mtime > _STALE_TMP_AGE:
+                    Path(entry.path).unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if self._unlink_unused(Path(path), now):
+                total   -= size
+                evicted += 1
+        log.info("pdf_disk_cache.evicted", files=evicted, total_bytes=total)
+
+
+# ── Singleton (None si está desactivada) ──────────────────────────────────────
+pdf_disk_cache: PdfDiskCache | None = (
+    PdfDiskCache(settings.PDF_DISK_CACHE_DIR, settings.PDF_DISK_CACHE_MAX_BYTES)
+    if settings.PDF_DISK_CACHE_DIR
+    else None
+)
@@ -4,8 +4,26 @@ app/core/redis.py
 Cliente Redis centralizado para el dominio CV.
 
 Provee:
-  - Dos pools independientes: uno para el CacheService (DB 2)
-    y otro disponible para uso directo en servicios/tareas.
+  - Registro único de pools con nombre (`redis_pools`), todos construidos
+    desde settings:
+        app         uso directo en servicios/tareas (str)
+        request     Depends(get_redis) en rutas (str)
+        cache       CacheService y L1 pub/sub (bytes, cache_codec)
+        http_cache  fastapi-cache2 (bytes, cache_codec)
+        rate_limit  contadores del rate limiter (str)
+  - Topología según REDIS_MODE:
+        standalone  BlockingConnectionPool contra REDIS_HOST
+        sentinel    pool que resuelve el maestro vía Sentinel (failover)
+        cluster     un RedisCluster por nombre (pools por nodo internos)
+    El cliente expone la misma API en los tres modos. En cluster los
+    comandos multi-clave deben caer en un slot: CacheKeys usa hash tags.
+  - Espera acotada por conexión libre (REDIS_POOL_TIMEOUT): con el pool
+    agotado se espera hasta ese plazo y después se lanza ConnectionError,
+    en vez de fallar al instante o bloquear para siempre.
+  - Métricas por pool: conexiones en uso / ociosas, tiempo de espera y
+    esperas agotadas (expuestas en /utils/metrics).
+  - Re-creación tras fork (workers de Celery) o cambio de event loop
+    (asyncio.run por tarea): los pools se reconstruyen solos.
   - Dependency de FastAPI (get_redis) para inyección en rutas.
   - Health check.
   - Función de inicialización/cierre para el lifespan.
@@ -17,14 +35,28 @@ Uso en servicios:
 Uso como dependency en rutas:
     from app.core.redis import get_redis
     async def my_route(redis: Redis = Depends(get_redis)): ...
+
+Cliente de otro pool:
+    from app.core.redis import redis_pools
+    redis = redis_pools.client("cache")
 """
 from __future__ import annotations
 
-from collections.abc import AsyncGenerator
+import asyncio
+import os
+import random
+import threading
+import time
+from collections.abc import AsyncGenerator, Callable
+from dataclasses import dataclass
+from typing import Any
 
-from redis.asyncio import ConnectionPool, Redis
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.cluster import ClusterNode, RedisCluster
 from redis.asyncio.retry import Retry
+from redis.asyncio.sentinel import Sentinel, SentinelConnectionPool
 from redis.backoff import ExponentialBackoff
+from redis.crc import key_slot
 from redis.exceptions import ConnectionError, TimeoutError
 
 from app.core.config import settings
@@ -34,53 +66,375 @@ log = get_logger(__name__)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Factory de pools
+# Pool instrumentado
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _build_pool(db: int, max_connections: int = 20) -> ConnectionPool:
-    """
-    Construye un ConnectionPool Redis con:
-      - Reintentos exponenciales (3 intentos, cap 10 s)
-      - Health check cada 30 s para descartar conexiones muertas
-      - Timeout de conexión y socket de 5 s
-      - decode_responses=True → todos los valores son str, no bytes
-    """
-    password = settings.REDIS_PASSWORD
-    auth     = f":{password.get_secret_value()}@" if password else ""
-    url      = f"redis://{auth}{settings.REDIS_HOST}:{settings.REDIS_PORT}/{db}"
-
-    return ConnectionPool.from_url(
-        url,
-        max_connections=max_connections,
-        decode_responses=True,
-        retry=Retry(
-            ExponentialBackoff(cap=10, base=0.5),
-            retries=3,
-        ),
-        retry_on_error=[ConnectionError, TimeoutError],
-        socket_connect_timeout=5,
-        socket_timeout=5,
-        health_check_interval=30,
-    )
+# Mensajes de pool agotado: BlockingConnectionPool tras REDIS_POOL_TIMEOUT
+# (standalone) y ConnectionPool al instante (sentinel)
+_POOL_EXHAUSTED = frozenset({"No connection available.", "Too many connections"})
+
+
+class _PoolMetricsMixin:
+    """
+    Mide la obtención de conexiones de un pool.
+
+    `acquire_*` incluye la espera por una conexión libre y, si hace falta,
+    el connect de una nueva. Va delante del pool concreto en el MRO: los
+    super() y los atributos de abajo los pone ese pool.
+    """
+
+    owns_connection: Callable[[Any], bool]
+    _available_connections: list[Any]
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.in_use           = 0
+        self.acquire_count    = 0
+        self.acquire_seconds  = 0.0
+        self.acquire_max      = 0.0
+        self.acquire_timeouts = 0
+
+    async def get_connection(self, command_name: Any, *keys: Any, **options: Any) -> Any:
+        started = time.monotonic()
+        try:
+            connection = await super().get_connection(command_name, *keys, **options)  # type: ignore[misc]
+        except ConnectionError as exc:
+            if str(exc) in _POOL_EXHAUSTED:
+                self.acquire_timeouts += 1
+            raise
+        elapsed = time.monotonic() - started
+        self.in_use          += 1
+        self.acquire_count   += 1
+        self.acquire_seconds += elapsed
+        self.acquire_max      = max(self.acquire_max, elapsed)
+        return connection
+
+    async def release(self, connection: Any) -> None:
+        if self.owns_connection(connection):
+            self.in_use = max(self.in_use - 1, 0)
+        await super().release(connection)  # type: ignore[misc]
+
+    @property
+    def idle(self) -> int:
+        return len(self._available_connections)
+
+
+class InstrumentedConnectionPool(_PoolMetricsMixin, BlockingConnectionPool):
+    """BlockingConnectionPool instrumentado (modo standalone)."""
+
+    @property
+    def idle(self) -> int:
+        return max(len(self._connections) - self.in_use, 0)
+
+
+class InstrumentedSentinelPool(_PoolMetricsMixin, SentinelConnectionPool):
+    """
+    Pool instrumentado que pide a Sentinel la dirección del maestro (modo
+    sentinel). Tras un failover las conexiones al maestro anterior se
+    descartan solas. No bloquea: con el pool lleno falla al instante.
+    """
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Pools
+# Registro de pools
 # ─────────────────────────────────────────────────────────────────────────────
 
-# Pool principal — caché de la app (DB 2)
-# Compartido entre CacheService y cualquier uso directo en servicios.
-_cache_pool: ConnectionPool = _build_pool(
-    db=settings.REDIS_DB_CACHE,
-    max_connections=20,
-)
+@dataclass(frozen=True)
+class PoolSpec:
+    db: int
+    decode_responses: bool
+
+
+POOL_SPECS: dict[str, PoolSpec] = {
+    "app":        PoolSpec(db=settings.REDIS_DB_CACHE, decode_responses=True),
+    "request":    PoolSpec(db=settings.REDIS_DB_CACHE, decode_responses=True),
+    "cache":      PoolSpec(db=settings.REDIS_DB_CACHE, decode_responses=False),
+    "http_cache": PoolSpec(db=settings.REDIS_DB_CACHE, decode_responses=False),
+    "rate_limit": PoolSpec(db=settings.REDIS_DB_CACHE, decode_responses=True),
+}
+
+_DEFAULT_MAX_CONNECTIONS = 20
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _parse_nodes(nodes: list[str]) -> list[tuple[str, int]]:
+    """["host:puerto", ...] → [(host, puerto), ...]"""
+    parsed = []
+    for node in nodes:
+        host, _, port = node.rpartition(":")
+        parsed.append((host, int(port)))
+    return parsed
+
+
+@dataclass
+class _PoolEntry:
+    # Pool (standalone / sentinel) o cliente RedisCluster (cluster)
+    pool: Any
+    pid:  int
+    loop: asyncio.AbstractEventLoop | None
+
+
+class RedisPoolRegistry:
+    """
+    Pools con nombre, creados bajo demanda a partir de POOL_SPECS y settings.
+
+    Cada pool pertenece a un proceso y a un event loop: si cambia alguno
+    (fork de Celery, asyncio.run en otra tarea) se descarta y se crea otro.
+    Las conexiones del pool anterior no se cierran desde el hijo: sus
+    sockets pertenecen al proceso padre o a un loop que ya no existe.
+    """
+
+    def __init__(self, specs: dict[str, PoolSpec], mode: str = "standalone") -> None:
+        self.specs = specs
+        self.mode  = mode
+        self._entries: dict[str, _PoolEntry] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def clustered(self) -> bool:
+        return self.mode == "cluster"
+
+    def _connection_kwargs(self, name: str) -> dict[str, Any]:
+        """Opciones de conexión comunes a los tres modos."""
+        password = settings.REDIS_PASSWORD
+        return {
+            "password":               password.get_secret_value() if password else None,
+            "decode_responses":       self.specs[name].decode_responses,
+            "retry":                  Retry(ExponentialBackoff(cap=10, base=0.5), retries=3),
+            "retry_on_error":         [ConnectionError, TimeoutError],
+            "socket_connect_timeout": settings.REDIS_SOCKET_TIMEOUT,
+            "socket_timeout":         settings.REDIS_SOCKET_TIMEOUT,
+            "health_check_interval":  settings.REDIS_HEALTH_CHECK_INTERVAL,
+        }
+
+    def _build(self, name: str) -> Any:
+        spec            = self.specs[name]
+        max_connections = settings.REDIS_POOL_MAX_CONNECTIONS.get(name, _DEFAULT_MAX_CONNECTIONS)
+        kwargs          = self._connection_kwargs(name)
 
-# Pool secundario — uso puntual en rutas via Depends(get_redis)
-# Mismo DB que _cache_pool pero pool separado para no saturarlo.
-_request_pool: ConnectionPool = _build_pool(
-    db=settings.REDIS_DB_CACHE,
-    max_connections=10,
-)
+        if self.mode == "cluster":
+            # Cluster solo tiene la DB 0; max_connections es por nodo
+            return RedisCluster(
+                startup_nodes=[
+                    ClusterNode(host, port) for host, port in _parse_nodes(settings.REDIS_CLUSTER_NODES)
+                ],
+                max_connections=max_connections,
+                **kwargs,
+            )
+
+        if self.mode == "sentinel":
+            sentinel_password = settings.REDIS_SENTINEL_PASSWORD
+            sentinel = Sentinel(
+                _parse_nodes(settings.REDIS_SENTINELS),
+                sentinel_kwargs={
+                    "password": sentinel_password.get_secret_value() if sentinel_password else None,
+                    "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+                },
+            )
+            return InstrumentedSentinelPool(
+                settings.REDIS_SENTINEL_MASTER,
+                sentinel,
+                is_master=True,
+                db=spec.db,
+                max_connections=max_connections,
+                **kwargs,
+            )
+
+        return InstrumentedConnectionPool(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=spec.db,
+            max_connections=max_connections,
+            timeout=settings.REDIS_POOL_TIMEOUT,
+            **kwargs,
+        )
+
+    def pool(self, name: str) -> Any:
+        """
+        Pool `name` válido para el proceso y el event loop actuales (en modo
+        cluster, el cliente RedisCluster).
+        """
+        pid   = os.getpid()
+        loop  = _running_loop()
+        entry = self._entries.get(name)
+        if entry is not None and entry.pid == pid:
+            if entry.loop is loop or loop is None:
+                return entry.pool
+            if entry.loop is None:
+                entry.loop = loop
+                return entry.pool
+
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry.pid != pid or (
+                loop is not None and entry.loop is not None and entry.loop is not loop
+            ):
+                if entry is not None:
+                    log.info("redis.pool.recreated", pool=name, pid=pid)
+                entry = _PoolEntry(pool=self._build(name), pid=pid, loop=loop)
+                self._entries[name] = entry
+            elif entry.loop is None:
+                entry.loop = loop
+            return entry.pool
+
+    def client(self, name: str) -> Redis:
+        """Cliente Redis que resuelve su pool en el registro en cada uso."""
+        if self.clustered:
+            return RegistryRedisCluster(self, name)
+        return RegistryRedis(self, name)
+
+    def reset(self) -> None:
+        """Olvida todos los pools (tras un fork). Se recrean al usarse."""
+        with self._lock:
+            self._entries.clear()
+
+    async def close(self, *names: str) -> None:
+        """Cierra los pools indicados (todos si no se indica ninguno)."""
+        for name in names or tuple(self._entries):
+            entry = self._entries.pop(name, None)
+            if entry is not None and entry.pid == os.getpid():
+                if self.clustered:
+                    await entry.pool.close()
+                else:
+                    await entry.pool.disconnect()
+
+    # ── Métricas ──────────────────────────────────────────────────────────────
+
+    def stats(self) -> list[dict[str, Any]]:
+        """
+        Estado de los pools creados en este proceso. En modo cluster no hay
+        métricas de pool: cada nodo tiene los suyos dentro de RedisCluster.
+        """
+        if self.clustered:
+            return []
+        return [
+            {
+                "pool":             name,
+                "max_connections":  entry.pool.max_connections,
+                "in_use":           entry.pool.in_use,
+                "idle":             entry.pool.idle,
+                "acquire_count":    entry.pool.acquire_count,
+                "acquire_seconds":  round(entry.pool.acquire_seconds, 6),
+                "acquire_max":      round(entry.pool.acquire_max, 6),
+                "acquire_timeouts": entry.pool.acquire_timeouts,
+            }
+            for name, entry in sorted(self._entries.items())
+        ]
+
+    def render_prometheus(self) -> str:
+        """Exposición en formato de texto de Prometheus."""
+        stats = self.stats()
+        lines = [
+            "# HELP redis_pool_connections Conexiones del pool por estado.",
+            "# TYPE redis_pool_connections gauge",
+        ]
+        for row in stats:
+            for state in ("in_use", "idle"):
+                lines.append(
+                    f'redis_pool_connections{{pool="{row["pool"]}",state="{state}"}} {row[state]}'
+                )
+        lines += [
+            "# HELP redis_pool_max_connections Tamaño máximo del pool.",
+            "# TYPE redis_pool_max_connections gauge",
+        ]
+        lines += [f'redis_pool_max_connections{{pool="{r["pool"]}"}} {r["max_connections"]}' for r in stats]
+        lines += [
+            "# HELP redis_pool_acquire_seconds Tiempo para obtener una conexión del pool.",
+            "# TYPE redis_pool_acquire_seconds summary",
+        ]
+        for row in stats:
+            lines.append(f'redis_pool_acquire_seconds_count{{pool="{row["pool"]}"}} {row["acquire_count"]}')
+            lines.append(f'redis_pool_acquire_seconds_sum{{pool="{row["pool"]}"}} {row["acquire_seconds"]}')
+        lines += [
+            "# HELP redis_pool_acquire_timeouts_total Esperas agotadas con el pool lleno.",
+            "# TYPE redis_pool_acquire_timeouts_total counter",
+        ]
+        lines += [
+            f'redis_pool_acquire_timeouts_total{{pool="{r["pool"]}"}} {r["acquire_timeouts"]}' for r in stats
+        ]
+        return "\n".join(lines) + "\n"
+
+
+class RegistryRedis(Redis):
+    """
+    Redis cuyo `connection_pool` es siempre el vigente en el registro.
+    Permite clientes a nivel de módulo que sobreviven a un fork o a un
+    cambio de event loop.
+    """
+
+    def __init__(self, registry: RedisPoolRegistry, name: str) -> None:
+        self._registry  = registry
+        self._pool_name = name
+        super().__init__(connection_pool=registry.pool(name))
+
+    @property
+    def connection_pool(self) -> InstrumentedConnectionPool:
+        pool: InstrumentedConnectionPool = self._registry.pool(self._pool_name)
+        return pool
+
+    @connection_pool.setter
+    def connection_pool(self, value: Any) -> None:
+        # Redis.__init__ lo asigna; el pool real se resuelve en el getter
+        pass
+
+
+class RegistryRedisCluster:
+    """
+    Equivalente de RegistryRedis en modo cluster: delega en el RedisCluster
+    vigente del registro y adapta lo que la API de cluster no cubre igual.
+    """
+
+    def __init__(self, registry: RedisPoolRegistry, name: str) -> None:
+        self._registry  = registry
+        self._pool_name = name
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._registry.pool(self._pool_name), attr)
+
+    async def mget(self, keys: Any, *args: Any) -> list[Any]:
+        # MGET solo admite claves de un slot; la versión no atómica agrupa por nodo
+        values: list[Any] = await self._registry.pool(self._pool_name).mget_nonatomic(keys, *args)
+        return values
+
+    def pubsub(self, **kwargs: Any) -> Any:
+        # El cliente async de cluster no implementa pub/sub. PUBLISH se
+        # propaga a todos los nodos, así que basta suscribirse a uno.
+        host, port = random.choice(_parse_nodes(settings.REDIS_CLUSTER_NODES))
+        node = Redis(host=host, port=port, **self._registry._connection_kwargs(self._pool_name))
+        return node.pubsub(**kwargs)
+
+    async def close(self) -> None:
+        # El RedisCluster es compartido: se cierra con redis_pools.close()
+        pass
+
+
+redis_pools = RedisPoolRegistry(POOL_SPECS, mode=settings.REDIS_MODE)
+
+
+def queue_delete(pipe: Any, keys: Any) -> int:
+    """
+    Encola el borrado de `keys` en un pipeline y retorna cuántos resultados
+    añade (el número de claves borradas es su suma).
+
+    En cluster un DEL solo admite claves de un slot, y el DEL del pipeline
+    de cluster no se encola: se envía un DEL crudo por slot.
+    """
+    if not redis_pools.clustered:
+        pipe.delete(*keys)
+        return 1
+    by_slot: dict[int, list[Any]] = {}
+    for key in keys:
+        raw = key.encode() if isinstance(key, str) else key
+        by_slot.setdefault(key_slot(raw), []).append(key)
+    for slot_keys in by_slot.values():
+        pipe.execute_command("DEL", *slot_keys)
+    return len(by_slot)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -89,7 +443,7 @@ _request_pool: ConnectionPool = _build_pool(
 
 # Singleton para usar en servicios y tareas Celery:
 #   from app.core.redis import redis_client
-redis_client: Redis = Redis(connection_pool=_cache_pool)
+redis_client: Redis = redis_pools.client("app")
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -99,18 +453,18 @@ redis_client: Redis = Redis(connection_pool=_cache_pool)
 async def get_redis() -> AsyncGenerator[Redis, None]:
     """
     Dependency de FastAPI — inyecta un cliente Redis por request.
-    Usa el pool secundario para no bloquear el CacheService.
+    Usa el pool `request` para no bloquear el CacheService.
 
     Uso:
         @router.get("/")
         async def route(redis: Redis = Depends(get_redis)):
             await redis.set("key", "value", ex=60)
     """
-    client = Redis(connection_pool=_request_pool)
+    client = redis_pools.client("request")
     try:
         yield client
     finally:
-        await client.aclose()
+        await client.close()
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -137,8 +491,7 @@ async def setup_redis() -> None:
 
 async def teardown_redis() -> None:
     """Cierra los pools al apagar la app."""
-    await _cache_pool.aclose()
-    await _request_pool.aclose()
+    await redis_pools.close("app", "request")
     log.info("redis.pools_closed")
 
 
@@ -155,4 +508,4 @@ async def check_redis() -> bool:
         return bool(await redis_client.ping())
     except Exception as exc:
         log.error("redis.health_check.failed", error=str(exc))
-        return False
\ No newline at end of file
+        return False
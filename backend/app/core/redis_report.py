@@ -0,0 +1,248 @@
+"""
+app/core/redis_report.py
+
+Informe de memoria y cardinalidad de claves de la DB de caché de Redis.
+
+Recorre el keyspace de forma incremental (SCAN, nunca KEYS) y, por cada
+lote, pide MEMORY USAGE y TTL en un pipeline sin transacción. Agrega por
+prefijo:
+
+    cvgen:http:<namespace>   respuestas de @cache / @cached (por namespace)
+    cv_status:               estado de jobs PDF
+    lock:                    locks (PDF, relleno single-flight, warmup)
+    cache_tag:               índice de tags de invalidación
+    cache_pending:           invalidaciones diferidas sin ejecutar
+    presigned:               presigned URLs de descarga de PDFs
+    pdf_expiry:              índice de expiración de PDFs
+    app_settings:            snapshot de app settings
+    feature_flags:           reglas de feature flags
+    activity:                usuarios activos recientes
+    rate_limit:              contadores del rate limiter
+    (otros)                  todo lo demás
+
+Por prefijo: número de claves, bytes (MEMORY USAGE, con SAMPLES acotado
+para no recorrer colecciones grandes) y distribución de TTL.
+
+En Redis Cluster se recorre cada nodo maestro por separado y DBSIZE suma
+todos los nodos.
+
+Apto para producción:
+  - Lotes de REDIS_REPORT_SCAN_COUNT claves con una pausa entre lotes.
+  - Tope de claves examinadas (REDIS_REPORT_MAX_KEYS): si se alcanza, los
+    totales se extrapolan con DBSIZE y el informe lo indica.
+  - Un solo informe a la vez en todo el despliegue (lock en Redis).
+
+Uso:
+    GET /utils/redis-keyspace?max_keys=20000   (header X-Admin-Key)
+
+    # desde una shell del contenedor
+    python -m app.core.redis_report
+"""
+from __future__ import annotations
+
+import asyncio
+import secrets
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from redis.asyncio import Redis
+
+from app.core.cache import HTTP_CACHE_PREFIX, RELEASE_LOCK_LUA, CacheKeys
+from app.core.cache_metrics import namespace_of
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.redis import redis_pools
+
+log = get_logger(__name__)
+
+REPORT_PREFIXES: tuple[str, ...] = (
+    CacheKeys._PFX_STATUS,
+    CacheKeys._PFX_LOCK,
+    CacheKeys._PFX_TAG,
+    CacheKeys._PFX_PENDING,
+    CacheKeys._PFX_PRESIGN,
+    CacheKeys._PFX_EXPIRY,
+    CacheKeys._PFX_SETTINGS,
+    CacheKeys._PFX_FLAGS,
+    CacheKeys._PFX_ACTIVITY,
+    "rate_limit:",
+)
+OTHER_PREFIX = "(otros)"
+
+# Límite superior (segundos) de cada tramo de TTL; el último es "sin TTL"
+TTL_BUCKETS: tuple[tuple[str, float], ...] = (
+    ("<1m",  60),
+    ("<5m",  300),
+    ("<1h",  3600),
+    ("<1d",  86400),
+    (">=1d", float("inf")),
+)
+NO_TTL = "sin_ttl"
+
+# Elementos muestreados por MEMORY USAGE en colecciones (sets, zsets…)
+_MEMORY_SAMPLES = 5
+
+
+class ReportInProgress(Exception):
+    """Ya hay un informe en curso en otro proceso."""
+
+
+def prefix_of(key: str) -> str:
+    """Grupo del informe al que pertenece una clave."""
+    if key.startswith(HTTP_CACHE_PREFIX):
+        return f"{HTTP_CACHE_PREFIX}{namespace_of(key)}"
+    for prefix in REPORT_PREFIXES:
+        if key.startswith(prefix):
+            return prefix
+    return OTHER_PREFIX
+
+
+def ttl_bucket(ttl: int) -> str:
+    """Tramo de TTL (TTL de Redis: -1 sin caducidad, -2 ya no existe)."""
+    if ttl < 0:
+        return NO_TTL
+    for name, upper in TTL_BUCKETS:
+        if ttl < upper:
+            return name
+    return TTL_BUCKETS[-1][0]
+
+
+@dataclass
+class PrefixStats:
+    keys:      int = 0
+    bytes:     int = 0
+    max_bytes: int = 0
+    ttl:       dict[str, int] = field(default_factory=dict)
+
+    def add(self, size: int, ttl: int) -> None:
+        self.keys     += 1
+        self.bytes    += size
+        self.max_bytes = max(self.max_bytes, size)
+        bucket = ttl_bucket(ttl)
+        self.ttl[bucket] = self.ttl.get(bucket, 0) + 1
+
+    def as_dict(self, scale: float) -> dict[str, Any]:
+        return {
+            "keys":            self.keys,
+            "bytes":           self.bytes,
+            "avg_bytes":       round(self.bytes / self.keys) if self.keys else 0,
+            "max_bytes":       self.max_bytes,
+            "estimated_keys":  round(self.keys * scale),
+            "estimated_bytes": round(self.bytes * scale),
+            "ttl":             dict(self.ttl),
+        }
+
+
+async def _scan_batches(redis: Redis, scan_count: int) -> AsyncIterator[list[Any]]:
+    """Lotes de SCAN. En cluster se recorre cada maestro con su cursor."""
+    if redis_pools.clustered:
+        for node in redis.get_primaries():
+            cursor = 0
+            while True:
+                cursors, keys = await redis.scan(cursor, count=scan_count, target_nodes=node)
+                cursor = cursors[node.name]
+                yield keys
+                if cursor == 0:
+                    break
+        return
+
+    cursor = 0
+    while True:
+        cursor, keys = await redis.scan(cursor, count=scan_count)
+        yield keys
+        if cursor == 0:
+            break
+
+
+async def keyspace_report(
+    redis: Redis,
+    *,
+    max_keys: int | None = None,
+    scan_count: int | None = None,
+    pause: float | None = None,
+) -> dict[str, Any]:
+    """
+    Recorre el keyspace y agrega memoria, claves y TTL por prefijo.
+
+    Las claves que caducan entre el SCAN y el MEMORY USAGE se ignoran.
+    """
+    max_keys   = max_keys or settings.REDIS_REPORT_MAX_KEYS
+    scan_count = scan_count or settings.REDIS_REPORT_SCAN_COUNT
+    pause      = settings.REDIS_REPORT_PAUSE_MS / 1000 if pause is None else pause
+
+    started  = time.monotonic()
+    groups: dict[str, PrefixStats] = {}
+    scanned  = 0
+    complete = True
+
+    async for keys in _scan_batches(redis, scan_count):
+        keys = keys[: max_keys - scanned]
+        if keys:
+            async with redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.memory_usage(key, samples=_MEMORY_SAMPLES)
+                    pipe.ttl(key)
+                results = await pipe.execute()
+            for i, key in enumerate(keys):
+                size, ttl = results[2 * i], results[2 * i + 1]
+                if size is None:
+                    continue
+                name = key.decode() if isinstance(key, bytes) else key
+                groups.setdefault(prefix_of(name), PrefixStats()).add(int(size), int(ttl))
+            scanned += len(keys)
+        if scanned >= max_keys:
+            complete = False
+            break
+        if pause:
+            await asyncio.sleep(pause)
+
+    dbsize   = await redis.dbsize()
+    # Con el recorrido truncado, los totales se extrapolan al keyspace entero
+    scale    = 1.0 if complete or not scanned else max(dbsize / scanned, 1.0)
+
+    ordered = sorted(groups.items(), key=lambda item: item[1].bytes, reverse=True)
+    report  = {
+        "db":          settings.REDIS_DB_CACHE,
+        "dbsize":      dbsize,
+        "scanned":     scanned,
+        "complete":    complete,
+        "duration_ms": round((time.monotonic() - started) * 1000, 1),
+        "total_bytes": sum(stats.bytes for stats in groups.values()),
+        "prefixes":    {name: stats.as_dict(scale) for name, stats in ordered},
+    }
+    log.info(
+        "redis.keyspace_report.finished",
+        scanned=scanned,
+        complete=complete,
+        duration_ms=report["duration_ms"],
+    )
+    return report
+
+
+async def run_keyspace_report(max_keys: int | None = None) -> dict[str, Any]:
+    """
+    Informe sobre la DB de caché con el lock global: lanza ReportInProgress
+    si otro proceso ya está recorriendo el keyspace.
+    """
+    redis = redis_pools.client("app")
+    lock  = CacheKeys.keyspace_report_lock()
+    token = secrets.token_hex(8)
+    if not await redis.set(lock, token, nx=True, ex=CacheKeys.TTL_REPORT_LOCK):
+        raise ReportInProgress()
+    try:
+        return await keyspace_report(redis, max_keys=max_keys)
+    finally:
+        # Si el lock expiró durante el informe puede ser ya de otro proceso
+        await redis.eval(RELEASE_LOCK_LUA, 1, lock, token)
+
+
+def main() -> None:
+    import json
+
+    print(json.dumps(asyncio.run(run_keyspace_report()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
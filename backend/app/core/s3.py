@@ -1,7 +1,7 @@
 """
-app/core/minio.py
+app/core/s3.py
 
-Cliente MinIO para el dominio CV.
+Cliente de object storage (MinIO) para el dominio CV.
 
 Responsabilidades:
   - Subir PDFs generados al bucket 'cvs'
@@ -10,24 +10,73 @@ Responsabilidades:
   - Eliminar objetos (limpieza de PDFs expirados)
   - Garantizar que los buckets existen al arrancar (idempotente)
 
+Dos implementaciones de la misma interfaz (ObjectStorage):
+    AsyncS3Client   aioboto3, async nativo sobre un pool de conexiones
+                    HTTP keep-alive (STORAGE_MAX_POOL_CONNECTIONS). El
+                    cliente se abre en el primer uso y vive lo que el event
+                    loop: es el de la API.
+    MinIOClient     SDK oficial (síncrono) en hilos con asyncio.to_thread().
+                    Para Celery y scripts, que crean un event loop por tarea.
+
+STORAGE_CLIENT elige la del singleton `minio_client`.
+Benchmark: scripts/benchmark_storage_clients.py
+
+Subidas directas (avatares, previews): presign_*_upload devuelve una
+política de presigned POST (tipo y tamaño máximo) para que el navegador
+suba a uploads/<tipo>/<destino>/<token> en 'cv-assets' sin pasar por la
+API. complete_*_upload comprueba el objeto (HEAD) y lo copia en MinIO a
+su nombre definitivo: la API nunca tiene los bytes. Las subidas que no se
+completan caducan por una regla de ciclo de vida del bucket.
+
+Presigned URLs de descarga: se guardan en Redis por CV durante
+MINIO_PRESIGN_TTL - MINIO_PRESIGN_REFRESH_MARGIN segundos, así que un URL
+servido desde caché siempre tiene al menos ese margen de validez; pasado
+ese tiempo se firma otro. upload_pdf y delete_pdf borran el del CV (una
+nueva versión del PDF estrena URL). get_download_urls firma en lote los
+que faltan para listados (un MGET y, con el SDK de MinIO, un solo salto
+a hilo). Sin Redis se firma siempre.
+
+Expiración de PDFs: upload_pdf registra cv_id → ahora + PDF_EXPIRY_HOURS
+en un ZSET de Redis (CacheService.schedule_pdf_expiry). La limpieza
+(app/tasks/cleanup.py) saca solo las entradas vencidas, en lotes, y las
+borra con delete_pdfs: un DeleteObjects por cada 1000 objetos.
+
 Uso en servicios:
-    from app.core.minio import minio_client
+    from app.core.s3 import minio_client
 
     url = await minio_client.upload_pdf(cv_id, pdf_bytes)
     presigned = await minio_client.get_download_url(cv_id)
     await minio_client.delete_pdf(cv_id)
+    failed = await minio_client.delete_pdfs(cv_ids)      # borrado en lote
+    urls = await minio_client.get_download_urls(cv_ids)   # cv_id → URL
 """
 from __future__ import annotations
 
 import asyncio
 import io
-from datetime import timedelta
-from functools import lru_cache
+import re
+import secrets
+import time
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
 from uuid import UUID
 
+import aioboto3
+from aiobotocore.config import AioConfig
+from botocore.exceptions import ClientError
 from minio import Minio
+from minio.commonconfig import ENABLED, CopySource, Filter
+from minio.datatypes import PostPolicy
+from minio.deleteobjects import DeleteObject
 from minio.error import S3Error
+from minio.lifecycleconfig import Expiration, LifecycleConfig, Rule
+from redis.exceptions import RedisError
 
+from app.core.cache import CacheKeys, cache_service
 from app.core.config import settings
 from app.core.logging import get_logger
 
@@ -53,11 +102,284 @@ def _template_preview_name(template_slug: str) -> str:
     return f"templates/{template_slug}.png"
 
 
+def _pdf_disposition(cv_id: str | UUID) -> str:
+    """Content-Disposition de la descarga del PDF."""
+    return f'attachment; filename="cv-{cv_id}.pdf"'
+
+
+def _pending_upload_name(kind: str, target: str, token: str) -> str:
+    """Subida directa aún sin completar. Ej: 'uploads/avatars/<user>/<token>'"""
+    return f"{PENDING_UPLOAD_PREFIX}{kind}/{target}/{token}"
+
+
+# Trozos al leer un objeto en streaming
+STREAM_CHUNK_SIZE = 256 * 1024
+
+# Máximo de claves por DeleteObjects (límite de S3)
+DELETE_BATCH_SIZE = 1000
+
+# Subidas directas pendientes (caducan solas a los PENDING_UPLOAD_DAYS)
+PENDING_UPLOAD_PREFIX = "uploads/"
+PENDING_UPLOAD_DAYS   = 1
+_LIFECYCLE_RULE_ID    = "expire-pending-uploads"
+_UPLOAD_TOKEN_RE      = re.compile(r"[A-Za-z0-9_-]{16,64}")
+
+
+class UploadRejected(Exception):
+    """Subida directa no válida (tipo, tamaño, token o inexistente)."""
+
+
+@dataclass(frozen=True, slots=True)
+class PresignedUpload:
+    """Formulario de presigned POST: `fields` + el fichero, contra `url`."""
+
+    url: str
+    fields: dict[str, str]
+    token: str
+    max_bytes: int
+    expires_in: int
+
+
+@dataclass(frozen=True, slots=True)
+class StoredObject:
+    """Metadatos de un objeto (ETag sin comillas)."""
+
+    name: str
+    etag: str
+    size: int
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Interfaz común
+# ─────────────────────────────────────────────────────────────────────────────
+
+class ObjectStorage(ABC):
+    """Operaciones de storage del dominio CV, independientes del cliente."""
+
+    def __init__(self) -> None:
+        self._bucket_cvs    = settings.MINIO_BUCKET_CVS
+        self._bucket_assets = settings.MINIO_BUCKET_ASSETS
+
+    @abstractmethod
+    async def ensure_buckets(self) -> None: ...
+
+    @abstractmethod
+    async def upload_pdf(self, cv_id: str | UUID, pdf_bytes: bytes) -> str: ...
+
+    @abstractmethod
+    async def delete_pdf(self, cv_id: str | UUID) -> None: ...
+
+    @abstractmethod
+    async def pdf_exists(self, cv_id: str | UUID) -> bool: ...
+
+    @abstractmethod
+    async def stat_pdf(self, cv_id: str | UUID) -> StoredObject | None:
+        """Metadatos del PDF (un HEAD), o None si no existe."""
+
+    @abstractmethod
+    async def open_pdf(
+        self, cv_id: str | UUID
+    ) -> tuple[StoredObject, AsyncIterator[bytes]] | None:
+        """Descarga en streaming: metadatos y trozos, o None si no existe."""
+
+    @abstractmethod
+    async def upload_avatar(
+        self,
+        user_id: str | UUID,
+        image_bytes: bytes,
+        content_type: str = "image/jpeg",
+    ) -> str: ...
+
+    @abstractmethod
+    async def delete_avatar(self, user_id: str | UUID) -> None: ...
+
+    @abstractmethod
+    async def upload_template_preview(
+        self,
+        template_slug: str,
+        image_bytes: bytes,
+        content_type: str = "image/png",
+    ) -> str: ...
+
+    @abstractmethod
+    async def health_check(self) -> bool: ...
+
+    @abstractmethod
+    async def _presign_pdfs(self, cv_ids: list[str]) -> dict[str, str]:
+        """Firma URLs de descarga (sin caché): cv_id → URL."""
+
+    @abstractmethod
+    async def _remove_pdf_objects(self, object_names: list[str]) -> set[str]:
+        """Borra objetos de 'cvs' en lote. Retorna los que no se pudieron borrar."""
+
+    @abstractmethod
+    async def _presign_post(
+        self, object_name: str, content_type: str, max_bytes: int, expires_in: int
+    ) -> tuple[str, dict[str, str]]:
+        """Política de subida a 'cv-assets' para ese nombre: (url, campos)."""
+
+    @abstractmethod
+    async def _stat_asset(self, object_name: str) -> tuple[int, str] | None:
+        """(tamaño, content type) de un objeto de 'cv-assets', o None."""
+
+    @abstractmethod
+    async def _move_asset(self, source: str, object_name: str) -> None:
+        """Copia dentro de 'cv-assets' (en el servidor) y borra el origen."""
+
+    async def close(self) -> None:  # noqa: B027 — opcional: solo lo redefine quien tiene conexiones
+        """Libera conexiones (shutdown). Por defecto no hay nada que cerrar."""
+
+    # ── Subidas directas a 'cv-assets' (presigned POST) ───────────────────────
+
+    async def presign_avatar_upload(self, user_id: str | UUID, content_type: str) -> PresignedUpload:
+        """Política para que el navegador suba el avatar directamente."""
+        return await self._presign_asset_upload("avatars", str(user_id), content_type)
+
+    async def complete_avatar_upload(self, user_id: str | UUID, token: str) -> str:
+        """Publica el avatar subido con `token`. Retorna su URL pública."""
+        return await self._complete_asset_upload(
+            "avatars", str(user_id), token, _avatar_object_name(user_id)
+        )
+
+    async def presign_template_preview_upload(
+        self, template_slug: str, content_type: str
+    ) -> PresignedUpload:
+        """Política para subir el preview de una plantilla (admin)."""
+        return await self._presign_asset_upload("templates", template_slug, content_type)
+
+    async def complete_template_preview_upload(self, template_slug: str, token: str) -> str:
+        """Publica el preview subido con `token`. Retorna su URL pública."""
+        return await self._complete_asset_upload(
+            "templates", template_slug, token, _template_preview_name(template_slug)
+        )
+
+    async def _presign_asset_upload(
+        self, kind: str, target: str, content_type: str
+    ) -> PresignedUpload:
+        if content_type not in settings.ASSET_UPLOAD_CONTENT_TYPES:
+            raise UploadRejected(f"Content type no permitido: {content_type}")
+        token      = secrets.token_urlsafe(16)
+        max_bytes  = settings.ASSET_UPLOAD_MAX_BYTES
+        expires_in = settings.ASSET_UPLOAD_TTL
+        url, fields = await self._presign_post(
+            _pending_upload_name(kind, target, token), content_type, max_bytes, expires_in
+        )
+        log.debug("minio.asset_upload.presigned", kind=kind, target=target)
+        return PresignedUpload(url, fields, token, max_bytes, expires_in)
+
+    async def _complete_asset_upload(
+        self, kind: str, target: str, token: str, object_name: str
+    ) -> str:
+        if not _UPLOAD_TOKEN_RE.fullmatch(token):
+            raise UploadRejected("Token de subida no válido")
+        pending = _pending_upload_name(kind, target, token)
+        info    = await self._stat_asset(pending)
+        if info is None:
+            raise UploadRejected("No hay ninguna subida con ese token")
+
+        # La política ya lo impide; se comprueba por si cambió la configuración
+        size, content_type = info
+        if size > settings.ASSET_UPLOAD_MAX_BYTES or content_type not in settings.ASSET_UPLOAD_CONTENT_TYPES:
+            raise UploadRejected("El fichero subido no cumple los límites")
+
+        await self._move_asset(pending, object_name)
+        log.info("minio.asset_upload.completed", kind=kind, target=target, size_bytes=size)
+        return self._public_url(self._bucket_assets, object_name)
+
+    # ── Presigned URLs de descarga (con caché) ────────────────────────────────
+
+    async def get_download_url(self, cv_id: str | UUID) -> str:
+        """
+        Presigned URL de descarga para el PDF de un CV, válido al menos
+        MINIO_PRESIGN_REFRESH_MARGIN segundos más.
+        """
+        return (await self.get_download_urls([cv_id]))[str(cv_id)]
+
+    async def get_download_urls(self, cv_ids: list[str | UUID]) -> dict[str, str]:
+        """
+        Presigned URLs de varios CVs: un MGET a la caché y una firma en lote
+        de los que faltan.
+
+        Returns:
+            cv_id (str) → URL, en el orden recibido.
+        """
+        ids  = list(dict.fromkeys(str(cv_id) for cv_id in cv_ids))
+        keys = {cv_id: CacheKeys.presigned_pdf_url(cv_id) for cv_id in ids}
+        ttl  = settings.MINIO_PRESIGN_TTL - settings.MINIO_PRESIGN_REFRESH_MARGIN
+
+        urls: dict[str, str] = {}
+        if ttl > 0 and ids:
+            try:
+                found = await cache_service.get_many(list(keys.values()))
+                urls  = {cv_id: found[key] for cv_id, key in keys.items() if key in found}
+            except RedisError as exc:
+                log.warning("minio.presign_cache.unavailable", error=str(exc))
+
+        missing = [cv_id for cv_id in ids if cv_id not in urls]
+        if missing:
+            signed = await self._presign_pdfs(missing)
+            urls.update(signed)
+            if ttl > 0:
+                try:
+                    await cache_service.set_many({keys[c]: url for c, url in signed.items()}, ttl)
+                except RedisError as exc:
+                    log.warning("minio.presign_cache.unavailable", error=str(exc))
+            log.debug(
+                "minio.pdf.presigned",
+                signed=len(missing),
+                cached=len(ids) - len(missing),
+                ttl=settings.MINIO_PRESIGN_TTL,
+            )
+        return {cv_id: urls[cv_id] for cv_id in ids}
+
+    async def _forget_download_url(self, *cv_ids: str | UUID) -> None:
+        """Descarta el URL cacheado de los CVs (su PDF ha cambiado)."""
+        try:
+            await cache_service.delete(*map(CacheKeys.presigned_pdf_url, cv_ids))
+        except RedisError as exc:
+            # El URL apunta al mismo objeto: como mucho se sirve hasta caducar
+            log.warning("minio.presign_cache.unavailable", error=str(exc))
+
+    async def _pdf_uploaded(self, cv_id: str | UUID) -> None:
+        """Tras subir un PDF: nuevo URL y nueva fecha de expiración."""
+        await self._forget_download_url(cv_id)
+        expires_at = time.time() + settings.PDF_EXPIRY_HOURS * 3600
+        try:
+            await cache_service.schedule_pdf_expiry(cv_id, expires_at)
+        except RedisError as exc:
+            # Sin entrada en el índice el PDF no se limpia solo
+            log.error("minio.pdf_expiry.unavailable", cv_id=str(cv_id), error=str(exc))
+
+    async def delete_pdfs(self, cv_ids: list[str]) -> list[str]:
+        """
+        Borra los PDFs de varios CVs con DeleteObjects (hasta 1000 por
+        request). Borrar uno que ya no existe no es un error.
+
+        Returns:
+            Los cv_id cuyo PDF no se pudo borrar.
+        """
+        names  = {_cv_object_name(cv_id): str(cv_id) for cv_id in cv_ids}
+        failed = {names[name] for name in await self._remove_pdf_objects(list(names))}
+        deleted = [cv_id for cv_id in names.values() if cv_id not in failed]
+        if deleted:
+            await self._forget_download_url(*deleted)
+        log.info("minio.pdf.bulk_deleted", deleted=len(deleted), failed=len(failed))
+        return sorted(failed)
+
+    def _public_url(self, bucket: str, object_name: str) -> str:
+        """
+        Construye la URL pública de un objeto en un bucket sin acceso restringido.
+        Para assets (avatares, previews) que son de lectura pública.
+        """
+        scheme = "https" if settings.MINIO_SECURE else "http"
+        return f"{scheme}://{settings.MINIO_ENDPOINT}/{bucket}/{object_name}"
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # MinIOClient
 # ─────────────────────────────────────────────────────────────────────────────
 
-class MinIOClient:
+class MinIOClient(ObjectStorage):
     """
     Wrapper sobre el cliente oficial de MinIO.
 
@@ -67,14 +389,13 @@ class MinIOClient:
     """
 
     def __init__(self) -> None:
+        super().__init__()
         self._client = Minio(
             endpoint=settings.MINIO_ENDPOINT,
             access_key=settings.MINIO_ACCESS_KEY,
             secret_key=settings.MINIO_SECRET_KEY.get_secret_value(),
             secure=settings.MINIO_SECURE,
         )
-        self._bucket_cvs    = settings.MINIO_BUCKET_CVS
-        self._bucket_assets = settings.MINIO_BUCKET_ASSETS
 
     # ─────────────────────────────────────────────────────────────────────────
     # Lifecycle — llamar en el startup del lifespan
@@ -87,6 +408,26 @@ class MinIOClient:
         """
         for bucket in (self._bucket_cvs, self._bucket_assets):
             await asyncio.to_thread(self._ensure_bucket_sync, bucket)
+        await asyncio.to_thread(self._ensure_upload_lifecycle_sync)
+
+    def _ensure_upload_lifecycle_sync(self) -> None:
+        """
+        Añade (o actualiza) la regla de subidas pendientes en el lifecycle de
+        cv-assets. Las demás reglas del bucket se conservan: SetBucketLifecycle
+        reemplaza la configuración entera.
+        """
+        current = self._client.get_bucket_lifecycle(self._bucket_assets)
+        rules = [
+            rule for rule in (current.rules if current else [])
+            if rule.rule_id != _LIFECYCLE_RULE_ID
+        ]
+        rules.append(Rule(
+            ENABLED,
+            rule_filter=Filter(prefix=PENDING_UPLOAD_PREFIX),
+            rule_id=_LIFECYCLE_RULE_ID,
+            expiration=Expiration(days=PENDING_UPLOAD_DAYS),
+        ))
+        self._client.set_bucket_lifecycle(self._bucket_assets, LifecycleConfig(rules))
 
     def _ensure_bucket_sync(self, bucket: str) -> None:
         try:
@@ -130,32 +471,52 @@ class MinIOClient:
                 "generator": settings.APP_NAME,
             },
         )
+        await self._pdf_uploaded(cv_id)
 
         log.info("minio.pdf.uploaded", cv_id=str(cv_id), size_bytes=size)
         return object_name
 
-    async def get_download_url(self, cv_id: str | UUID) -> str:
+    async def _presign_pdfs(self, cv_ids: list[str]) -> dict[str, str]:
         """
-        Genera un presigned URL de descarga para el PDF de un CV.
-        El URL es válido durante settings.MINIO_PRESIGN_TTL segundos.
+        Firma los URLs en un único salto a hilo. Cada URL es válido durante
+        settings.MINIO_PRESIGN_TTL segundos.
         """
-        object_name = _cv_object_name(cv_id)
-        url = await asyncio.to_thread(
-            self._client.presigned_get_object,
+        return await asyncio.to_thread(self._presign_pdfs_sync, cv_ids)
+
+    def _presign_pdfs_sync(self, cv_ids: list[str]) -> dict[str, str]:
+        expires = timedelta(seconds=settings.MINIO_PRESIGN_TTL)
+        return {
+            cv_id: self._client.presigned_get_object(
+                self._bucket_cvs,
+                _cv_object_name(cv_id),
+                expires=expires,
+                response_headers={
+                    "response-content-disposition": _pdf_disposition(cv_id),
+                },
+            )
+            for cv_id in cv_ids
+        }
+
+    async def _remove_pdf_objects(self, object_names: list[str]) -> set[str]:
+        return await asyncio.to_thread(self._remove_pdf_objects_sync, object_names)
+
+    def _remove_pdf_objects_sync(self, object_names: list[str]) -> set[str]:
+        # remove_objects agrupa de 1000 en 1000 y es perezoso: hay que
+        # consumir los errores para que se ejecute
+        errors = self._client.remove_objects(
             self._bucket_cvs,
-            object_name,
-            expires=timedelta(seconds=settings.MINIO_PRESIGN_TTL),
-            response_headers={
-                "response-content-disposition": (
-                    f'attachment; filename="cv-{cv_id}.pdf"'
-                ),
-            },
+            (DeleteObject(name) for name in object_names),
         )
-        log.debug("minio.pdf.presigned", cv_id=str(cv_id), ttl=settings.MINIO_PRESIGN_TTL)
-        return url
+        failed: set[str] = set()
+        for error in errors:
+            if error.code != "NoSuchKey":
+                log.error("minio.pdf.delete_error", object_name=error.name, error=error.message)
+                if error.name:
+                    failed.add(error.name)
+        return failed
 
     async def delete_pdf(self, cv_id: str | UUID) -> None:
-        """Elimina el PDF de MinIO. Llamado por la tarea de limpieza."""
+        """Elimina el PDF de MinIO (la limpieza periódica usa delete_pdfs)."""
         object_name = _cv_object_name(cv_id)
         try:
             await asyncio.to_thread(
@@ -163,6 +524,7 @@ class MinIOClient:
                 self._bucket_cvs,
                 object_name,
             )
+            await self._forget_download_url(cv_id)
             log.info("minio.pdf.deleted", cv_id=str(cv_id))
         except S3Error as exc:
             # Si ya no existe, no es un error crítico
@@ -185,6 +547,46 @@ class MinIOClient:
         except S3Error:
             return False
 
+    async def stat_pdf(self, cv_id: str | UUID) -> StoredObject | None:
+        object_name = _cv_object_name(cv_id)
+        try:
+            stat = await asyncio.to_thread(
+                self._client.stat_object,
+                self._bucket_cvs,
+                object_name,
+            )
+        except S3Error:
+            return None
+        return StoredObject(object_name, (stat.etag or "").strip('"'), stat.size or 0)
+
+    async def open_pdf(
+        self, cv_id: str | UUID
+    ) -> tuple[StoredObject, AsyncIterator[bytes]] | None:
+        object_name = _cv_object_name(cv_id)
+        try:
+            response = await asyncio.to_thread(
+                self._client.get_object,
+                self._bucket_cvs,
+                object_name,
+            )
+        except S3Error:
+            return None
+        info = StoredObject(
+            object_name,
+            response.headers.get("ETag", "").strip('"'),
+            int(response.headers.get("Content-Length", 0)),
+        )
+
+        async def chunks() -> AsyncIterator[bytes]:
+            try:
+                while chunk := await asyncio.to_thread(response.read, STREAM_CHUNK_SIZE):
+                    yield chunk
+            finally:
+                response.close()
+                response.release_conn()
+
+        return info, chunks()
+
     # ─────────────────────────────────────────────────────────────────────────
     # Avatares — bucket 'cv-assets'
     # ─────────────────────────────────────────────────────────────────────────
@@ -231,6 +633,41 @@ class MinIOClient:
             if exc.code != "NoSuchKey":
                 raise
 
+    async def _presign_post(
+        self, object_name: str, content_type: str, max_bytes: int, expires_in: int
+    ) -> tuple[str, dict[str, str]]:
+        policy = PostPolicy(
+            self._bucket_assets,
+            datetime.now(timezone.utc) + timedelta(seconds=expires_in),
+        )
+        policy.add_equals_condition("key", object_name)
+        policy.add_equals_condition("Content-Type", content_type)
+        policy.add_content_length_range_condition(1, max_bytes)
+        fields = await asyncio.to_thread(self._client.presigned_post_policy, policy)
+        scheme = "https" if settings.MINIO_SECURE else "http"
+        url    = f"{scheme}://{settings.MINIO_ENDPOINT}/{self._bucket_assets}"
+        return url, {"key": object_name, "Content-Type": content_type, **fields}
+
+    async def _stat_asset(self, object_name: str) -> tuple[int, str] | None:
+        try:
+            stat = await asyncio.to_thread(
+                self._client.stat_object,
+                self._bucket_assets,
+                object_name,
+            )
+        except S3Error:
+            return None
+        return stat.size or 0, stat.content_type or ""
+
+    async def _move_asset(self, source: str, object_name: str) -> None:
+        await asyncio.to_thread(
+            self._client.copy_object,
+            self._bucket_assets,
+            object_name,
+            CopySource(self._bucket_assets, source),
+        )
+        await asyncio.to_thread(self._client.remove_object, self._bucket_assets, source)
+
     # ─────────────────────────────────────────────────────────────────────────
     # Previews de plantillas — bucket 'cv-assets'
     # ─────────────────────────────────────────────────────────────────────────
@@ -268,23 +705,317 @@ class MinIOClient:
     # Helpers
     # ─────────────────────────────────────────────────────────────────────────
 
-    def _public_url(self, bucket: str, object_name: str) -> str:
+    async def health_check(self) -> bool:
+        """Verifica que MinIO esté disponible listando los buckets."""
+        try:
+            await asyncio.to_thread(list, self._client.list_buckets())
+            return True
+        except Exception as exc:
+            log.error("minio.health_check.failed", error=str(exc))
+            return False
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# AsyncS3Client
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Códigos de "no existe" de S3 (HEAD devuelve solo el status)
+_NOT_FOUND = frozenset({"404", "NoSuchKey", "NoSuchBucket", "NotFound"})
+
+
+def _error_code(exc: ClientError) -> str:
+    return str(exc.response.get("Error", {}).get("Code", ""))
+
+
+class AsyncS3Client(ObjectStorage):
+    """
+    Cliente S3 async nativo (aioboto3) contra MinIO.
+
+    Un único cliente por proceso, abierto en el primer uso, con un pool de
+    hasta STORAGE_MAX_POOL_CONNECTIONS conexiones keep-alive: las
+    operaciones no ocupan hilos y firmar una URL no sale del event loop.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._session = aioboto3.Session()
+        self._config  = AioConfig(
+            max_pool_connections=settings.STORAGE_MAX_POOL_CONNECTIONS,
+            connect_timeout=settings.STORAGE_CONNECT_TIMEOUT,
+            read_timeout=settings.STORAGE_READ_TIMEOUT,
+            retries={"max_attempts": 3, "mode": "standard"},
+            signature_version="s3v4",
+            s3={"addressing_style": "path"},
+            connector_args={"keepalive_timeout": 30},
+        )
+        self._client: Any = None
+        self._stack: AsyncExitStack | None = None
+        self._lock = asyncio.Lock()
+
+    async def _s3(self) -> Any:
+        """Cliente compartido (se crea una vez, bajo lock)."""
+        if self._client is None:
+            async with self._lock:
+                if self._client is None:
+                    stack  = AsyncExitStack()
+                    scheme = "https" if settings.MINIO_SECURE else "http"
+                    self._client = await stack.enter_async_context(
+                        self._session.client(
+                            "s3",
+                            endpoint_url=f"{scheme}://{settings.MINIO_ENDPOINT}",
+                            aws_access_key_id=settings.MINIO_ACCESS_KEY,
+                            aws_secret_access_key=settings.MINIO_SECRET_KEY.get_secret_value(),
+                            region_name="us-east-1",  # MinIO lo ignora, pero la firma lo necesita
+                            config=self._config,
+                        )
+                    )
+                    self._stack = stack
+        return self._client
+
+    async def close(self) -> None:
+        if self._stack is not None:
+            await self._stack.aclose()
+        self._stack, self._client = None, None
+
+    async def _put(
+        self,
+        bucket: str,
+        object_name: str,
+        data: bytes,
+        content_type: str,
+        metadata: dict[str, str] | None = None,
+    ) -> None:
+        s3 = await self._s3()
+        await s3.put_object(
+            Bucket=bucket,
+            Key=object_name,
+            Body=data,
+            ContentType=content_type,
+            Metadata=metadata or {},
+        )
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+
+    async def ensure_buckets(self) -> None:
+        """Crea los buckets necesarios si no existen (idempotente)."""
+        s3 = await self._s3()
+        for bucket in (self._bucket_cvs, self._bucket_assets):
+            try:
+                await s3.head_bucket(Bucket=bucket)
+                log.debug("minio.bucket.exists", bucket=bucket)
+            except ClientError as exc:
+                if _error_code(exc) not in _NOT_FOUND:
+                    log.error("minio.bucket.error", bucket=bucket, error=str(exc))
+                    raise
+                await s3.create_bucket(Bucket=bucket)
+                log.info("minio.bucket.created", bucket=bucket)
+        await self._ensure_upload_lifecycle(s3)
+
+    async def _ensure_upload_lifecycle(self, s3: Any) -> None:
         """
-        Construye la URL pública de un objeto en un bucket sin acceso restringido.
-        Para assets (avatares, previews) que son de lectura pública.
+        Añade (o actualiza) la regla de subidas pendientes en el lifecycle de
+        cv-assets conservando las demás reglas del bucket.
         """
-        scheme = "https" if settings.MINIO_SECURE else "http"
-        return f"{scheme}://{settings.MINIO_ENDPOINT}/{bucket}/{object_name}"
+        try:
+            current = await s3.get_bucket_lifecycle_configuration(Bucket=self._bucket_assets)
+            rules = current.get("Rules", [])
+        except ClientError as exc:
+            if _error_code(exc) != "NoSuchLifecycleConfiguration":
+                raise
+            rules = []
+        rules = [rule for rule in rules if rule.get("ID") != _LIFECYCLE_RULE_ID]
+        rules.append({
+            "ID": _LIFECYCLE_RULE_ID,
+            "Filter": {"Prefix": PENDING_UPLOAD_PREFIX},
+            "Status": "Enabled",
+            "Expiration": {"Days": PENDING_UPLOAD_DAYS},
+        })
+        await s3.put_bucket_lifecycle_configuration(
+            Bucket=self._bucket_assets,
+            LifecycleConfiguration={"Rules": rules},
+        )
+
+    # ── PDFs — bucket 'cvs' ───────────────────────────────────────────────────
+
+    async def upload_pdf(self, cv_id: str | UUID, pdf_bytes: bytes) -> str:
+        object_name = _cv_object_name(cv_id)
+        await self._put(
+            self._bucket_cvs,
+            object_name,
+            pdf_bytes,
+            "application/pdf",
+            metadata={"cv-id": str(cv_id), "generator": settings.APP_NAME},
+        )
+        await self._pdf_uploaded(cv_id)
+        log.info("minio.pdf.uploaded", cv_id=str(cv_id), size_bytes=len(pdf_bytes))
+        return object_name
+
+    async def _presign_pdfs(self, cv_ids: list[str]) -> dict[str, str]:
+        # Firmar es local (HMAC): no hay round-trip a MinIO
+        s3   = await self._s3()
+        urls = await asyncio.gather(*(
+            s3.generate_presigned_url(
+                "get_object",
+                Params={
+                    "Bucket": self._bucket_cvs,
+                    "Key": _cv_object_name(cv_id),
+                    "ResponseContentDisposition": _pdf_disposition(cv_id),
+                },
+                ExpiresIn=settings.MINIO_PRESIGN_TTL,
+            )
+            for cv_id in cv_ids
+        ))
+        return dict(zip(cv_ids, urls, strict=True))
+
+    async def _remove_pdf_objects(self, object_names: list[str]) -> set[str]:
+        s3     = await self._s3()
+        failed = set()
+        for start in range(0, len(object_names), DELETE_BATCH_SIZE):
+            batch    = object_names[start : start + DELETE_BATCH_SIZE]
+            response = await s3.delete_objects(
+                Bucket=self._bucket_cvs,
+                Delete={"Objects": [{"Key": name} for name in batch], "Quiet": True},
+            )
+            for error in response.get("Errors", []):
+                log.error("minio.pdf.delete_error", object_name=error["Key"], error=error.get("Message"))
+                failed.add(error["Key"])
+        return failed
+
+    async def delete_pdf(self, cv_id: str | UUID) -> None:
+        # DELETE de S3 es idempotente: borrar algo que no existe no falla
+        s3 = await self._s3()
+        try:
+            await s3.delete_object(Bucket=self._bucket_cvs, Key=_cv_object_name(cv_id))
+            log.info("minio.pdf.deleted", cv_id=str(cv_id))
+        except ClientError as exc:
+            log.error("minio.pdf.delete_error", cv_id=str(cv_id), error=str(exc))
+            raise
+        await self._forget_download_url(cv_id)
+
+    async def pdf_exists(self, cv_id: str | UUID) -> bool:
+        s3 = await self._s3()
+        try:
+            await s3.head_object(Bucket=self._bucket_cvs, Key=_cv_object_name(cv_id))
+            return True
+        except ClientError:
+            return False
+
+    async def stat_pdf(self, cv_id: str | UUID) -> StoredObject | None:
+        s3 = await self._s3()
+        object_name = _cv_object_name(cv_id)
+        try:
+            head = await s3.head_object(Bucket=self._bucket_cvs, Key=object_name)
+        except ClientError as exc:
+            if _error_code(exc) in _NOT_FOUND:
+                return None
+            raise
+        return StoredObject(object_name, head["ETag"].strip('"'), head["ContentLength"])
+
+    async def open_pdf(
+        self, cv_id: str | UUID
+    ) -> tuple[StoredObject, AsyncIterator[bytes]] | None:
+        s3 = await self._s3()
+        object_name = _cv_object_name(cv_id)
+        try:
+            response = await s3.get_object(Bucket=self._bucket_cvs, Key=object_name)
+        except ClientError as exc:
+            if _error_code(exc) in _NOT_FOUND:
+                return None
+            raise
+        info = StoredObject(object_name, response["ETag"].strip('"'), response["ContentLength"])
+        body = response["Body"]
+
+        async def chunks() -> AsyncIterator[bytes]:
+            try:
+                async for chunk in body.iter_chunks(STREAM_CHUNK_SIZE):
+                    yield chunk
+            finally:
+                body.close()
+
+        return info, chunks()
+
+    # ── Avatares y previews — bucket 'cv-assets' ──────────────────────────────
+
+    async def upload_avatar(
+        self,
+        user_id: str | UUID,
+        image_bytes: bytes,
+        content_type: str = "image/jpeg",
+    ) -> str:
+        object_name = _avatar_object_name(user_id)
+        await self._put(self._bucket_assets, object_name, image_bytes, content_type)
+        log.info("minio.avatar.uploaded", user_id=str(user_id))
+        return self._public_url(self._bucket_assets, object_name)
+
+    async def delete_avatar(self, user_id: str | UUID) -> None:
+        s3 = await self._s3()
+        await s3.delete_object(Bucket=self._bucket_assets, Key=_avatar_object_name(user_id))
+        log.info("minio.avatar.deleted", user_id=str(user_id))
+
+    async def upload_template_preview(
+        self,
+        template_slug: str,
+        image_bytes: bytes,
+        content_type: str = "image/png",
+    ) -> str:
+        object_name = _template_preview_name(template_slug)
+        await self._put(self._bucket_assets, object_name, image_bytes, content_type)
+        log.info("minio.template_preview.uploaded", slug=template_slug)
+        return self._public_url(self._bucket_assets, object_name)
+
+    async def _presign_post(
+        self, object_name: str, content_type: str, max_bytes: int, expires_in: int
+    ) -> tuple[str, dict[str, str]]:
+        s3   = await self._s3()
+        post = await s3.generate_presigned_post(
+            self._bucket_assets,
+            object_name,
+            Fields={"Content-Type": content_type},
+            Conditions=[
+                {"Content-Type": content_type},
+                ["content-length-range", 1, max_bytes],
+            ],
+            ExpiresIn=expires_in,
+        )
+        return post["url"], post["fields"]
+
+    async def _stat_asset(self, object_name: str) -> tuple[int, str] | None:
+        s3 = await self._s3()
+        try:
+            head = await s3.head_object(Bucket=self._bucket_assets, Key=object_name)
+        except ClientError as exc:
+            if _error_code(exc) in _NOT_FOUND:
+                return None
+            raise
+        return head["ContentLength"], head.get("ContentType", "")
+
+    async def _move_asset(self, source: str, object_name: str) -> None:
+        s3 = await self._s3()
+        await s3.copy_object(
+            Bucket=self._bucket_assets,
+            Key=object_name,
+            CopySource={"Bucket": self._bucket_assets, "Key": source},
+        )
+        await s3.delete_object(Bucket=self._bucket_assets, Key=source)
 
     async def health_check(self) -> bool:
         """Verifica que MinIO esté disponible listando los buckets."""
         try:
-            await asyncio.to_thread(list, self._client.list_buckets())
+            s3 = await self._s3()
+            await s3.list_buckets()
             return True
         except Exception as exc:
             log.error("minio.health_check.failed", error=str(exc))
             return False
 
 
+def build_object_storage(client: str | None = None) -> ObjectStorage:
+    """Implementación según STORAGE_CLIENT ("aioboto3" | "minio")."""
+    client = client or settings.STORAGE_CLIENT
+    if client == "minio":
+        return MinIOClient()
+    return AsyncS3Client()
+
+
 # ── Singleton ─────────────────────────────────────────────────────────────────
-minio_client = MinIOClient()
+minio_client: ObjectStorage = build_object_storage()
@@ -47,7 +47,7 @@ async def require_api_key(
     Lanza HTTP 403 si la clave está ausente o es incorrecta.
     Usa ``secrets.compare_digest`` para evitar ataques de timing.
     """
-    if not api_key or not secrets.compare_digest(api_key, settings.SECRET_KEY):
+    if not api_key or not secrets.compare_digest(api_key, settings.SECRET_KEY.get_secret_value()):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Invalid or missing API key. Include 'X-API-Key' header.",
@@ -63,7 +63,7 @@ async def require_admin_key(
 
     Lanza HTTP 403 si la clave está ausente o es incorrecta.
     """
-    if not admin_key or not secrets.compare_digest(admin_key, settings.SECRET_KEY):
+    if not admin_key or not secrets.compare_digest(admin_key, settings.SECRET_KEY.get_secret_value()):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Invalid or missing admin key. Include 'X-Admin-Key' header.",
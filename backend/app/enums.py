@@ -4,4 +4,27 @@ from enum import Enum, StrEnum
 class Environment(StrEnum):
     DEVELOPMENT = "development"
     STAGING     = "staging"
-    PRODUCTION  = "production"
\ No newline at end of file
+    PRODUCTION  = "production"
+
+
+class RenderEngineName(StrEnum):
+    """Motores disponibles para renderizar el PDF de un CV."""
+
+    WEASYPRINT = "weasyprint"   # HTML + CSS completo (layouts ricos)
+    DIRECT     = "direct"       # Texto dibujado directamente (ATS, una columna)
+
+
+class RateLimitAlgorithm(StrEnum):
+    """Algoritmos del rate limiter (ver app/middlewares/rate_limit.py)."""
+
+    SLIDING_LOG     = "sliding_log"      # Sorted set: exacto, O(límite) por clave
+    SLIDING_COUNTER = "sliding_counter"  # Dos buckets ponderados, O(1)
+    GCRA            = "gcra"             # Generic cell rate algorithm, O(1)
+
+
+class RateLimitIdentity(StrEnum):
+    """Origen de la identidad del cliente en las reglas de rate limit."""
+
+    IP      = "ip"       # X-Forwarded-For o IP directa
+    USER    = "user"     # X-User-Id (sin él, la IP)
+    API_KEY = "api_key"  # X-API-Key válida, hasheada (si no, la IP)
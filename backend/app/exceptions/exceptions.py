@@ -31,6 +31,7 @@ def _build_json_response(
     category: str,
     description: str,
     exc: Exception = None,
+    headers: dict[str, str] | None = None,
 ) -> JSONResponse:
     """
     Centraliza la creación de respuestas de error, generación de UUID y logging.
@@ -68,7 +69,9 @@ def _build_json_response(
         message=error_detail,
     )
 
-    return JSONResponse(status_code=http_code, content=response_content.model_dump())
+    return JSONResponse(
+        status_code=http_code, content=response_content.model_dump(), headers=headers
+    )
 
 
 def _extract_object_from_request(request: Request) -> str:
@@ -116,6 +119,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         http_code=exc.status_code,
         category="http_error",
         description=str(exc.detail),
+        headers=getattr(exc, "headers", None),
     )
 
 
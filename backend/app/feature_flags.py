@@ -1,7 +1,190 @@
+"""
+app/feature_flags.py
+
+Feature flags dinámicos, evaluados en memoria.
+
+Las reglas viven en Postgres (tabla `feature_flags`, editable desde el
+admin) y cada proceso guarda una versión compilada. Evaluar un flag es una
+función pura del nombre y del X-User-Id: sin E/S, del orden de
+microsegundos, apta para rutas calientes.
+
+Reglas (en este orden):
+    1. enabled = False                → apagado para todos
+    2. user_id en allow_list          → activo
+    3. rollout_percentage             → activo si el bucket del usuario
+                                        (hash estable de flag + user_id,
+                                        0-99) es menor que el porcentaje
+
+Los flags sin fila en la tabla usan FEATURE_FLAGS (valores por defecto
+del código).
+
+Distribución: las reglas se cachean con CacheService.get_or_set (L1 del
+proceso + Redis). setup_feature_flags() las compila al arrancar (lifespan
+y cada worker de Celery). Cualquier cambio borra la clave y publica la
+invalidación: el proceso que escribe recompila en el acto y el resto al
+recibir la invalidación L1 (o en su siguiente refresh_feature_flags() si
+no escucha el canal, como los workers de Celery).
+
+Uso en rutas:
+    from app.feature_flags import FeatureFlagsDep
+
+    async def route(flags: FeatureFlagsDep, user_id: UUID = Depends(get_user_id)):
+        if flags.is_enabled("use_phone_number", user_id): ...
+
+Uso fuera de una petición (reglas compiladas más recientes):
+    from app.feature_flags import is_enabled
+    is_enabled("use_phone_number", user_id)
+"""
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass
+from typing import Annotated, Any
+from uuid import UUID
+
+from fastapi import Depends
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.logging import get_logger
+
+log = get_logger(__name__)
+
 FEATURE_FLAGS = {
 "use_phone_number": False,
 }
 
 
-def is_enabled(flag_name: str) -> bool:
-    return FEATURE_FLAGS.get(flag_name, False)
\ No newline at end of file
+# ─────────────────────────────────────────────────────────────────────────────
+# Reglas compiladas
+# ─────────────────────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True, slots=True)
+class CompiledFlag:
+    enabled: bool
+    rollout_percentage: int
+    allow_list: frozenset[str]
+
+
+def rollout_bucket(flag_name: str, user_id: str) -> int:
+    """Bucket 0-99 del usuario para un flag (estable entre procesos)."""
+    return zlib.crc32(f"{flag_name}:{user_id}".encode()) % 100
+
+
+class FlagRuleset:
+    """Conjunto de reglas compiladas. Inmutable: se sustituye entero."""
+
+    __slots__ = ("_flags", "_defaults")
+
+    def __init__(
+        self,
+        rules: dict[str, dict[str, Any]] | None = None,
+        defaults: dict[str, bool] | None = None,
+    ) -> None:
+        self._defaults = dict(FEATURE_FLAGS if defaults is None else defaults)
+        self._flags: dict[str, CompiledFlag] = {
+            name: CompiledFlag(
+                enabled=bool(rule.get("enabled", False)),
+                rollout_percentage=max(0, min(100, int(rule.get("rollout_percentage", 100)))),
+                allow_list=frozenset(str(u) for u in rule.get("allow_list") or ()),
+            )
+            for name, rule in (rules or {}).items()
+        }
+
+    def is_enabled(self, flag_name: str, user_id: str | UUID | None = None) -> bool:
+        flag = self._flags.get(flag_name)
+        if flag is None:
+            return self._defaults.get(flag_name, False)
+        if not flag.enabled:
+            return False
+        if flag.rollout_percentage >= 100:
+            return True
+        if user_id is None:
+            return False
+        user_id = str(user_id)
+        if user_id in flag.allow_list:
+            return True
+        return rollout_bucket(flag_name, user_id) < flag.rollout_percentage
+
+    def names(self) -> list[str]:
+        return sorted(self._flags.keys() | self._defaults.keys())
+
+
+# Última versión compilada en este proceso y las reglas de las que salió
+_ruleset = FlagRuleset()
+_compiled_from: Any = None
+
+
+def is_enabled(flag_name: str, user_id: str | UUID | None = None) -> bool:
+    """Evalúa un flag con las reglas compiladas más recientes del proceso."""
+    return _ruleset.is_enabled(flag_name, user_id)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Carga y distribución
+# ─────────────────────────────────────────────────────────────────────────────
+
+async def _read_flag_rules() -> dict[str, dict[str, Any]]:
+    """Todas las reglas en una consulta, con su propia sesión."""
+    from app.core.db import a_engine
+    from app.models.feature_flag import FeatureFlag
+
+    async with AsyncSession(a_engine) as session:
+        rows = (await session.exec(select(FeatureFlag))).all()
+    return {
+        row.key: {
+            "enabled": row.enabled,
+            "rollout_percentage": row.rollout_percentage,
+            "allow_list": list(row.allow_list or []),
+        }
+        for row in rows
+    }
+
+
+async def refresh_feature_flags() -> FlagRuleset:
+    """
+    Reglas vigentes. Con las reglas en la L1 del proceso no hay E/S; solo
+    se recompila cuando cambian (otro objeto tras una invalidación).
+    """
+    global _ruleset, _compiled_from
+    from app.core.cache import CacheKeys, cache_service
+
+    try:
+        rules = await cache_service.get_or_set(
+            CacheKeys.feature_flags(), _read_flag_rules, CacheKeys.TTL_FEATURE_FLAGS
+        )
+    except Exception as exc:
+        # Sin Redis/Postgres se siguen usando las últimas reglas compiladas
+        log.warning("feature_flags.refresh_failed", error=str(exc))
+        return _ruleset
+    if rules is not _compiled_from:
+        _ruleset, _compiled_from = FlagRuleset(rules), rules
+    return _ruleset
+
+
+async def setup_feature_flags() -> None:
+    """
+    Compila las reglas del proceso y las recompila con cada invalidación
+    L1 de la clave. Llamar en el lifespan y al arrancar cada worker.
+    """
+    from app.core.cache import CacheKeys, on_l1_invalidation
+
+    on_l1_invalidation(CacheKeys.feature_flags(), refresh_feature_flags)
+    ruleset = await refresh_feature_flags()
+    log.info("feature_flags.loaded", flags=len(ruleset.names()))
+
+
+async def get_feature_flags() -> FlagRuleset:
+    """Dependency de FastAPI con las reglas vigentes."""
+    return await refresh_feature_flags()
+
+
+FeatureFlagsDep = Annotated[FlagRuleset, Depends(get_feature_flags)]
+
+
+async def invalidate_feature_flags() -> None:
+    """Tras cambiar una regla: borra la caché y recompila en este proceso."""
+    from app.core.cache import CacheKeys, cache_service
+
+    await cache_service.delete(CacheKeys.feature_flags())
+    await refresh_feature_flags()
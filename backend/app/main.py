@@ -17,11 +17,15 @@ from app.middlewares import setup_middlewares
 from app.schemas import WelcomeResponse
 
 from app.core.cache import setup_cache, teardown_cache
+from app.core.cache_invalidation import deferred_invalidation
+from app.core.cache_warmup import start_cache_warmup, stop_cache_warmup
 from app.core.config import settings
 from app.core.db import check_database, a_engine
 from app.core.logging import get_logger, setup_logging
 from app.core.s3 import minio_client
 from app.core.redis import setup_redis, teardown_redis, check_redis
+from app.feature_flags import setup_feature_flags
+from app.services.reference_data import reload_reference_bundle
 
 log = get_logger(__name__)
 
@@ -52,6 +56,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     await setup_cache()
     log.info("app.cache.ready")
 
+    # 3b. Feature flags (reglas compiladas en el proceso)
+    await setup_feature_flags()
+
     # 4. MinIO — verificar conexión y crear buckets si no existen
     minio_ok = await minio_client.health_check()
     if not minio_ok:
@@ -59,15 +66,27 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     await minio_client.ensure_buckets()
     log.info("app.minio.ready")
 
+    # 5. Bundle de datos de referencia (precalculado, versionado por hash)
+    bundle = reload_reference_bundle()
+    log.info("app.reference_bundle.ready", version=bundle.version, size=len(bundle.body))
+
+    # 6. Precalentamiento de caché (en segundo plano, un solo worker)
+    start_cache_warmup(app)
+
     log.info("app.started")
     yield
 
     # ── SHUTDOWN ──────────────────────────────────────────────────────────────
     log.info("app.stopping")
 
+    await stop_cache_warmup()
+    await deferred_invalidation.flush()
     await teardown_cache()
     log.info("app.cache.closed")
 
+    await minio_client.close()
+    log.info("app.minio.closed")
+
     await a_engine.dispose()
     log.info("app.db.closed")
 
@@ -5,7 +5,8 @@ Este módulo contiene todos los middlewares HTTP personalizados que se aplican
 a la aplicación FastAPI para agregar funcionalidad transversal.
 
 Middlewares disponibles:
-    - invalidate_cache_on_write: Invalida caché automáticamente en operaciones de escritura
+    - invalidate_cache_on_write: Invalida caché (diferido) en operaciones de escritura
+    - RateLimitMiddleware: Rate limiting ASGI por tabla de reglas (RATE_LIMIT_RULES)
 
 Uso:
     from app.middleware import setup_middlewares
@@ -20,6 +21,7 @@ from fastapi import FastAPI
 from .common import (
     invalidate_cache_on_write_middleware,
 )
+from .route_rate_limit import RATE_LIMIT_RULES, RateLimitMiddleware
 
 # Configurar logger para este módulo
 logger = logging.getLogger(__name__)
@@ -33,7 +35,8 @@ def setup_middlewares(app: FastAPI) -> None:
     y antes de incluir los routers.
 
     Middlewares registrados (en orden de ejecución):
-    1. invalidate_cache_on_write_middleware: Invalida caché en escrituras
+    1. RateLimitMiddleware: Rechaza con 429 antes del routing
+    2. invalidate_cache_on_write_middleware: Invalida caché en escrituras
 
     Args:
         app: Instancia de FastAPI
@@ -50,5 +53,9 @@ def setup_middlewares(app: FastAPI) -> None:
     # Registrar middleware de invalidación de caché (primero para que se ejecute después)
     app.middleware("http")(invalidate_cache_on_write_middleware)
 
+    # Rate limiting (el último registrado es el primero en ejecutarse)
+    app.add_middleware(RateLimitMiddleware, rules=RATE_LIMIT_RULES)
+
     logger.info("✅ Middlewares configurados correctamente")
     logger.info("  - 🔄 Cache invalidation middleware (POST/PUT/PATCH/DELETE)")
+    logger.info(f"  - 🚦 Rate limit middleware ({len(RATE_LIMIT_RULES)} reglas)")
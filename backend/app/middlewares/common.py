@@ -1,8 +1,8 @@
 import logging
 
 from fastapi import Request
-from app.core.redis import redis_client
-from app.utils import invalidate_cache_pattern
+from app.core.cache import HTTP_CACHE_PREFIX
+from app.core.cache_invalidation import GLOBAL_SCOPE, deferred_invalidation
 
 # Configurar logger para este módulo
 logger = logging.getLogger(__name__)
@@ -10,19 +10,40 @@ logger = logging.getLogger(__name__)
 # Tamaño máximo de payload en bytes (10MB por defecto)
 MAX_PAYLOAD_SIZE = 10 * 1024 * 1024  # 10MB
 
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+READ_METHODS  = frozenset({"GET", "HEAD"})
+
+# Diccionario de rutas y sus patrones de caché relacionados
+# Cada entrada puede tener múltiples patrones para invalidar caché relacionado
+CACHE_INVALIDATION_MAP: dict[str, list[str]] = {
+    # App Settings
+    "/app-settings": [
+        f"{HTTP_CACHE_PREFIX}*app-settings*",
+    ],
+}
+
+
+def _patterns_for(path: str) -> list[str]:
+    """Patrones a invalidar para una ruta (primer prefijo que coincide)."""
+    for route_prefix, patterns in CACHE_INVALIDATION_MAP.items():
+        if path.startswith(route_prefix):
+            return patterns
+    return []
+
 
 async def invalidate_cache_on_write_middleware(request: Request, call_next):
     """
     Middleware para invalidar el caché automáticamente en operaciones de escritura.
 
     Cuando se realizan operaciones de escritura exitosas (POST, PUT, PATCH, DELETE)
-    sobre ciertos recursos, se invalida el caché relacionado automáticamente.
-
-    Recursos monitoreados (todos los del sistema):
-    - /app-settings/: Invalida caché de configuraciones
+    sobre ciertos recursos, se registra la invalidación del caché relacionado
+    (ver CACHE_INVALIDATION_MAP).
 
-    La invalidación se hace de forma asíncrona usando SCAN (no bloquea Redis)
-    y solo se elimina las claves que coincidan con el patrón específico.
+    La invalidación es diferida (app/core/cache_invalidation.py): la respuesta
+    no espera al SCAN, que se ejecuta en segundo plano agrupando los patrones
+    repetidos de una ráfaga de escrituras. Para que un usuario siempre lea lo
+    que acaba de escribir, las lecturas de esos mismos recursos ejecutan
+    antes lo que quede pendiente de su ámbito (su X-User-Id y el global).
 
     Args:
         request: Request HTTP entrante
@@ -31,48 +52,41 @@ async def invalidate_cache_on_write_middleware(request: Request, call_next):
     Returns:
         Response del handler
     """
-    # Solo procesar métodos de escritura
-    if request.method in ["POST", "PUT", "PATCH", "DELETE"]:
-        path = request.url.path
-
-        # Diccionario de rutas y sus patrones de caché relacionados
-        # Cada entrada puede tener múltiples patrones para invalidar caché relacionado
-        cache_invalidation_map = {
-            # App Settings
-            "/app-settings": [
-                "fastapi-cache:*app-settings*",
-            ],
-        }
-
-        # Procesar la request
-        response = await call_next(request)
-
-        # Solo invalidar si la operación fue exitosa (2xx)
-        if 200 <= response.status_code < 300:
-            # Buscar coincidencias en el mapa de invalidación
-            patterns_to_invalidate = []
-
-            for route_prefix, patterns in cache_invalidation_map.items():
-                if path.startswith(route_prefix):
-                    patterns_to_invalidate.extend(patterns)
-                    logger.info(
-                        f"🔄 Operación de escritura exitosa en {path} ({request.method}). "
-                        f"Invalidando caché: {', '.join(patterns)}"
-                    )
-                    break
-
-            # Invalidar todos los patrones encontrados
-            if patterns_to_invalidate:
-                try:
-                    for pattern in patterns_to_invalidate:
-                        await invalidate_cache_pattern(redis_client, pattern)
-                except Exception as e:
-                    logger.error(
-                        f"⚠️  Error al invalidar caché después de {request.method} {path}: {e}",
-                        exc_info=True,
-                    )
-
-        return response
-    else:
-        # Métodos de lectura (GET, HEAD, OPTIONS) pasan sin modificación
+    patterns = _patterns_for(request.url.path)
+    if not patterns:
         return await call_next(request)
+
+    user_id = request.headers.get("X-User-Id")
+
+    # Lecturas: read-your-writes antes de consultar la caché
+    if request.method in READ_METHODS:
+        try:
+            await deferred_invalidation.settle(user_id, GLOBAL_SCOPE)
+        except Exception as e:
+            logger.error(
+                f"⚠️  Error al aplicar invalidaciones pendientes antes de {request.url.path}: {e}",
+                exc_info=True,
+            )
+        return await call_next(request)
+
+    if request.method not in WRITE_METHODS:
+        return await call_next(request)
+
+    # Procesar la request
+    response = await call_next(request)
+
+    # Solo invalidar si la operación fue exitosa (2xx)
+    if 200 <= response.status_code < 300:
+        logger.info(
+            f"🔄 Operación de escritura exitosa en {request.url.path} ({request.method}). "
+            f"Invalidación diferida: {', '.join(patterns)}"
+        )
+        try:
+            await deferred_invalidation.enqueue(user_id, patterns=patterns)
+        except Exception as e:
+            logger.error(
+                f"⚠️  Error al registrar invalidación después de {request.method} {request.url.path}: {e}",
+                exc_info=True,
+            )
+
+    return response
@@ -1,20 +1,190 @@
-"""Middleware para rate limiting usando Redis."""
+"""
+Middleware para rate limiting usando Redis.
+
+Cada comprobación es un script Lua (EVALSHA): leer, decidir y registrar el
+request ocurren de forma atómica en un único round-trip, así que dos
+requests concurrentes no pueden pasar ambos con el contador en
+`max_requests - 1`. El reloj es el de Redis (TIME), común a todos los
+workers.
+
+Algoritmos (RateLimitAlgorithm, elegible por instancia):
+    sliding_log      Sorted set con un miembro por request en la ventana.
+                     Exacto, pero la memoria crece con el límite.
+    sliding_counter  Hash con dos contadores (ventana actual y anterior); la
+                     anterior pesa según lo que queda de ella. O(1) memoria.
+    gcra             Un único timestamp (TAT) por clave: permite ráfagas de
+                     hasta `max_requests` y después uno cada ventana/máximo.
+                     O(1) memoria.
+
+Benchmark de memoria y latencia: scripts/benchmark_rate_limiters.py
+
+Modo híbrido (opcional, `local_batch` > 0; RATE_LIMIT_LOCAL_BATCH en el
+limiter ligero): cada proceso guarda lo que quedaba según la última
+respuesta de Redis y sirve en local hasta `local_batch` hits por cliente.
+Esos hits se envían juntos (un solo script con coste N) en la siguiente
+consulta, que ocurre al agotar el lote, al pasar `local_sync` segundos o
+cuando al cliente le queda menos de un lote: cerca del límite decide
+siempre Redis. Exceso máximo: `local_batch` hits por proceso y cliente.
+
+Headers de respuesta:
+    X-RateLimit-Limit       máximo de requests en la ventana
+    X-RateLimit-Remaining   requests que quedan en la ventana
+    Retry-After             segundos hasta que vuelva a haber hueco (429)
+
+Si Redis no está disponible se permite el request (fail open).
+"""
 
 import logging
-from datetime import datetime, timedelta, timezone
-from typing import Optional
+import math
+import time
+from dataclasses import dataclass
 
-from fastapi import HTTPException, Request, status
-from backend.app.core.redis import RedisService
+from fastapi import HTTPException, Request, Response, status
+from redis.commands.core import AsyncScript
+from redis.exceptions import RedisError
+
+from app.core.cache_warmup import is_warmup_request
+from app.core.config import settings
+from app.core.redis import redis_pools
+from app.enums import RateLimitAlgorithm
 
 logger = logging.getLogger(__name__)
 
 
+# KEYS[1] = clave del cliente · ARGV = ventana (ms), máximo, id del request,
+# coste (hits que se registran juntos; todo o nada)
+# Retorna {permitido (1/0), restantes, retry_after (ms)}
+SLIDING_WINDOW_LUA = """
+local now_parts = redis.call('TIME')
+local now    = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local window = tonumber(ARGV[1])
+local limit  = tonumber(ARGV[2])
+local cost   = tonumber(ARGV[4]) or 1
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+
+if count + cost <= limit then
+    for i = 1, cost do
+        redis.call('ZADD', KEYS[1], now, now .. ':' .. ARGV[3] .. ':' .. i)
+    end
+    redis.call('PEXPIRE', KEYS[1], window)
+    return {1, limit - count - cost, 0}
+end
+
+-- Hueco cuando caduque el miembro que deja sitio para `cost` hits
+local retry = window
+if cost <= limit then
+    local oldest = redis.call('ZRANGE', KEYS[1], count + cost - limit - 1, count + cost - limit - 1, 'WITHSCORES')
+    if oldest[2] then
+        retry = tonumber(oldest[2]) + window - now
+    end
+end
+return {0, 0, retry}
+"""
+
+
+# Mismo contrato que SLIDING_WINDOW_LUA. HASH {índice de ventana: contador}
+SLIDING_COUNTER_LUA = """
+local now_parts = redis.call('TIME')
+local now    = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local window = tonumber(ARGV[1])
+local limit  = tonumber(ARGV[2])
+local cost   = tonumber(ARGV[4]) or 1
+
+local current  = math.floor(now / window)
+local elapsed  = now - current * window
+local counts   = redis.call('HMGET', KEYS[1], current, current - 1)
+local cur      = tonumber(counts[1]) or 0
+local prev     = tonumber(counts[2]) or 0
+local weight   = (window - elapsed) / window
+local estimate = prev * weight + cur
+
+if estimate + cost <= limit then
+    redis.call('HINCRBY', KEYS[1], current, cost)
+    redis.call('HDEL', KEYS[1], current - 2)
+    redis.call('PEXPIRE', KEYS[1], window * 2)
+    return {1, math.floor(limit - estimate - cost), 0}
+end
+
+-- Hueco cuando el peso de la ventana anterior baje lo suficiente o, si la
+-- actual ya está llena, al empezar la siguiente
+local retry = window - elapsed
+if prev > 0 and cur + cost <= limit then
+    retry = math.ceil((1 - (limit - cur - cost) / prev) * window - elapsed)
+end
+return {0, 0, math.max(retry, 1)}
+"""
+
+# Mismo contrato. STRING con el TAT (theoretical arrival time) en ms
+GCRA_LUA = """
+local now_parts = redis.call('TIME')
+local now      = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local window   = tonumber(ARGV[1])
+local limit    = tonumber(ARGV[2])
+local cost     = tonumber(ARGV[4]) or 1
+local interval = window / limit
+
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local new_tat  = tat + interval * cost
+local allow_at = new_tat - window
+
+if now < allow_at then
+    return {0, 0, math.ceil(allow_at - now)}
+end
+
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil(new_tat - now))
+return {1, math.floor((window - (new_tat - now)) / interval), 0}
+"""
+
+_SCRIPTS: dict[RateLimitAlgorithm, str] = {
+    RateLimitAlgorithm.SLIDING_LOG:     SLIDING_WINDOW_LUA,
+    RateLimitAlgorithm.SLIDING_COUNTER: SLIDING_COUNTER_LUA,
+    RateLimitAlgorithm.GCRA:            GCRA_LUA,
+}
+
+# Clientes con estado local por limiter y proceso (al llenarse se vacía)
+LOCAL_MAX_KEYS = 10_000
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitResult:
+    """Resultado de una comprobación de rate limit."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int  # segundos (0 si se permite)
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+
+@dataclass(slots=True)
+class _LocalBucket:
+    """Estado local de un cliente en modo híbrido."""
+
+    remaining: int    # restantes según la última respuesta de Redis
+    pending:   int    # hits servidos en local aún sin enviar
+    expires:   float  # time.monotonic() a partir del cual se consulta Redis
+
+
 class RateLimiter:
     """
     Rate limiter usando Redis para almacenar contadores.
 
-    Implementa un algoritmo de sliding window para contar requests.
+    Cuenta requests con el algoritmo elegido (sliding window por defecto),
+    en un script Lua atómico (un round-trip por request).
     """
 
     def __init__(
@@ -22,6 +192,9 @@ class RateLimiter:
         max_requests: int,
         window_seconds: int,
         key_prefix: str = "rate_limit",
+        algorithm: RateLimitAlgorithm = RateLimitAlgorithm.SLIDING_LOG,
+        local_batch: int = 0,
+        local_sync: float = 1.0,
     ):
         """
         Inicializa el rate limiter.
@@ -30,10 +203,20 @@ class RateLimiter:
             max_requests: Número máximo de requests permitidos en la ventana
             window_seconds: Duración de la ventana en segundos
             key_prefix: Prefijo para las keys en Redis
+            algorithm: Algoritmo de conteo (ver docstring del módulo)
+            local_batch: Hits servidos en local por cliente (0 = siempre Redis)
+            local_sync: Segundos que vale una respuesta de Redis en local
         """
         self.max_requests = max_requests
         self.window_seconds = window_seconds
         self.key_prefix = key_prefix
+        self.algorithm = RateLimitAlgorithm(algorithm)
+        self.local_batch = local_batch
+        self.local_sync = local_sync
+        self._local: dict[str, _LocalBucket] = {}
+        self._redis = redis_pools.client("rate_limit")
+        # EVALSHA; si el servidor no tiene el script lo carga y reintenta
+        self._script = AsyncScript(self._redis, _SCRIPTS[self.algorithm].encode())
 
     def _get_client_identifier(self, request: Request) -> str:
         """
@@ -56,94 +239,136 @@ class RateLimiter:
 
         return "unknown"
 
+    async def hit(self, key: str, cost: int = 1) -> RateLimitResult:
+        """Registra `cost` hits para `key` y decide si se permiten."""
+        if not self.local_batch:
+            return await self._remote_hit(key, cost)
+        return self._local_hit(key, cost) or await self._sync(key, cost)
+
+    def _local_hit(self, key: str, cost: int) -> RateLimitResult | None:
+        """Hit servido sin Redis, o None si hay que consultarlo."""
+        bucket = self._local.get(key)
+        if (
+            bucket is None
+            or time.monotonic() >= bucket.expires
+            or bucket.pending + cost > self.local_batch
+            # Cerca del límite decide Redis
+            or bucket.remaining - bucket.pending - cost < self.local_batch
+        ):
+            return None
+        bucket.pending += cost
+        return RateLimitResult(
+            allowed=True,
+            limit=self.max_requests,
+            remaining=bucket.remaining - bucket.pending,
+            retry_after=0,
+        )
+
+    async def _sync(self, key: str, cost: int) -> RateLimitResult:
+        """Envía los hits locales pendientes junto con este request."""
+        # Fuera del dict antes del await: los pendientes se envían una vez
+        bucket = self._local.pop(key, None)
+        pending = bucket.pending if bucket else 0
+        result = await self._remote_hit(key, pending + cost)
+        if not result.allowed and pending:
+            # Los ya servidos no caben (exceso dentro del margen): se
+            # descartan y se decide solo este request
+            result = await self._remote_hit(key, cost)
+        if result.allowed:
+            if len(self._local) >= LOCAL_MAX_KEYS:
+                self._local.clear()
+            self._local[key] = _LocalBucket(
+                remaining=result.remaining,
+                pending=0,
+                expires=time.monotonic() + self.local_sync,
+            )
+        return result
+
+    async def _remote_hit(self, key: str, cost: int) -> RateLimitResult:
+        """Un round-trip a Redis registrando `cost` hits (todo o nada)."""
+        allowed, remaining, retry_ms = await self._script(
+            keys=[key],
+            args=[self.window_seconds * 1000, self.max_requests, time.time_ns(), cost],
+            client=self._redis,
+        )
+        return RateLimitResult(
+            allowed=bool(allowed),
+            limit=self.max_requests,
+            remaining=int(remaining),
+            retry_after=max(math.ceil(int(retry_ms) / 1000), 1) if not allowed else 0,
+        )
+
     async def check_rate_limit(
         self,
         request: Request,
-        identifier: Optional[str] = None,
-    ) -> bool:
+        identifier: str | None = None,
+        response: Response | None = None,
+    ) -> RateLimitResult:
         """
         Verifica si el cliente ha excedido el rate limit.
 
         Args:
             request: Request de FastAPI
             identifier: Identificador personalizado (opcional)
+            response: Response donde escribir los headers X-RateLimit-*
 
         Returns:
-            True si está dentro del límite, False si lo excedió
+            Resultado de la comprobación (permitido, restantes…)
 
         Raises:
             HTTPException: Si se excede el rate limit
         """
-        redis_client = RedisService.get_async()
-
-        if not redis_client:
-            # Si Redis no está disponible, permitir el request (fail open)
-            logger.warning(
-                "Redis no disponible para rate limiting - permitiendo request"
+        # El precalentamiento de caché no consume el límite del usuario
+        if is_warmup_request(request.scope):
+            return RateLimitResult(
+                allowed=True,
+                limit=self.max_requests,
+                remaining=self.max_requests,
+                retry_after=0,
             )
-            return True
 
         # Obtener identificador del cliente
         client_id = identifier or self._get_client_identifier(request)
 
-        # Crear key única para este cliente y endpoint
-        endpoint = request.url.path
+        # Crear key única para este cliente y endpoint. Se usa la plantilla de
+        # la ruta (/cvs/{cv_id}), no el path, para no crear una clave por id
+        route = request.scope.get("route")
+        endpoint = getattr(route, "path", None) or request.url.path
         key = f"{self.key_prefix}:{endpoint}:{client_id}"
 
-        # Obtener timestamp actual
-        now = datetime.now(timezone.utc)
-        window_start = now - timedelta(seconds=self.window_seconds)
-
-        # Usar Redis sorted set para implementar sliding window
-        # Score = timestamp, valor = request ID único
-
-        # 1. Limpiar requests antiguos fuera de la ventana
-        await redis_client.zremrangebyscore(key, "-inf", window_start.timestamp())
-
-        # 2. Contar requests en la ventana actual
-        current_count = await redis_client.zcard(key)
-
-        # 3. Verificar si excede el límite
-        if current_count >= self.max_requests:
-            # Obtener el timestamp del request más antiguo
-            oldest = await redis_client.zrange(key, 0, 0, withscores=True)
-            if oldest:
-                oldest_timestamp = oldest[0][1]
-                retry_after = int(
-                    oldest_timestamp + self.window_seconds - now.timestamp()
-                )
-                retry_after = max(retry_after, 1)  # Mínimo 1 segundo
-            else:
-                retry_after = self.window_seconds
+        try:
+            result = await self.hit(key)
+        except RedisError as e:
+            # Si Redis no está disponible, permitir el request (fail open)
+            logger.warning(
+                f"Redis no disponible para rate limiting - permitiendo request: {e}"
+            )
+            return RateLimitResult(
+                allowed=True,
+                limit=self.max_requests,
+                remaining=self.max_requests,
+                retry_after=0,
+            )
 
+        if not result.allowed:
             logger.warning(
                 f"Rate limit excedido para {client_id} en {endpoint}: "
-                f"{current_count}/{self.max_requests} requests en {self.window_seconds}s"
+                f"{self.max_requests} requests en {self.window_seconds}s"
             )
-
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail=f"Rate limit exceeded. Try again in {retry_after} seconds.",
-                headers={"Retry-After": str(retry_after)},
+                detail=f"Rate limit exceeded. Try again in {result.retry_after} seconds.",
+                headers=result.headers,
             )
 
-        # 4. Agregar el request actual
-        request_id = f"{now.timestamp()}:{id(request)}"
-        await redis_client.zadd(key, {request_id: now.timestamp()})
-
-        # 5. Establecer expiración de la key (limpieza automática)
-        await redis_client.expire(key, self.window_seconds + 60)
-
-        # Agregar headers informativos
-        remaining = self.max_requests - current_count - 1
+        if response is not None:
+            response.headers.update(result.headers)
 
         logger.debug(
             f"Rate limit para {client_id} en {endpoint}: "
-            f"{current_count + 1}/{self.max_requests} "
-            f"(quedan {remaining} requests)"
+            f"quedan {result.remaining}/{self.max_requests} requests"
         )
-
-        return True
+        return result
 
 
 # Instancias predefinidas para diferentes niveles de protección
@@ -162,27 +387,31 @@ moderate_rate_limiter = RateLimiter(
     key_prefix="rate_limit:moderate",
 )
 
-# Rate limiter ligero para endpoints generales
+# Rate limiter ligero para endpoints generales (muchos clientes: contador
+# de memoria constante en lugar de un miembro por request)
 light_rate_limiter = RateLimiter(
     max_requests=30,  # 30 requests
     window_seconds=60,  # por minuto
     key_prefix="rate_limit:light",
+    algorithm=RateLimitAlgorithm.SLIDING_COUNTER,
+    local_batch=settings.RATE_LIMIT_LOCAL_BATCH,
+    local_sync=settings.RATE_LIMIT_LOCAL_SYNC_MS / 1000,
 )
 
 
 # Dependency para usar en rutas de FastAPI
 
 
-async def apply_strict_rate_limit(request: Request):
+async def apply_strict_rate_limit(request: Request, response: Response) -> None:
     """Dependency para aplicar rate limiting estricto."""
-    await strict_rate_limiter.check_rate_limit(request)
+    await strict_rate_limiter.check_rate_limit(request, response=response)
 
 
-async def apply_moderate_rate_limit(request: Request):
+async def apply_moderate_rate_limit(request: Request, response: Response) -> None:
     """Dependency para aplicar rate limiting moderado."""
-    await moderate_rate_limiter.check_rate_limit(request)
+    await moderate_rate_limiter.check_rate_limit(request, response=response)
 
 
-async def apply_light_rate_limit(request: Request):
+async def apply_light_rate_limit(request: Request, response: Response) -> None:
     """Dependency para aplicar rate limiting ligero."""
-    await light_rate_limiter.check_rate_limit(request)
+    await light_rate_limiter.check_rate_limit(request, response=response)
@@ -0,0 +1,256 @@
+"""
+Middleware ASGI de rate limiting guiado por una tabla de reglas.
+
+A diferencia de las dependencies (`apply_strict_rate_limit`…), corre antes
+del routing de FastAPI y sin leer el body: un request por encima del límite
+se rechaza con un 429 sin parsear nada.
+
+Cada regla (RateLimitRule) indica:
+    path       plantilla de ruta de Starlette, con el prefijo de la API
+               ("/api/v1/reference/bundle/{version}")
+    methods    métodos a los que aplica (None = todos)
+    limiter    RateLimiter (límite, ventana y algoritmo)
+    identity   de dónde sale el cliente: IP, X-User-Id o X-API-Key
+               (X-User-Id lo pone el servicio de auth tras validar el JWT;
+               el backend no debe ser accesible sin pasar por él)
+    cost       hits que consume cada request (peso)
+
+Las reglas se compilan una vez al crear el middleware: las plantillas sin
+parámetros van a un dict (lookup O(1)) y tienen prioridad; las demás se
+prueban con su regex en el orden de la tabla. Gana la primera que coincide.
+
+La clave en Redis usa la plantilla, no el path:
+    <key_prefix>:<plantilla>:<identidad>
+así el número de claves no crece con los ids de la URL.
+
+Uso (ver setup_middlewares):
+    app.add_middleware(RateLimitMiddleware, rules=RATE_LIMIT_RULES)
+"""
+
+import hashlib
+import logging
+import re
+import secrets
+from collections.abc import Iterable
+from dataclasses import dataclass
+from uuid import UUID
+
+from fastapi import HTTPException, Request, status
+from redis.exceptions import RedisError
+from starlette.datastructures import MutableHeaders
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache_warmup import is_warmup_request
+from app.core.config import settings
+from app.enums import RateLimitIdentity
+from app.exceptions import http_exception_handler
+
+from .rate_limit import (
+    RateLimiter,
+    light_rate_limiter,
+    moderate_rate_limiter,
+    strict_rate_limiter,
+)
+
+logger = logging.getLogger(__name__)
+
+_IDENTITY_HEADERS = {
+    RateLimitIdentity.USER:    b"x-user-id",
+    RateLimitIdentity.API_KEY: b"x-api-key",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitRule:
+    """Regla de la tabla: a qué requests aplica y cómo se cuentan."""
+
+    path: str
+    limiter: RateLimiter
+    methods: frozenset[str] | None = None
+    identity: RateLimitIdentity = RateLimitIdentity.IP
+    cost: int = 1
+
+    def applies_to(self, method: str) -> bool:
+        return self.methods is None or method in self.methods
+
+
+def _header(scope: Scope, name: bytes) -> str | None:
+    headers: list[tuple[bytes, bytes]] = scope["headers"]
+    for key, value in headers:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def client_ip(scope: Scope) -> str:
+    """IP del cliente (mismo criterio que RateLimiter._get_client_identifier)."""
+    forwarded = _header(scope, b"x-forwarded-for")
+    if forwarded:
+        return forwarded.split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def client_identity(scope: Scope, identity: RateLimitIdentity) -> str:
+    """
+    Identidad del cliente para una regla. Si falta el header pedido se usa
+    la IP, para que omitirlo no sirva para saltarse el límite. Un header
+    solo identifica si es válido (API key correcta, user_id con forma de
+    UUID): con un valor inventado por request cada uno tendría su propio
+    contador.
+    """
+    header = _IDENTITY_HEADERS.get(identity)
+    value = _header(scope, header) if header else None
+    if identity is RateLimitIdentity.API_KEY and value is not None:
+        secret = settings.SECRET_KEY.get_secret_value()
+        if not secrets.compare_digest(value.encode(), secret.encode()):
+            value = None
+    if identity is RateLimitIdentity.USER and value is not None:
+        try:
+            # Forma canónica: mayúsculas o llaves no abren otro contador
+            value = str(UUID(value))
+        except ValueError:
+            value = None
+    if not value:
+        return f"ip:{client_ip(scope)}"
+    if identity is RateLimitIdentity.API_KEY:
+        # La clave nunca se guarda en claro en Redis
+        return f"key:{hashlib.sha256(value.encode()).hexdigest()[:16]}"
+    return f"user:{value}"
+
+
+class RuleTable:
+    """Tabla de reglas compilada."""
+
+    def __init__(self, rules: Iterable[RateLimitRule]) -> None:
+        self._static: dict[str, list[RateLimitRule]] = {}
+        self._dynamic: list[tuple[re.Pattern[str], RateLimitRule]] = []
+        for rule in rules:
+            regex, _, convertors = compile_path(rule.path)
+            if convertors:
+                self._dynamic.append((regex, rule))
+            else:
+                self._static.setdefault(rule.path, []).append(rule)
+
+    def match(self, method: str, path: str) -> RateLimitRule | None:
+        for rule in self._static.get(path, ()):
+            if rule.applies_to(method):
+                return rule
+        for regex, rule in self._dynamic:
+            if rule.applies_to(method) and regex.match(path):
+                return rule
+        return None
+
+
+class RateLimitMiddleware:
+    """Middleware ASGI puro: rechaza con 429 antes de llegar a la app."""
+
+    def __init__(self, app: ASGIApp, rules: Iterable[RateLimitRule] = ()) -> None:
+        self.app = app
+        self.table = RuleTable(rules)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rule = self.table.match(scope["method"], scope["path"])
+        if rule is None or is_warmup_request(scope):
+            await self.app(scope, receive, send)
+            return
+
+        client = client_identity(scope, rule.identity)
+        key = f"{rule.limiter.key_prefix}:{rule.path}:{client}"
+        try:
+            result = await rule.limiter.hit(key, rule.cost)
+        except RedisError as e:
+            # Si Redis no está disponible, permitir el request (fail open)
+            logger.warning(
+                f"Redis no disponible para rate limiting - permitiendo request: {e}"
+            )
+            await self.app(scope, receive, send)
+            return
+
+        if not result.allowed:
+            logger.warning(
+                f"Rate limit excedido para {client} en {scope['method']} {rule.path}: "
+                f"{rule.limiter.max_requests} requests en {rule.limiter.window_seconds}s"
+            )
+            response = await http_exception_handler(
+                Request(scope),
+                HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail=f"Rate limit exceeded. Try again in {result.retry_after} seconds.",
+                    headers=result.headers,
+                ),
+            )
+            await response(scope, receive, send)
+            return
+
+        headers = result.headers
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+# Tabla de reglas de la API (plantillas con el prefijo de la versión)
+_API = settings.API_V1_PREFIX
+
+RATE_LIMIT_RULES: list[RateLimitRule] = [
+    # Operaciones de mantenimiento: por API key
+    RateLimitRule(
+        path=f"{_API}/utils/clear-cache",
+        methods=frozenset({"POST"}),
+        limiter=strict_rate_limiter,
+        identity=RateLimitIdentity.API_KEY,
+    ),
+    RateLimitRule(
+        path=f"{_API}/utils/redis-keyspace",
+        methods=frozenset({"GET"}),
+        limiter=strict_rate_limiter,
+        identity=RateLimitIdentity.API_KEY,
+    ),
+    # Envía un correo real
+    RateLimitRule(
+        path=f"{_API}/utils/test-email",
+        methods=frozenset({"POST"}),
+        limiter=moderate_rate_limiter,
+    ),
+    # Descarga del PDF de un CV
+    RateLimitRule(
+        path=f"{_API}/cvs/{{cv_id}}/pdf",
+        methods=frozenset({"GET"}),
+        limiter=light_rate_limiter,
+        identity=RateLimitIdentity.USER,
+    ),
+    # Subidas directas del avatar (firma y publicación)
+    RateLimitRule(
+        path=f"{_API}/uploads/avatar",
+        methods=frozenset({"POST"}),
+        limiter=moderate_rate_limiter,
+        identity=RateLimitIdentity.USER,
+    ),
+    RateLimitRule(
+        path=f"{_API}/uploads/avatar/complete",
+        methods=frozenset({"POST"}),
+        limiter=moderate_rate_limiter,
+        identity=RateLimitIdentity.USER,
+    ),
+    # Datos de referencia: el bundle pesa más que el manifest
+    RateLimitRule(
+        path=f"{_API}/reference/manifest",
+        methods=frozenset({"GET", "HEAD"}),
+        limiter=light_rate_limiter,
+    ),
+    RateLimitRule(
+        path=f"{_API}/reference/bundle/{{version}}",
+        methods=frozenset({"GET", "HEAD"}),
+        limiter=light_rate_limiter,
+        cost=3,
+    ),
+]
@@ -1,8 +1,19 @@
 from .app_setting import AppSetting
 from .common import (
+    AllEnumsResponse,
     BaseTable,
+    EnumValue,
     Message,
     PaginatedResponse,
-    EnumValue,
-    AllEnumsResponse,
 )
+from .feature_flag import FeatureFlag
+
+__all__ = [
+    "AllEnumsResponse",
+    "AppSetting",
+    "BaseTable",
+    "EnumValue",
+    "FeatureFlag",
+    "Message",
+    "PaginatedResponse",
+]
@@ -0,0 +1,22 @@
+
+from sqlalchemy import Column
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Field, SQLModel
+
+
+class FeatureFlag(SQLModel, table=True):
+    """
+    Reglas de un feature flag. Se evalúan en memoria (app/feature_flags.py):
+
+      - enabled:            interruptor global; apagado → False para todos.
+      - allow_list:         user_ids que siempre lo tienen activo.
+      - rollout_percentage: % de usuarios activos, por hash estable del
+                            user_id (el mismo usuario siempre cae igual).
+    """
+    __tablename__ = "feature_flags"
+
+    key: str = Field(primary_key=True, max_length=100)
+    enabled: bool = Field(default=False)
+    rollout_percentage: int = Field(default=100, ge=0, le=100)
+    allow_list: list[str] = Field(default_factory=list, sa_column=Column(JSONB, nullable=False))
+    description: str | None = Field(default=None, max_length=255)
@@ -4,4 +4,18 @@ Inicialización del submódulo schemas.
 Define y agrupa los esquemas Pydantic usados para validación y serialización de datos.
 """
 
-from .utils import WelcomeResponse
\ No newline at end of file
+from .uploads import (
+    PresignedUploadResponse,
+    UploadCompleteRequest,
+    UploadCompleteResponse,
+    UploadRequest,
+)
+from .utils import WelcomeResponse
+
+__all__ = [
+    "PresignedUploadResponse",
+    "UploadCompleteRequest",
+    "UploadCompleteResponse",
+    "UploadRequest",
+    "WelcomeResponse",
+]
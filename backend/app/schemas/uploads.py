@@ -0,0 +1,35 @@
+"""Esquemas Pydantic para las subidas directas a MinIO (presigned POST)."""
+
+from pydantic import BaseModel, Field
+
+
+class UploadRequest(BaseModel):
+    """Petición de una política de subida."""
+
+    content_type: str = Field(examples=["image/png"])
+
+
+class PresignedUploadResponse(BaseModel):
+    """
+    Formulario para subir el fichero directamente a MinIO: un POST
+    multipart a `url` con todos los `fields` y el fichero como último campo
+    ('file').
+    """
+
+    url: str
+    fields: dict[str, str]
+    token: str
+    max_bytes: int
+    expires_in: int
+
+
+class UploadCompleteRequest(BaseModel):
+    """Aviso de que la subida con `token` terminó."""
+
+    token: str
+
+
+class UploadCompleteResponse(BaseModel):
+    """URL pública del fichero ya publicado."""
+
+    url: str
@@ -1,7 +1,10 @@
 from .common import format_enum_for_frontend
+from .pdf import PdfService, pdf_service
 from .settings import SettingsService
 
 __all__ = [
     "format_enum_for_frontend",
     "SettingsService",
-]
\ No newline at end of file
+    "PdfService",
+    "pdf_service",
+]
@@ -0,0 +1,346 @@
+"""
+app/services/pdf.py
+
+Renderizado de CVs a PDF con motores intercambiables.
+
+Cada plantilla declara el motor con el que se renderiza:
+
+  weasyprint — Jinja2 → HTML → WeasyPrint. Soporta CSS completo
+               (columnas, fuentes embebidas, imágenes). Es el más caro
+               en CPU, memoria y tiempo de importación.
+  direct     — Dibuja el texto directamente en el PDF con las fuentes
+               estándar (Helvetica). Sin HTML ni CSS: pensado para las
+               plantillas "ATS plain" de una sola columna.
+
+Uso en servicios / tareas Celery:
+    from app.services.pdf import CVDocument, CVSection, pdf_service
+
+    document = CVDocument(full_name="Ada Lovelace", sections=[...])
+    pdf_bytes = pdf_service.render(document, template_slug="ats-plain")
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from typing import Any, ClassVar
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.enums import RenderEngineName
+
+log = get_logger(__name__)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Documento a renderizar (independiente del motor)
+# ─────────────────────────────────────────────────────────────────────────────
+
+@dataclass(slots=True)
+class CVSection:
+    """Sección del CV: un título y sus líneas (experiencia, skills…)."""
+
+    title: str
+    items: list[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class CVDocument:
+    """
+    Contenido de un CV ya resuelto desde la BD.
+    Es la entrada común de todos los motores de renderizado.
+    """
+
+    full_name: str
+    headline: str | None = None
+    contact: list[str] = field(default_factory=list)
+    summary: str | None = None
+    sections: list[CVSection] = field(default_factory=list)
+
+    def to_context(self) -> dict[str, Any]:
+        """Contexto para las plantillas Jinja2."""
+        return {"cv": asdict(self)}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Interfaz de motor
+# ─────────────────────────────────────────────────────────────────────────────
+
+class RenderEngine(ABC):
+    """Contrato común de los motores de renderizado PDF."""
+
+    name: ClassVar[RenderEngineName]
+
+    @abstractmethod
+    def render(self, document: CVDocument, template_slug: str) -> bytes:
+        """Renderiza el documento con la plantilla indicada y retorna el PDF."""
+
+
+class WeasyPrintEngine(RenderEngine):
+    """
+    Motor HTML/CSS. Renderiza `<PDF_TEMPLATES_DIR>/<slug>.html` con Jinja2
+    y lo convierte a PDF con WeasyPrint.
+
+    WeasyPrint se importa de forma diferida: los procesos que solo usan el
+    motor directo no pagan su tiempo de importación ni su memoria.
+    """
+
+    name = RenderEngineName.WEASYPRINT
+
+    def __init__(self) -> None:
+        from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+        self._jinja = Environment(
+            loader=FileSystemLoader(settings.PDF_TEMPLATES_DIR),
+            autoescape=select_autoescape(["html"]),
+        )
+
+    def render(self, document: CVDocument, template_slug: str) -> bytes:
+        from weasyprint import HTML
+
+        template = self._jinja.get_template(f"{template_slug}.html")
+        html     = template.render(**document.to_context())
+        pdf: bytes = HTML(
+            string=html,
+            base_url=str(settings.PDF_TEMPLATES_DIR),
+        ).write_pdf(dpi=settings.PDF_DPI)
+        return pdf
+
+
+class DirectPdfEngine(RenderEngine):
+    """
+    Motor ligero: escribe el PDF a mano (PDF 1.4, A4) con las fuentes
+    estándar Helvetica / Helvetica-Bold, que no necesitan embeberse.
+
+    Layout fijo de una columna: nombre, titular, contacto, resumen y las
+    secciones en orden. Las líneas largas se parten por palabras (una
+    palabra más ancha que la línea, como una URL, se parte por caracteres)
+    y se añaden páginas cuando el contenido no cabe. El texto se codifica en
+    WinAnsi (cp1252), suficiente para español e inglés.
+    """
+
+    name = RenderEngineName.DIRECT
+
+    PAGE_WIDTH   = 595.28   # A4 en puntos
+    PAGE_HEIGHT  = 841.89
+    MARGIN       = 56.0
+    LINE_SPACING = 1.35
+
+    # Anchos AFM de Helvetica (1/1000 em) para los caracteres 32..126
+    _WIDTHS: ClassVar[tuple[int, ...]] = (
+        278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+        1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+        333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+        556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+    )
+    _DEFAULT_WIDTH = 556
+    _BOLD_FACTOR   = 1.08   # Helvetica-Bold es algo más ancha
+
+    def render(self, document: CVDocument, template_slug: str) -> bytes:
+        lines = self._layout(document)
+        pages = self._paginate(lines)
+        return self._serialize(pages)
+
+    # ── Layout ────────────────────────────────────────────────────────────────
+
+    def _layout(self, document: CVDocument) -> list[tuple[str, float, str, float]]:
+        """
+        Convierte el documento en líneas `(fuente, tamaño, texto, espacio_previo)`.
+        La fuente es "F1" (regular) o "F2" (negrita).
+        """
+        lines: list[tuple[str, float, str, float]] = []
+
+        def add(text: str, font: str, size: float, gap: float = 0.0) -> None:
+            for i, chunk in enumerate(self._wrap(text, font, size)):
+                lines.append((font, size, chunk, gap if i == 0 else 0.0))
+
+        add(document.full_name, "F2", 20)
+        if document.headline:
+            add(document.headline, "F1", 12, gap=2)
+        if document.contact:
+            add("  |  ".join(document.contact), "F1", 9.5, gap=4)
+        if document.summary:
+            add(document.summary, "F1", 10.5, gap=12)
+
+        for section in document.sections:
+            add(section.title.upper(), "F2", 12, gap=14)
+            for item in section.items:
+                add(item, "F1", 10.5, gap=3)
+        return lines
+
+    def _text_width(self, text: str, font: str, size: float) -> float:
+        units: float = sum(
+            self._WIDTHS[ord(ch) - 32] if 32 <= ord(ch) <= 126 else self._DEFAULT_WIDTH
+            for ch in text
+        )
+        if font == "F2":
+            units *= self._BOLD_FACTOR
+        return units * size / 1000
+
+    def _wrap(self, text: str, font: str, size: float) -> list[str]:
+        """Parte el texto por palabras para que quepa en el ancho útil."""
+        max_width = self.PAGE_WIDTH - 2 * self.MARGIN
+        result: list[str] = []
+        for paragraph in text.splitlines() or [""]:
+            current = ""
+            for word in paragraph.split():
+                candidate = f"{current} {word}" if current else word
+                if self._text_width(candidate, font, size) <= max_width:
+                    current = candidate
+                    continue
+                if current:
+                    result.append(current)
+                # Una palabra que no cabe sola se parte por caracteres
+                *full, current = self._break_word(word, font, size, max_width)
+                result.extend(full)
+            result.append(current)
+        return result
+
+    def _break_word(self, word: str, font: str, size: float, max_width: float) -> list[str]:
+        """Trozos de `word` que caben en `max_width` (al menos un carácter)."""
+        chunks = [""]
+        for ch in word:
+            if chunks[-1] and self._text_width(chunks[-1] + ch, font, size) > max_width:
+                chunks.append("")
+            chunks[-1] += ch
+        return chunks
+
+    def _paginate(
+        self,
+        lines: list[tuple[str, float, str, float]],
+    ) -> list[list[tuple[str, float, float, str]]]:
+        """Asigna coordenada `y` a cada línea y reparte las líneas en páginas."""
+        pages: list[list[tuple[str, float, float, str]]] = [[]]
+        y = self.PAGE_HEIGHT - self.MARGIN
+        for font, size, text, gap in lines:
+            step = gap + size * self.LINE_SPACING
+            if y - step < self.MARGIN and pages[-1]:
+                pages.append([])
+                y = self.PAGE_HEIGHT - self.MARGIN
+                step = size * self.LINE_SPACING
+            y -= step
+            pages[-1].append((font, size, y, text))
+        return pages
+
+    # ── Serialización PDF ─────────────────────────────────────────────────────
+
+    @staticmethod
+    def _escape(text: str) -> bytes:
+        raw = text.encode("cp1252", errors="replace")
+        return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+    def _content_stream(self, page: list[tuple[str, float, float, str]]) -> bytes:
+        ops = [b"BT"]
+        for font, size, y, text in page:
+            ops.append(
+                b"/%s %.2f Tf 1 0 0 1 %.2f %.2f Tm (%s) Tj"
+                % (font.encode(), size, self.MARGIN, y, self._escape(text))
+            )
+        ops.append(b"ET")
+        return b"\n".join(ops)
+
+    def _serialize(self, pages: list[list[tuple[str, float, float, str]]]) -> bytes:
+        # Objetos fijos: 1 catálogo, 2 árbol de páginas, 3-4 fuentes.
+        # Después, por cada página: objeto página + objeto contenido.
+        n_pages  = len(pages)
+        page_ids = [5 + 2 * i for i in range(n_pages)]
+        objects: list[bytes] = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"<< /Type /Pages /Kids [%s] /Count %d >>"
+            % (b" ".join(b"%d 0 R" % pid for pid in page_ids), n_pages),
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        ]
+        for page, pid in zip(pages, page_ids, strict=True):
+            stream = self._content_stream(page)
+            objects.append(
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] "
+                b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+                % (self.PAGE_WIDTH, self.PAGE_HEIGHT, pid + 1)
+            )
+            objects.append(
+                b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+            )
+
+        out     = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+
+        xref_offset = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        for offset in offsets:
+            out += b"%010d 00000 n \n" % offset
+        out += (
+            b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+            % (len(objects) + 1, xref_offset)
+        )
+        return bytes(out)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Registro de motores y plantillas
+# ─────────────────────────────────────────────────────────────────────────────
+
+_ENGINE_CLASSES: dict[RenderEngineName, type[RenderEngine]] = {
+    RenderEngineName.WEASYPRINT: WeasyPrintEngine,
+    RenderEngineName.DIRECT:     DirectPdfEngine,
+}
+
+# Motor declarado por cada plantilla. Las no listadas usan WeasyPrint.
+TEMPLATE_RENDER_ENGINES: dict[str, RenderEngineName] = {
+    "ats-plain": RenderEngineName.DIRECT,
+}
+DEFAULT_RENDER_ENGINE = RenderEngineName.WEASYPRINT
+
+
+class PdfService:
+    """
+    Punto de entrada para generar PDFs de CVs.
+    Resuelve el motor de cada plantilla e instancia los motores bajo demanda
+    (una sola vez por proceso).
+    """
+
+    def __init__(self) -> None:
+        self._engines: dict[RenderEngineName, RenderEngine] = {}
+
+    def get_engine(self, name: RenderEngineName) -> RenderEngine:
+        engine = self._engines.get(name)
+        if engine is None:
+            engine = _ENGINE_CLASSES[name]()
+            self._engines[name] = engine
+        return engine
+
+    @staticmethod
+    def engine_for_template(template_slug: str) -> RenderEngineName:
+        """Motor declarado por la plantilla (WeasyPrint si no declara ninguno)."""
+        return TEMPLATE_RENDER_ENGINES.get(template_slug, DEFAULT_RENDER_ENGINE)
+
+    def render(
+        self,
+        document: CVDocument,
+        template_slug: str,
+        engine: RenderEngineName | None = None,
+    ) -> bytes:
+        """
+        Renderiza el CV con la plantilla indicada.
+
+        Args:
+            engine: fuerza un motor concreto (benchmarks, previews). Por defecto
+                    se usa el que declara la plantilla.
+        """
+        name      = engine or self.engine_for_template(template_slug)
+        pdf_bytes = self.get_engine(name).render(document, template_slug)
+        log.debug(
+            "pdf.rendered",
+            template=template_slug,
+            engine=name.value,
+            size_bytes=len(pdf_bytes),
+        )
+        return pdf_bytes
+
+
+# ── Singleton ─────────────────────────────────────────────────────────────────
+pdf_service = PdfService()
@@ -0,0 +1,99 @@
+"""
+app/services/reference_data.py
+
+Bundle de datos de referencia para el frontend (enums y catálogo de
+plantillas), versionado por contenido.
+
+El bundle se calcula una vez por proceso (al arrancar) y se sirve como
+bytes ya serializados. Su versión es un hash del contenido: con el mismo
+código y las mismas plantillas todos los workers y réplicas anuncian la
+misma, y cambia sola al desplegar algo distinto.
+
+Flujo del cliente:
+    1. GET /reference/manifest        → {"version", "url"}  (pequeño, revalida con ETag)
+    2. GET /reference/bundle/<hash>   → bundle, Cache-Control: immutable
+       Solo se vuelve a pedir cuando el manifest anuncia otro hash.
+
+Añadir una sección: una entrada en REFERENCE_SECTIONS (nombre → builder).
+"""
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+
+import orjson
+
+from app.core.config import settings
+from app.enums import RenderEngineName
+from app.models import AllEnumsResponse
+from app.services.common import format_enum_for_frontend
+from app.services.pdf import PdfService
+
+# Enums expuestos al frontend: clave en `options` → Enum
+FRONTEND_ENUMS: dict[str, type[Enum]] = {
+    "render_engine": RenderEngineName,
+}
+
+
+def build_enum_options() -> dict[str, Any]:
+    """Todas las listas de enums (mismo formato que AllEnumsResponse)."""
+    response = AllEnumsResponse.model_validate(
+        {"options": {name: format_enum_for_frontend(enum) for name, enum in FRONTEND_ENUMS.items()}}
+    )
+    return response.model_dump(mode="json")
+
+
+def build_template_catalog() -> list[dict[str, str]]:
+    """Plantillas disponibles en PDF_TEMPLATES_DIR con su motor de render."""
+    return [
+        {
+            "slug":   path.stem,
+            "label":  path.stem.replace("-", " ").title(),
+            "engine": PdfService.engine_for_template(path.stem).value,
+        }
+        for path in sorted(settings.PDF_TEMPLATES_DIR.glob("*.html"))
+    ]
+
+
+REFERENCE_SECTIONS: dict[str, Callable[[], Any]] = {
+    "enums":     build_enum_options,
+    "templates": build_template_catalog,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ReferenceBundle:
+    version: str
+    body:    bytes
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}"'
+
+
+def build_reference_bundle() -> ReferenceBundle:
+    """Serializa todas las secciones (claves ordenadas: hash estable)."""
+    data = {name: builder() for name, builder in REFERENCE_SECTIONS.items()}
+    body = orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    return ReferenceBundle(version=hashlib.sha256(body).hexdigest()[:16], body=body)
+
+
+_bundle: ReferenceBundle | None = None
+
+
+def get_reference_bundle() -> ReferenceBundle:
+    """Bundle del proceso (se construye en el primer uso si no se precalculó)."""
+    global _bundle
+    if _bundle is None:
+        _bundle = build_reference_bundle()
+    return _bundle
+
+
+def reload_reference_bundle() -> ReferenceBundle:
+    """Recalcula el bundle (arranque, tests)."""
+    global _bundle
+    _bundle = build_reference_bundle()
+    return _bundle
@@ -1,10 +1,12 @@
-import json
 import logging
 from typing import Any
 
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.app_setting import AppSetting
+from app.core.cache import cache_service
+from app.core.db import a_engine
 from app.core.redis import redis_client
 
 logger = logging.getLogger(__name__)
@@ -12,90 +14,83 @@ logger = logging.getLogger(__name__)
 CACHE_KEY_PREFIX = "app_settings:"
 CACHE_EXPIRATION_SECONDS = 3600  # 1 hora
 
+# Snapshot completo de la tabla `app_settings` (es pequeña): {key: value}
+SNAPSHOT_CACHE_KEY = f"{CACHE_KEY_PREFIX}{{snapshot}}"
+# Contador de cambios: el snapshot solo se guarda si no cambió mientras se
+# leía la tabla. Comparte hash tag con el snapshot (mismo slot en Cluster).
+VERSION_CACHE_KEY = "app_settings_version:{snapshot}"
+
+
+async def _read_all_settings() -> dict[str, Any]:
+    """Lee toda la tabla en una consulta, con su propia sesión."""
+    async with AsyncSession(a_engine) as session:
+        rows = (await session.exec(select(AppSetting))).all()
+    return {row.key: row.value for row in rows}
+
+
+async def load_settings_snapshot() -> dict[str, Any]:
+    """
+    Snapshot de todos los settings.
+
+    Se sirve desde la L1 del proceso (coste cero por petición); si no está,
+    desde Redis; y si tampoco, un único proceso lo carga de Postgres
+    (single-flight de CacheService.get_or_set). Cualquier cambio incrementa
+    VERSION_CACHE_KEY, borra la clave y publica la invalidación: todos los
+    procesos lo recargan, y un snapshot leído antes del cambio no se guarda.
+
+    El dict es compartido: no modificarlo.
+    """
+    snapshot: dict[str, Any] = await cache_service.get_or_set(
+        SNAPSHOT_CACHE_KEY,
+        _read_all_settings,
+        CACHE_EXPIRATION_SECONDS,
+        version_key=VERSION_CACHE_KEY,
+    )
+    return snapshot
+
 
 class SettingsService:
     """
     Servicio para gestionar configuraciones de la aplicación.
-    Modo asíncrono, operando con cliente Redis centralizado.
+    Modo asíncrono. Las lecturas usan el snapshot de toda la tabla
+    (ver load_settings_snapshot): sin consultas por clave y sin ir a
+    Postgres para claves que no existen.
     """
 
     def __init__(self, session: AsyncSession):
         self.db = session
-        logger.debug("SettingsService inicializado.")
 
     async def get(self, key: str, default: Any = None) -> Any:
-        """Obtiene un valor desde Redis o la base de datos."""
-        logger.debug("get(key='%s') iniciado.", key)
-
-        cache_key = f"{CACHE_KEY_PREFIX}{key}"
+        """Obtiene un valor del snapshot, o `default` si no existe."""
         try:
-            cached_value = await redis_client.get(cache_key)
-            if cached_value is not None:
-                logger.debug("Cache HIT para key='%s'", cache_key)
-            else:
-                logger.debug("Cache MISS para key='%s'", cache_key)
+            snapshot = await load_settings_snapshot()
         except Exception as e:
-            logger.exception("Error leyendo cache Redis para key='%s': %s", cache_key, e)
-            cached_value = None
-
-        if cached_value is not None:
-            try:
-                value = json.loads(cached_value)
-                logger.debug("Cache deserializado exitosamente para key='%s'", key)
-                return value
-            except json.JSONDecodeError as e:
-                logger.warning(
-                    "No se pudo deserializar JSON para key='%s', devolviendo string crudo. Error: %s",
-                    key,
-                    e,
-                )
-                return cached_value
-
-        logger.debug("Consultando BD para key='%s'", key)
-        db_setting = await self.db.get(AppSetting, key)
-
-        if db_setting is None:
-            logger.debug(
-                "Key '%s' no encontrada en BD, devolviendo default=%s", key, default
-            )
-            return default
+            logger.exception("Error cargando snapshot de settings: %s", e)
+            db_setting = await self.db.get(AppSetting, key)
+            return default if db_setting is None else db_setting.value
+        return snapshot.get(key, default)
 
+    async def get_many(self, keys: list[str], default: Any = None) -> dict[str, Any]:
+        """Obtiene varios valores de una vez: {key: valor o `default`}."""
         try:
-            await redis_client.set(
-                cache_key, json.dumps(db_setting.value), ex=CACHE_EXPIRATION_SECONDS
-            )
-            logger.debug(
-                "Cache establecida para key='%s' con TTL=%ds",
-                cache_key,
-                CACHE_EXPIRATION_SECONDS,
-            )
+            snapshot = await load_settings_snapshot()
         except Exception as e:
-            logger.exception("Error estableciendo cache para key='%s': %s", cache_key, e)
-
-        logger.debug(
-            "Valor retornado desde BD para key='%s', type=%s",
-            key,
-            type(db_setting.value).__name__,
-        )
-        return db_setting.value
+            logger.exception("Error cargando snapshot de settings: %s", e)
+            values = {}
+            for key in keys:
+                db_setting = await self.db.get(AppSetting, key)
+                values[key] = default if db_setting is None else db_setting.value
+            return values
+        return {key: snapshot.get(key, default) for key in keys}
 
     async def update(self, key: str, value: Any, description: str = None) -> AppSetting:
-        """Actualiza o crea un valor en la BD y la caché."""
-        logger.debug(
-            "update(key='%s') iniciado. value_type=%s, description=%s",
-            key,
-            type(value).__name__,
-            description,
-        )
-
+        """Actualiza o crea un valor en la BD e invalida el snapshot."""
         db_setting = await self.db.get(AppSetting, key)
         if db_setting:
-            logger.debug("Actualizando setting existente: key='%s'", key)
             db_setting.value = value
             if description is not None:
                 db_setting.description = description
         else:
-            logger.debug("Creando nuevo setting: key='%s'", key)
             db_setting = AppSetting(key=key, value=value, description=description)
 
         self.db.add(db_setting)
@@ -103,44 +98,30 @@ class SettingsService:
         await self.db.refresh(db_setting)
         logger.info("Setting guardado en BD: key='%s'", key)
 
-        try:
-            await redis_client.set(
-                f"{CACHE_KEY_PREFIX}{key}",
-                json.dumps(db_setting.value),
-                ex=CACHE_EXPIRATION_SECONDS,
-            )
-            logger.debug("Cache actualizada para key='%s'", key)
-        except Exception as e:
-            logger.exception("Error actualizando cache para key='%s': %s", key, e)
-
+        await self.clear_cache_for_key(key)
         return db_setting
 
     async def clear_cache_for_key(self, key: str):
-        """Limpia la caché de una clave específica."""
-        logger.debug("clear_cache_for_key(key='%s') iniciado", key)
+        """
+        Invalida el snapshot tras cambiar una clave (también desde los hooks
+        de sqladmin). Todos los procesos lo recargan en su siguiente lectura.
+        """
         try:
-            cache_key = f"{CACHE_KEY_PREFIX}{key}"
-            await redis_client.delete(cache_key)
-            logger.info("Cache eliminada para setting: key='%s'", key)
+            await redis_client.incr(VERSION_CACHE_KEY)
+            await cache_service.delete(SNAPSHOT_CACHE_KEY, f"{CACHE_KEY_PREFIX}{key}")
+            logger.info("Cache invalidada para setting: key='%s'", key)
         except Exception as e:
             logger.exception("Error eliminando cache para key='%s': %s", key, e)
 
     async def clear_all_cache(self):
         """Limpia toda la caché de configuraciones."""
-        logger.debug("clear_all_cache() iniciado")
         try:
-            keys_to_delete = await redis_client.keys(f"{CACHE_KEY_PREFIX}*")
-            count = len(keys_to_delete) if keys_to_delete else 0
-            logger.debug(
-                "Encontradas %d keys para eliminar con patrón '%s*'",
-                count,
-                CACHE_KEY_PREFIX,
-            )
-
+            await redis_client.incr(VERSION_CACHE_KEY)
+            keys_to_delete = [
+                key async for key in redis_client.scan_iter(match=f"{CACHE_KEY_PREFIX}*")
+            ]
             if keys_to_delete:
-                await redis_client.delete(*keys_to_delete)
-                logger.info("Cache completa de settings eliminada (%d keys)", count)
-            else:
-                logger.debug("No hay keys de cache para eliminar")
+                await cache_service.delete(*keys_to_delete)
+            logger.info("Cache completa de settings eliminada (%d keys)", len(keys_to_delete))
         except Exception as e:
             logger.exception("Error eliminando todas las cache de settings: %s", e)
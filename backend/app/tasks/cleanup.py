@@ -0,0 +1,71 @@
+"""
+app/tasks/cleanup.py
+
+Tareas de limpieza periódicas (cola `maintenance`, ver beat_schedule.py).
+
+cleanup_expired_pdfs — borra de MinIO los PDFs caducados. No recorre el
+bucket: upload_pdf registra cada PDF en el índice de expiración de Redis
+(CacheKeys.pdf_expiry_index) y aquí solo se sacan las entradas vencidas,
+en lotes de CacheKeys.PDF_EXPIRY_BATCH, que se borran con DeleteObjects.
+El coste depende de los PDFs caducados, no de los guardados.
+
+Un CV cuyo PDF se volvió a subir después de sacarlo del índice vuelve a
+tener entrada (upload_pdf la registra): se comprueba justo antes de borrar
+y se salta. Queda la ventana entre la subida del objeto y su ZADD.
+
+    celery -A app.core.celery.celery_app call app.tasks.cleanup.cleanup_expired_pdfs
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+
+from celery import shared_task
+
+from app.core.logging import get_logger
+
+log = get_logger(__name__)
+
+
+async def _cleanup_expired_pdfs(max_batches: int) -> dict[str, int]:
+    from app.core.cache import CacheKeys, cache_service
+    from app.core.redis import redis_pools
+    from app.core.s3 import MinIOClient
+
+    storage = MinIOClient()
+    now     = time.time()
+    deleted = 0
+    # Se devuelven al índice al terminar: en esta misma ejecución volverían
+    # a salir como vencidos
+    retry: dict[str, float] = {}
+    try:
+        for _ in range(max_batches):
+            due = await cache_service.pop_expired_pdfs(now, CacheKeys.PDF_EXPIRY_BATCH)
+            if not due:
+                break
+            reuploaded = await cache_service.scheduled_pdfs(list(due))
+            expired    = [cv_id for cv_id in due if cv_id not in reuploaded]
+            try:
+                failed = await storage.delete_pdfs(expired) if expired else []
+            except Exception:
+                # El lote ya salió del índice: sin esto sus PDFs no se
+                # borrarían nunca
+                retry.update((cv_id, due[cv_id]) for cv_id in expired)
+                raise
+            retry.update((cv_id, due[cv_id]) for cv_id in failed)
+            deleted += len(expired) - len(failed)
+            if len(due) < CacheKeys.PDF_EXPIRY_BATCH:
+                break
+    finally:
+        await cache_service.requeue_pdf_expiry(retry)
+        await storage.close()
+        await redis_pools.close("cache")
+    return {"deleted": deleted, "failed": len(retry)}
+
+
+@shared_task(name="app.tasks.cleanup.cleanup_expired_pdfs", ignore_result=False)
+def cleanup_expired_pdfs(max_batches: int = 20) -> dict[str, int]:
+    """Borra los PDFs caducados (como mucho max_batches lotes por ejecución)."""
+    summary = asyncio.run(_cleanup_expired_pdfs(max_batches))
+    log.info("celery.cleanup_expired_pdfs.done", **summary)
+    return summary
@@ -0,0 +1,49 @@
+"""
+app/tasks/maintenance.py
+
+Tareas de mantenimiento (cola `maintenance`).
+
+warm_cache — precalienta la caché tras un despliegue. Lanzar desde el
+pipeline de despliegue cuando la nueva versión ya atiende tráfico:
+
+    celery -A app.core.celery.celery_app call app.tasks.maintenance.warm_cache
+"""
+from __future__ import annotations
+
+import asyncio
+
+from celery import shared_task
+
+from app.core.logging import get_logger
+
+log = get_logger(__name__)
+
+
+async def _warm_cache(include_users: bool) -> dict[str, int] | None:
+    from fastapi_cache import FastAPICache
+
+    from app.core.cache import (
+        setup_cache,
+        stop_l1_invalidation_listener,
+        teardown_cache,
+    )
+    from app.core.cache_warmup import warm_cache
+    from app.main import app
+
+    # El worker no tiene lifespan: inicializa fastapi-cache para que las
+    # rutas con @cached escriban en Redis. La L1 no aplica aquí.
+    await setup_cache()
+    await stop_l1_invalidation_listener()
+    try:
+        return await warm_cache(app, include_users=include_users)
+    finally:
+        FastAPICache.reset()
+        await teardown_cache()
+
+
+@shared_task(name="app.tasks.maintenance.warm_cache", ignore_result=False)
+def warm_cache_task(include_users: bool = True) -> dict[str, int] | None:
+    """Precalienta plantillas, settings, enums y, opcionalmente, usuarios recientes."""
+    summary = asyncio.run(_warm_cache(include_users))
+    log.info("celery.warm_cache.done", summary=summary)
+    return summary
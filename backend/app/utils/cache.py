@@ -14,19 +14,15 @@ async def invalidate_cache_pattern(redis_client, pattern: str):
     Args:
         redis_client: Cliente de Redis (asíncrono)
         pattern: Patrón de búsqueda (ej: "fastapi-cache:*features*")
+
+    Raises:
+        RedisError: si el SCAN o el DELETE fallan (se registra y se relanza:
+            quien llama decide si reintenta).
     """
     try:
         # Buscar todas las claves que coincidan con el patrón usando SCAN
-        keys = []
-        cursor = 0
-
-        while True:
-            cursor, partial_keys = await redis_client.scan(
-                cursor, match=pattern, count=100
-            )
-            keys.extend(partial_keys)
-            if cursor == 0:
-                break
+        # (scan_iter recorre también todos los maestros en Redis Cluster)
+        keys = [key async for key in redis_client.scan_iter(match=pattern, count=100)]
 
         if keys:
             # Eliminar todas las claves encontradas
@@ -40,4 +36,5 @@ async def invalidate_cache_pattern(redis_client, pattern: str):
             )
     except Exception as e:
         logger.error(f"⚠️  Error al invalidar patrón {pattern}: {e}", exc_info=True)
+        raise
 
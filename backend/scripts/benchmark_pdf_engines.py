@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark de los motores de renderizado PDF (WeasyPrint vs. directo).
+
+Renderiza los mismos CVs con ambos motores y la plantilla 'ats-plain',
+y muestra tiempo por CV (p50 / p95), CVs por segundo y tamaño medio del PDF.
+La primera pasada de cada motor (importación, carga de fuentes) se mide aparte.
+
+Ejecutar desde backend/ con el entorno de la app configurado:
+    PYTHONPATH=. python scripts/benchmark_pdf_engines.py --cvs 50 --rounds 3
+"""
+import argparse
+import statistics
+import time
+
+from app.enums import RenderEngineName
+from app.services.pdf import CVDocument, CVSection, PdfService
+
+TEMPLATE_SLUG = "ats-plain"
+
+
+def build_sample_cvs(count: int) -> list[CVDocument]:
+    """CVs sintéticos de tamaño realista (1-2 páginas)."""
+    cvs = []
+    for i in range(count):
+        experience = [
+            f"Empresa {j} — Desarrollador/a backend ({2015 + j}-{2016 + j}). "
+            "Diseño de APIs REST con FastAPI, colas con Celery y caché con Redis; "
+            "migración de servicios síncronos a asyncio y reducción de latencia p95."
+            for j in range(4 + i % 4)
+        ]
+        cvs.append(
+            CVDocument(
+                full_name=f"Candidata Número {i}",
+                headline="Ingeniera de software — Python, PostgreSQL, Redis",
+                contact=[f"persona{i}@example.com", "+34 600 000 000", "Madrid"],
+                summary=(
+                    "Más de diez años construyendo plataformas web de alto tráfico. "
+                    "Interés especial en rendimiento, observabilidad y calidad de código."
+                ),
+                sections=[
+                    CVSection("Experiencia", experience),
+                    CVSection("Educación", ["Grado en Ingeniería Informática — UPM"]),
+                    CVSection("Skills", ["Python, FastAPI, SQLAlchemy, Celery, Redis, Docker"]),
+                ],
+            )
+        )
+    return cvs
+
+
+def run(engine: RenderEngineName, cvs: list[CVDocument], rounds: int) -> None:
+    service = PdfService()
+
+    t0 = time.perf_counter()
+    service.render(cvs[0], TEMPLATE_SLUG, engine=engine)
+    cold_ms = (time.perf_counter() - t0) * 1000
+
+    timings: list[float] = []
+    sizes:   list[int]   = []
+    for _ in range(rounds):
+        for cv in cvs:
+            t0 = time.perf_counter()
+            pdf = service.render(cv, TEMPLATE_SLUG, engine=engine)
+            timings.append((time.perf_counter() - t0) * 1000)
+            sizes.append(len(pdf))
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{engine.value:<11} cold={cold_ms:8.1f} ms  "
+        f"p50={statistics.median(timings):7.2f} ms  p95={p95:7.2f} ms  "
+        f"throughput={1000 / statistics.mean(timings):7.1f} CV/s  "
+        f"size={statistics.mean(sizes) / 1024:6.1f} KiB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cvs", type=int, default=50, help="CVs distintos a renderizar")
+    parser.add_argument("--rounds", type=int, default=3, help="Pasadas sobre el lote")
+    parser.add_argument(
+        "--engine",
+        choices=[e.value for e in RenderEngineName],
+        action="append",
+        help="Limitar a uno o varios motores (por defecto, todos)",
+    )
+    args = parser.parse_args()
+
+    cvs     = build_sample_cvs(args.cvs)
+    engines = [RenderEngineName(e) for e in args.engine] if args.engine else list(RenderEngineName)
+    for engine in engines:
+        run(engine, cvs, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark de los algoritmos de rate limiting (sliding_log, sliding_counter, gcra).
+
+Para cada algoritmo lanza `--clients` clientes distintos que hacen
+`--requests` hits cada uno de forma concurrente contra el Redis de rate
+limit, y muestra latencia por hit (p50 / p95), hits por segundo y memoria
+media por clave (MEMORY USAGE) al terminar. Con un límite alto el
+sliding_log guarda un miembro por request y su memoria crece con él; los
+otros dos se mantienen constantes.
+
+Las claves usan el prefijo `rate_limit:bench` y se borran al terminar.
+
+Ejecutar desde backend/ con el entorno de la app configurado:
+    PYTHONPATH=. python scripts/benchmark_rate_limiters.py --clients 200 --requests 50 --limit 1000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core.redis import redis_pools
+from app.enums import RateLimitAlgorithm
+from app.middlewares.rate_limit import RateLimiter
+
+KEY_PREFIX = "rate_limit:bench"
+
+
+async def client_loop(limiter: RateLimiter, key: str, requests: int, timings: list[float]) -> None:
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        await limiter.hit(key)
+        timings.append((time.perf_counter() - t0) * 1000)
+
+
+async def run(algorithm: RateLimitAlgorithm, clients: int, requests: int, limit: int) -> None:
+    limiter = RateLimiter(
+        max_requests=limit,
+        window_seconds=60,
+        key_prefix=f"{KEY_PREFIX}:{algorithm.value}",
+        algorithm=algorithm,
+    )
+    redis = limiter._redis
+    keys  = [f"{limiter.key_prefix}:{i}" for i in range(clients)]
+
+    timings: list[float] = []
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client_loop(limiter, key, requests, timings) for key in keys))
+    elapsed = time.perf_counter() - t0
+
+    sizes = [await redis.memory_usage(key, samples=0) or 0 for key in keys]
+    await redis.delete(*keys)
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{algorithm.value:<16} "
+        f"p50={statistics.median(timings):6.2f} ms  p95={p95:6.2f} ms  "
+        f"throughput={len(timings) / elapsed:8.0f} hits/s  "
+        f"memory={statistics.mean(sizes):8.0f} B/key"
+    )
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    algorithms = (
+        [RateLimitAlgorithm(a) for a in args.algorithm] if args.algorithm else list(RateLimitAlgorithm)
+    )
+    try:
+        for algorithm in algorithms:
+            await run(algorithm, args.clients, args.requests, args.limit)
+    finally:
+        await redis_pools.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=200, help="Clientes (claves) concurrentes")
+    parser.add_argument("--requests", type=int, default=50, help="Hits por cliente")
+    parser.add_argument("--limit", type=int, default=1000, help="max_requests del limiter")
+    parser.add_argument(
+        "--algorithm",
+        choices=[a.value for a in RateLimitAlgorithm],
+        action="append",
+        help="Limitar a uno o varios algoritmos (por defecto, todos)",
+    )
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark de los clientes de storage (aioboto3 vs. SDK de MinIO en hilos).
+
+Para cada cliente lanza `--ops` operaciones de cada tipo con `--concurrency`
+en vuelo a la vez contra el MinIO configurado, y muestra operaciones por
+segundo y latencia (p50 / p95):
+
+    presign   firma de un URL de descarga (sin la caché de Redis)
+    upload    upload_pdf         (PDF sintético de `--size-kb`)
+    stat      pdf_exists         (HEAD)
+
+Los objetos se crean como pdfs/bench-<n>.pdf y se borran al terminar.
+Con el SDK de MinIO la concurrencia real la limita el pool de hilos por
+defecto de asyncio (min(32, CPUs + 4)).
+
+Ejecutar desde backend/ con el entorno de la app configurado:
+    PYTHONPATH=. python scripts/benchmark_storage_clients.py --ops 500 --concurrency 100
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+
+from app.core.s3 import ObjectStorage, build_object_storage
+
+CLIENTS = ("aioboto3", "minio")
+
+
+async def measure(
+    name: str,
+    op: Callable[[int], Awaitable[object]],
+    ops: int,
+    concurrency: int,
+) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    timings: list[float] = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            t0 = time.perf_counter()
+            await op(i)
+            timings.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(ops)))
+    elapsed = time.perf_counter() - t0
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"  {name:<8} throughput={ops / elapsed:8.0f} ops/s  "
+        f"p50={statistics.median(timings):7.2f} ms  p95={p95:7.2f} ms"
+    )
+
+
+async def run(client: str, ops: int, concurrency: int, size_kb: int) -> None:
+    storage: ObjectStorage = build_object_storage(client)
+    payload = b"%PDF-1.4\n" + b"0" * (size_kb * 1024)
+    print(client)
+    try:
+        # Primera conexión (pool, credenciales) fuera de la medida
+        await storage.health_check()
+        await measure("presign", lambda i: storage._presign_pdfs([f"bench-{i}"]), ops, concurrency)
+        await measure("upload", lambda i: storage.upload_pdf(f"bench-{i}", payload), ops, concurrency)
+        await measure("stat", lambda i: storage.pdf_exists(f"bench-{i}"), ops, concurrency)
+        await asyncio.gather(*(storage.delete_pdf(f"bench-{i}") for i in range(ops)))
+    finally:
+        await storage.close()
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    for client in args.client or CLIENTS:
+        await run(client, args.ops, args.concurrency, args.size_kb)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=500, help="Operaciones de cada tipo")
+    parser.add_argument("--concurrency", type=int, default=100, help="Operaciones en vuelo")
+    parser.add_argument("--size-kb", type=int, default=64, help="Tamaño del PDF subido")
+    parser.add_argument(
+        "--client",
+        choices=CLIENTS,
+        action="append",
+        help="Limitar a uno o varios clientes (por defecto, todos)",
+    )
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Fakes de Redis compartidos por los tests de tests/core.
+
+FakeRedis       claves, sets y sorted sets en memoria. Cuenta round-trips:
+                cada comando suelto o cada pipeline ejecutado suma uno.
+                SCAN pagina de `scan_page` en `scan_page` claves y MEMORY
+                USAGE lee `sizes`.
+RateLimitRedis  simula el script del rate limiter con un máximo fijo.
+lua_redis       Redis que ejecuta Lua de verdad (fakeredis + lupa); el test
+                se omite si no están instalados. lua_redis_text decodifica
+                las respuestas, como el pool "app".
+"""
+from functools import wraps
+
+import pytest
+from redis.exceptions import ConnectionError
+
+
+def command(method):
+    """Comando de FakeRedis: fuera de un pipeline es un round-trip."""
+
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        if not self.pipelined:
+            self.round_trips += 1
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class FakePipeline:
+    """Encola los comandos y los ejecuta en orden contra el FakeRedis."""
+
+    def __init__(self, redis):
+        self._redis = redis
+        self._ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._ops.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        redis = self._redis
+        redis.round_trips += 1
+        redis.pipelined = True
+        try:
+            ops, self._ops = self._ops, []
+            return [await getattr(redis, name)(*a, **kw) for name, a, kw in ops]
+        finally:
+            redis.pipelined = False
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.ttls = {}
+        self.sets = {}
+        self.zsets = {}
+        self.published = []
+        self.sizes = {}
+        self.scan_page = 10
+        self.round_trips = 0
+        self.pipelined = False
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    # ── Strings ───────────────────────────────────────────────────────────────
+
+    @command
+    def get(self, key):
+        return self.store.get(key)
+
+    @command
+    def mget(self, keys):
+        return [self.store.get(k) for k in keys]
+
+    @command
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        self.ttls[key] = ex
+        return True
+
+    @command
+    def ttl(self, key):
+        if key not in self.store:
+            return -2
+        return self.ttls.get(key) or -1
+
+    @command
+    def expire(self, key, ttl, **kwargs):
+        return True
+
+    @command
+    def exists(self, key):
+        return int(key in self.store or key in self.sets or key in self.zsets)
+
+    @command
+    def delete(self, *keys):
+        deleted = 0
+        for key in keys:
+            self.ttls.pop(key, None)
+            found = [d.pop(key, None) for d in (self.store, self.sets, self.zsets)]
+            deleted += any(v is not None for v in found)
+        return deleted
+
+    @command
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+        return 0
+
+    # ── Keyspace ──────────────────────────────────────────────────────────────
+
+    @command
+    def scan(self, cursor, count=None):
+        keys = sorted(self.store)
+        following = cursor + self.scan_page
+        return (following if following < len(keys) else 0), keys[cursor:following]
+
+    @command
+    def memory_usage(self, key, samples=None):
+        return self.sizes.get(key)
+
+    @command
+    def dbsize(self):
+        return len(self.store)
+
+    # ── Sets ──────────────────────────────────────────────────────────────────
+
+    @command
+    def sadd(self, key, *members):
+        members_set = self.sets.setdefault(key, set())
+        added = len(set(members) - members_set)
+        members_set.update(members)
+        return added
+
+    @command
+    def smembers(self, key):
+        return set(self.sets.get(key, ()))
+
+    @command
+    def srandmember(self, key, count):
+        return list(self.sets.get(key, ()))[:count]
+
+    @command
+    def srem(self, key, *members):
+        members_set = self.sets.get(key, set())
+        removed = len(members_set & set(members))
+        members_set.difference_update(members)
+        if not members_set:
+            self.sets.pop(key, None)
+        return removed
+
+    # ── Sorted sets ───────────────────────────────────────────────────────────
+
+    @command
+    def zadd(self, key, mapping, **kwargs):
+        self.zsets.setdefault(key, {}).update(mapping)
+        return len(mapping)
+
+
+class RateLimitRedis:
+    """Simula el script del rate limiter: cuenta hits por clave con un máximo fijo."""
+
+    def __init__(self, retry_after_ms=5_000, fail=False):
+        self.retry_after_ms = retry_after_ms
+        self.fail = fail
+        self.calls = 0
+        self.hits = {}
+
+    async def evalsha(self, sha, numkeys, key, window_ms, limit, request_id, cost):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("down")
+        count = self.hits.get(key, 0)
+        if count + cost <= limit:
+            self.hits[key] = count + cost
+            return [1, limit - count - cost, 0]
+        return [0, 0, self.retry_after_ms]
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def rate_limit_redis():
+    return RateLimitRedis()
+
+
+def _lua_redis(**kwargs):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer(), **kwargs)
+
+
+@pytest.fixture
+def lua_redis():
+    return _lua_redis()
+
+
+@pytest.fixture
+def lua_redis_text():
+    return _lua_redis(decode_responses=True)
@@ -0,0 +1,64 @@
+import pytest
+
+from app.core import cache_codec
+from app.core.cache import CacheKeys, CacheService
+
+
+@pytest.fixture
+def service(fake_redis):
+    service = CacheService()
+    service._redis = fake_redis
+    return service
+
+
+@pytest.mark.asyncio
+async def test_set_many_uses_per_key_ttls_in_one_round_trip(service):
+    await service.set_many({"a:1": {"x": 1}, "b:2": [1, 2]}, ttl={"a:1": 30, "b:2": 60})
+
+    redis = service._redis
+    assert redis.round_trips == 1
+    assert redis.ttls == {"a:1": 30, "b:2": 60}
+    assert cache_codec.loads(redis.store["b:2"]) == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_get_many_returns_only_existing_keys(service):
+    await service.set_many({"a:1": {"x": 1}, "b:2": "two"}, ttl=30)
+    service._redis.round_trips = 0
+
+    assert await service.get_many(["a:1", "missing:3", "b:2"]) == {"a:1": {"x": 1}, "b:2": "two"}
+    assert service._redis.round_trips == 1
+
+
+@pytest.mark.asyncio
+async def test_get_cv_statuses_single_mget(service):
+    await service._redis.set(CacheKeys.cv_status("cv1"), cache_codec.dumps({"status": "ready"}))
+    service._redis.round_trips = 0
+
+    statuses = await service.get_cv_statuses(["cv1", "cv2"])
+
+    assert statuses == {"cv1": {"status": "ready"}, "cv2": None}
+    assert service._redis.round_trips == 1
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_skips_store_when_version_moved(lua_redis):
+    service = CacheService()
+    service._redis = lua_redis
+    version_key = "version:{k}"
+
+    async def load_then_bump():
+        await lua_redis.incr(version_key)
+        return {"v": 1}
+
+    value = await service.get_or_set("{k}:data", load_then_bump, 60, version_key=version_key)
+    assert value == {"v": 1}
+    assert await lua_redis.get("{k}:data") is None
+    assert await lua_redis.get(CacheKeys.fill_lock("{k}:data")) is None
+
+    async def load():
+        return {"v": 2}
+
+    assert await service.get_or_set("{k}:data", load, 60, version_key=version_key) == {"v": 2}
+    assert cache_codec.loads(await lua_redis.get("{k}:data")) == {"v": 2}
+    assert await lua_redis.ttl(CacheKeys.fresh_marker("{k}:data")) == 60
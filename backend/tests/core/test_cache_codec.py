@@ -0,0 +1,30 @@
+import json
+
+from app.core import cache_codec
+from app.core.config import settings
+
+
+def test_roundtrip_small_value_is_not_compressed():
+    data = cache_codec.dumps({"status": "ready"})
+    assert data[0] == cache_codec.MAGIC
+    assert data[1] == cache_codec.CODEC_JSON
+    assert cache_codec.loads(data) == {"status": "ready"}
+
+
+def test_large_values_are_compressed():
+    value = {"items": ["Desarrollo de APIs con FastAPI y Redis"] * 200}
+    data = cache_codec.dumps(value)
+    assert data[1] in (cache_codec.CODEC_JSON_ZLIB, cache_codec.CODEC_JSON_ZSTD)
+    assert len(data) < settings.CACHE_COMPRESSION_THRESHOLD
+    assert cache_codec.loads(data) == value
+
+
+def test_reads_legacy_plain_json():
+    legacy = json.dumps({"a": [1, 2]})
+    assert cache_codec.loads(legacy) == {"a": [1, 2]}
+    assert cache_codec.loads(legacy.encode()) == {"a": [1, 2]}
+
+
+def test_compact_coder_roundtrip():
+    encoded = cache_codec.CompactCoder.encode({"title": "CV", "n": 1})
+    assert cache_codec.CompactCoder.decode(encoded) == {"title": "CV", "n": 1}
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from app.core import cache_invalidation
+from app.core.cache import CacheKeys
+from app.core.cache_invalidation import GLOBAL_SCOPE, DeferredInvalidation
+
+
+@pytest.fixture
+def redis(monkeypatch, lua_redis_text):
+    redis = lua_redis_text
+    calls = []
+
+    async def invalidate_pattern(_client, pattern):
+        if pattern in redis.failing:
+            raise ConnectionError("down")
+        calls.append(pattern)
+        if redis.on_invalidate:
+            await redis.on_invalidate.pop(0)()
+
+    monkeypatch.setattr(cache_invalidation, "redis_client", redis)
+    monkeypatch.setattr(cache_invalidation, "invalidate_cache_pattern", invalidate_pattern)
+    redis.calls = calls
+    redis.failing = set()
+    redis.on_invalidate = []
+    return redis
+
+
+async def pending(redis, scope):
+    return await redis.zrange(CacheKeys.invalidation_pending(scope), 0, -1)
+
+
+@pytest.mark.asyncio
+async def test_burst_is_coalesced_and_runs_after_window(redis):
+    queue = DeferredInvalidation(window=0.01)
+    for _ in range(5):
+        await queue.enqueue("u1", patterns=["cvgen:http:*cv*"])
+    await queue.enqueue(None, patterns=["cvgen:http:*cv*"])
+
+    # La escritura no ejecuta la invalidación
+    assert redis.calls == []
+
+    # Una sola ejecución diferida para toda la ráfaga
+    await asyncio.wait_for(queue._drain_task, timeout=2)
+    assert redis.calls == ["cvgen:http:*cv*", "cvgen:http:*cv*"]
+    assert await pending(redis, "u1") == []
+    assert await pending(redis, GLOBAL_SCOPE) == []
+
+
+@pytest.mark.asyncio
+async def test_read_settles_pending_from_another_process(redis):
+    writer = DeferredInvalidation(window=60)
+    reader = DeferredInvalidation(window=60)
+    await writer.enqueue("u1", patterns=["p1", "p2"])
+
+    assert await reader.settle("u1", GLOBAL_SCOPE) == 2
+    assert sorted(redis.calls) == ["p1", "p2"]
+    assert await pending(redis, "u1") == []
+
+    # Sin pendientes: la lectura no ejecuta nada
+    assert await reader.settle("u1", GLOBAL_SCOPE) == 0
+    await writer.flush()
+    assert len(redis.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_invalidation_stays_pending(redis):
+    queue = DeferredInvalidation(window=60)
+    await queue.enqueue("u1", patterns=["p1", "p2"])
+    redis.failing.add("p2")
+
+    with pytest.raises(ConnectionError):
+        await queue.settle("u1")
+    assert await pending(redis, "u1") == ["p:p2"]
+
+    redis.failing.clear()
+    assert await queue.settle("u1") == 1
+    assert await pending(redis, "u1") == []
+
+
+@pytest.mark.asyncio
+async def test_write_during_settle_stays_pending(redis):
+    writer = DeferredInvalidation(window=60)
+    reader = DeferredInvalidation(window=60)
+    await writer.enqueue("u1", patterns=["p1"])
+
+    # Otra escritura del mismo patrón mientras se ejecuta la invalidación
+    redis.on_invalidate.append(lambda: writer.enqueue("u1", patterns=["p1"]))
+    await reader.settle("u1")
+    assert await pending(redis, "u1") == ["p:p1"]
+
+    assert await reader.settle("u1") == 1
+    assert redis.calls == ["p1", "p1"]
+    assert await pending(redis, "u1") == []
+    await writer.flush()
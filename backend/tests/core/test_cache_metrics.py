@@ -0,0 +1,37 @@
+from app.core.cache_metrics import CacheMetrics, namespace_of
+
+
+def test_namespace_of_http_and_service_keys():
+    assert namespace_of("cvgen:http::project:abc123") == "project"
+    assert namespace_of("cvgen:http::templates:abc123") == "templates"
+    assert namespace_of("cv_status:42") == "cv_status"
+    assert namespace_of("nonamespace") == "other"
+
+
+def test_summary_hit_ratio_fill_and_payload():
+    metrics = CacheMetrics()
+    key = "cvgen:http::skill:abc"
+    metrics.record("http", key, "miss")
+    metrics.record("http", key, "hit")
+    metrics.record("http", key, "hit_l1")
+    metrics.record("http", key, "stale")
+    metrics.record_fill("http", key, seconds=0.02)
+    metrics.record_write("http", key, size=300)
+    metrics.record_write("http", key, size=100)
+
+    [row] = metrics.summary()
+    assert (row["layer"], row["namespace"]) == ("http", "skill")
+    assert row["lookups"] == 4
+    assert row["hit_ratio"] == 0.75
+    assert row["avg_fill_ms"] == 20.0
+    assert row["avg_payload_bytes"] == 200
+
+
+def test_render_prometheus():
+    metrics = CacheMetrics()
+    metrics.record("service", "app_settings:X", "miss")
+    text = metrics.render_prometheus(l1_entries=3, l1_bytes=120)
+
+    assert 'cache_requests_total{layer="service",namespace="app_settings",result="miss"} 1' in text
+    assert "# TYPE cache_fill_seconds summary" in text
+    assert "cache_l1_entries 3" in text
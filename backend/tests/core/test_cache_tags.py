@@ -0,0 +1,181 @@
+import pytest
+from fastapi_cache import FastAPICache
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core import cache
+from app.core.cache import (
+    CacheKeys,
+    CacheService,
+    TaggedRedisBackend,
+    cached,
+    cv_detail_key_builder,
+    local_cache,
+    template_key_builder,
+    user_key_builder,
+)
+
+
+def _request(user_id: str, *headers: tuple[bytes, bytes]) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/v1/projects",
+        "query_string": b"",
+        "headers": [(b"x-user-id", user_id.encode()), *headers],
+    })
+
+
+@pytest.fixture
+def redis(fake_redis):
+    redis = fake_redis
+    FastAPICache.reset()
+    FastAPICache.init(backend=TaggedRedisBackend(redis), prefix="cvgen:http:")
+    yield redis
+    FastAPICache.reset()
+
+
+@pytest.mark.asyncio
+async def test_cached_responses_are_indexed_by_tag(redis):
+    backend = FastAPICache.get_backend()
+    key = user_key_builder(None, "cvgen:http::project", request=_request("u1"))
+    await backend.set(key, "[]", CacheKeys.TTL_PROJECTS)
+
+    assert key in redis.sets[CacheKeys.tag_user("u1")]
+    assert key in redis.sets[CacheKeys.tag_user("u1", CacheKeys.NS_PROJECTS)]
+
+
+@pytest.mark.asyncio
+async def test_tag_sets_drop_expired_keys(redis, monkeypatch):
+    backend = FastAPICache.get_backend()
+    tag     = CacheKeys.tag_user("u1")
+    old     = user_key_builder(None, "cvgen:http::skill", request=_request("u1"))
+    await backend.set(old, "[]", CacheKeys.TTL_SKILLS)
+    del redis.store[old]  # expiró en Redis
+
+    monkeypatch.setattr(CacheKeys, "TAG_PRUNE_RATE", 1.0)
+    new = user_key_builder(None, "cvgen:http::project", request=_request("u1"))
+    await backend.set(new, "[]", CacheKeys.TTL_PROJECTS)
+
+    assert redis.sets[tag] == {new}
+
+
+@pytest.mark.asyncio
+async def test_invalidate_cv_deletes_only_tagged_keys(redis):
+    backend = FastAPICache.get_backend()
+    projects = user_key_builder(None, "cvgen:http::project", request=_request("u1"))
+    await backend.set(projects, "[]", CacheKeys.TTL_PROJECTS)
+    detail = cv_detail_key_builder(None, "cvgen:http::cv", request=_request("u1"), kwargs={"cv_id": "cv1"})
+    await backend.set(detail, "{}", CacheKeys.TTL_CV_DETAIL)
+
+    service = CacheService()
+    service._redis = redis
+    await service.invalidate_cv("cv1", "u1")
+
+    assert detail not in redis.store
+    assert projects in redis.store
+    assert CacheKeys.tag_cv("cv1") not in redis.sets
+
+
+@pytest.fixture
+def lua_backend(lua_redis):
+    FastAPICache.reset()
+    FastAPICache.init(backend=TaggedRedisBackend(lua_redis), prefix="cvgen:http:")
+    local_cache.clear()
+    yield lua_redis
+    local_cache.clear()
+    FastAPICache.reset()
+
+
+@pytest.mark.asyncio
+async def test_failed_handler_releases_fill_lock(lua_backend):
+    calls = []
+
+    @cached(expire=60, key_builder=template_key_builder)
+    async def templates(request: Request):  # noqa: ARG001 — la usa @cached
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("db down")
+        return ["classic"]
+
+    with pytest.raises(RuntimeError):
+        await templates(request=_request("u1"))
+    assert await lua_backend.keys(f"{CacheKeys._PFX_LOCK}*") == []
+
+    # El siguiente recalcula sin esperar al TTL del lock
+    assert await templates(request=_request("u1")) == ["classic"]
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_no_cache_request_skips_lock_and_wait(lua_backend, monkeypatch):
+    waits = []
+
+    async def wait_for_fill(_redis, key):
+        waits.append(key)
+        return 0, None
+
+    monkeypatch.setattr(cache, "_wait_for_fill", wait_for_fill)
+
+    @cached(expire=60, key_builder=template_key_builder)
+    async def templates(request: Request):  # noqa: ARG001 — la usa @cached
+        return ["classic"]
+
+    # Otro proceso está recalculando la entrada
+    key = template_key_builder(None, request=_request("u1"))
+    await lua_backend.set(CacheKeys.fill_lock(key), "other", ex=10)
+
+    request = _request("u1", (b"cache-control", b"no-cache"))
+    assert await templates(request=request) == ["classic"]
+    assert waits == []
+    assert await lua_backend.get(CacheKeys.fill_lock(key)) == b"other"
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("lua_backend")
+async def test_strong_etag_on_every_path(monkeypatch):
+    monkeypatch.setattr(local_cache, "enabled", True)
+
+    @cached(expire=60, key_builder=template_key_builder)
+    async def templates(request: Request, response: Response):  # noqa: ARG001 — las usa @cached
+        return ["classic"]
+
+    first = Response()
+    await templates(request=_request("u1"), response=first)
+    etag = first.headers["etag"]
+    assert not etag.startswith("W/")
+
+    # Acierto en la L1 del proceso: mismo ETag fuerte
+    again = Response()
+    await templates(request=_request("u1"), response=again)
+    assert again.headers["etag"] == etag
+
+    # If-None-Match: 304 sin ejecutar el handler
+    conditional = _request("u1", (b"if-none-match", etag.encode()))
+    response = await templates(request=conditional, response=Response())
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_after_invalidation_is_not_304(lua_backend):
+    projects = [["p1"]]
+
+    @cached(expire=60, namespace=CacheKeys.NS_PROJECTS, key_builder=user_key_builder)
+    async def list_projects(request: Request, response: Response):  # noqa: ARG001 — las usa @cached
+        return projects[-1]
+
+    first = Response()
+    await list_projects(request=_request("u1"), response=first)
+    etag = first.headers["etag"]
+
+    # Escritura del usuario → invalidación de sus proyectos
+    projects.append(["p1", "p2"])
+    service = CacheService()
+    service._redis = lua_backend
+    await service.invalidate_user_projects("u1")
+
+    conditional = _request("u1", (b"if-none-match", etag.encode()))
+    fresh = Response()
+    assert await list_projects(request=conditional, response=fresh) == ["p1", "p2"]
+    assert fresh.headers["etag"] != etag
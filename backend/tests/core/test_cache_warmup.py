@@ -0,0 +1,59 @@
+from uuid import UUID, uuid4
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+
+from app.api.deps import get_user_id
+from app.core import cache_warmup
+from app.core.cache import CacheKeys, cache_service
+from app.core.config import settings
+
+
+@pytest.fixture
+def app(monkeypatch, lua_redis):
+    app = FastAPI()
+
+    @app.get("/me")
+    async def me(user_id: UUID = Depends(get_user_id)):
+        return {"id": str(user_id)}
+
+    active = []
+
+    async def mark_user_active(user_id):
+        active.append(str(user_id))
+
+    async def warm_app_settings(_semaphore):
+        return 0
+
+    monkeypatch.setattr(cache_service, "mark_user_active", mark_user_active)
+    monkeypatch.setattr(cache_warmup, "warm_app_settings", warm_app_settings)
+    monkeypatch.setattr(cache_warmup, "get_redis_client", lambda: lua_redis)
+    monkeypatch.setattr(settings, "CACHE_WARMUP_PATHS", [])
+    monkeypatch.setattr(settings, "CACHE_WARMUP_USER_PATHS", ["/me"])
+    monkeypatch.setattr(settings, "CACHE_WARMUP_RECENT_USERS", 10)
+    app.state.active = active
+    return app
+
+
+@pytest.mark.asyncio
+async def test_warmup_requests_are_not_user_activity(app, monkeypatch, lua_redis):
+    user = str(uuid4())
+
+    async def recent_users(_limit):
+        return [user]
+
+    monkeypatch.setattr(cache_service, "recent_users", recent_users)
+
+    summary = await cache_warmup.warm_cache(app)
+
+    assert summary["user_paths"] == 1
+    assert app.state.active == []
+    # El lock se libera al terminar
+    assert await lua_redis.get(CacheKeys.warmup_lock()) is None
+
+    # Una petición real sí cuenta, aunque intente hacerse pasar por warm-up
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get("/me", headers={"X-User-Id": user, cache_warmup.WARMUP_HEADER: "guess"})
+    assert app.state.active == [user]
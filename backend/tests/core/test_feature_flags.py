@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from app import feature_flags
+from app.core import cache
+from app.core.cache import CacheKeys, cache_service
+from app.feature_flags import FlagRuleset, rollout_bucket
+
+
+def test_defaults_apply_to_flags_without_rules():
+    ruleset = FlagRuleset({}, defaults={"legacy": True})
+    assert ruleset.is_enabled("legacy") is True
+    assert ruleset.is_enabled("unknown") is False
+
+
+def test_global_switch_and_allow_list():
+    ruleset = FlagRuleset({
+        "off": {"enabled": False, "rollout_percentage": 100, "allow_list": ["u1"]},
+        "beta": {"enabled": True, "rollout_percentage": 0, "allow_list": ["u1"]},
+    })
+    assert ruleset.is_enabled("off", "u1") is False
+    assert ruleset.is_enabled("beta", "u1") is True
+    assert ruleset.is_enabled("beta", "u2") is False
+    assert ruleset.is_enabled("beta") is False
+
+
+def test_percentage_rollout_is_stable_and_proportional():
+    ruleset = FlagRuleset({"half": {"enabled": True, "rollout_percentage": 50}})
+    users = [f"user-{i}" for i in range(2000)]
+    enabled = [u for u in users if ruleset.is_enabled("half", u)]
+
+    assert 850 < len(enabled) < 1150
+    assert all(rollout_bucket("half", u) < 50 for u in enabled)
+    assert [ruleset.is_enabled("half", u) for u in users[:50]] == [
+        ruleset.is_enabled("half", u) for u in users[:50]
+    ]
+
+
+@pytest.fixture
+def stored_rules(monkeypatch):
+    """Reglas que devuelve la caché; el ruleset del proceso se restaura al final."""
+    rules = {"beta": {"enabled": False}}
+
+    async def get_or_set(_key, _loader, _expire):
+        return dict(rules)
+
+    async def delete(*_keys):
+        return 1
+
+    monkeypatch.setattr(cache_service, "get_or_set", get_or_set)
+    monkeypatch.setattr(cache_service, "delete", delete)
+    monkeypatch.setattr(feature_flags, "_ruleset", FlagRuleset())
+    monkeypatch.setattr(feature_flags, "_compiled_from", None)
+    monkeypatch.setattr(cache, "_l1_hooks", {})
+    return rules
+
+
+@pytest.mark.asyncio
+async def test_writing_a_flag_recompiles_the_module_ruleset(stored_rules):
+    await feature_flags.setup_feature_flags()
+    assert feature_flags.is_enabled("beta") is False
+
+    stored_rules["beta"] = {"enabled": True}
+    await feature_flags.invalidate_feature_flags()
+    assert feature_flags.is_enabled("beta") is True
+
+
+@pytest.mark.asyncio
+async def test_l1_invalidation_recompiles_other_processes(stored_rules):
+    await feature_flags.setup_feature_flags()
+    stored_rules["beta"] = {"enabled": True}
+
+    cache._run_l1_hooks([CacheKeys.feature_flags()])
+    await asyncio.gather(*cache._l1_hook_tasks)
+    assert feature_flags.is_enabled("beta") is True
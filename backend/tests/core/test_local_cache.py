@@ -0,0 +1,49 @@
+import time
+
+from app.core.local_cache import MISS, LocalCache
+
+
+def _cache(**kwargs) -> LocalCache:
+    defaults = {"max_entries": 10, "max_bytes": 1000, "policy": {"tpl:": 60, "cfg:": 5}}
+    cache = LocalCache(**{**defaults, **kwargs})
+    cache.enabled = True
+    return cache
+
+
+def test_only_policy_namespaces_are_cached():
+    cache = _cache()
+    assert cache.set("tpl:list", "[]")
+    assert not cache.set("user:1:cvs", "[]")
+    assert cache.get("tpl:list") == "[]"
+    assert cache.get("user:1:cvs") is MISS
+
+
+def test_disabled_cache_never_serves():
+    cache = _cache()
+    cache.set("tpl:list", "[]")
+    cache.enabled = False
+    assert cache.get("tpl:list") is MISS
+
+
+def test_ttl_is_capped_by_policy(monkeypatch):
+    cache = _cache()
+    now = time.monotonic()
+    cache.set("cfg:x", 1, ttl=3600)
+    monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+    assert cache.get("cfg:x") is MISS
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = _cache(max_entries=2)
+    cache.set("tpl:a", "a")
+    cache.set("tpl:b", "b")
+    cache.get("tpl:a")
+    cache.set("tpl:c", "c")
+    assert cache.get("tpl:b") is MISS
+    assert cache.get("tpl:a") == "a"
+
+    cache = _cache(max_bytes=10)
+    cache.set("tpl:a", "x" * 6)
+    cache.set("tpl:b", "y" * 6)
+    assert cache.get("tpl:a") is MISS
+    assert cache.nbytes == 6
@@ -0,0 +1,94 @@
+import os
+import time
+
+import pytest
+
+from app.core.pdf_disk_cache import PdfDiskCache
+
+
+async def stream(*chunks, fail=False):
+    for chunk in chunks:
+        yield chunk
+    if fail:
+        raise ConnectionError("minio")
+
+
+async def fill(cache, name, etag, *chunks, fail=False):
+    return b"".join([c async for c in cache.tee(name, etag, stream(*chunks, fail=fail))])
+
+
+@pytest.mark.asyncio
+async def test_tee_stores_by_object_and_etag(tmp_path):
+    cache = PdfDiskCache(tmp_path, max_bytes=1024)
+
+    assert await cache.get("pdfs/a.pdf", "e1") is None
+    assert await fill(cache, "pdfs/a.pdf", '"e1"', b"%PDF", b"-1") == b"%PDF-1"
+
+    path = await cache.get("pdfs/a.pdf", "e1")
+    assert path.read_bytes() == b"%PDF-1"
+
+    # Una versión nueva sustituye a la anterior (sin aciertos recientes)
+    os.utime(path, (0, 0))
+    await fill(cache, "pdfs/a.pdf", "e2", b"%PDF-2")
+    assert await cache.get("pdfs/a.pdf", "e1") is None
+    assert (await cache.get("pdfs/a.pdf", "e2")).read_bytes() == b"%PDF-2"
+
+
+@pytest.mark.asyncio
+async def test_failed_stream_is_not_cached(tmp_path):
+    cache = PdfDiskCache(tmp_path, max_bytes=1024)
+
+    with pytest.raises(ConnectionError):
+        await fill(cache, "pdfs/a.pdf", "e1", b"%PDF", fail=True)
+
+    assert await cache.get("pdfs/a.pdf", "e1") is None
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used(tmp_path):
+    cache = PdfDiskCache(tmp_path, max_bytes=250)
+    for i, name in enumerate(["a", "b"]):
+        await fill(cache, name, "e", b"x" * 100)
+        os.utime(cache.path_for(name, "e"), (i, i))
+
+    # Un acierto renueva "a": al llenarse sale "b"
+    await cache.get("a", "e")
+    await fill(cache, "c", "e", b"x" * 100)
+
+    assert await cache.get("b", "e") is None
+    assert await cache.get("a", "e") is not None
+    assert await cache.get("c", "e") is not None
+
+
+@pytest.mark.asyncio
+async def test_recently_served_files_are_not_deleted(tmp_path):
+    cache = PdfDiskCache(tmp_path, max_bytes=150)
+    await fill(cache, "a", "e1", b"x" * 100)
+    await cache.get("a", "e1")
+
+    # Otro worker puede estar a punto de enviar "a": ni la versión nueva
+    # ni el desalojo lo borran todavía
+    await fill(cache, "a", "e2", b"x" * 100)
+    await fill(cache, "b", "e", b"x" * 100)
+    assert await cache.get("a", "e1") is not None
+
+    os.utime(cache.path_for("a", "e1"), (0, 0))
+    await fill(cache, "c", "e", b"x" * 10)
+    assert await cache.get("a", "e1") is None
+
+
+@pytest.mark.asyncio
+async def test_eviction_removes_abandoned_temp_files(tmp_path):
+    cache = PdfDiskCache(tmp_path, max_bytes=1024)
+    abandoned = tmp_path / ".tmp-crashed.pdf"
+    in_progress = tmp_path / ".tmp-writing.pdf"
+    abandoned.write_bytes(b"%PDF")
+    in_progress.write_bytes(b"%PDF")
+    old = time.time() - 3600
+    os.utime(abandoned, (old, old))
+
+    await fill(cache, "a", "e", b"%PDF")
+
+    assert not abandoned.exists()
+    assert in_progress.exists()
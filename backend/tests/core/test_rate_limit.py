@@ -0,0 +1,162 @@
+import pytest
+from fastapi import HTTPException, Response
+from starlette.requests import Request
+
+from app.enums import RateLimitAlgorithm
+from app.middlewares.rate_limit import RateLimiter
+
+
+def make_request(ip="1.2.3.4"):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/v1/items",
+        "headers": [(b"x-forwarded-for", ip.encode())],
+        "client": (ip, 1234),
+    })
+
+
+@pytest.fixture
+def limiter(rate_limit_redis):
+    limiter = RateLimiter(max_requests=2, window_seconds=60, key_prefix="rate_limit:test")
+    rate_limit_redis.retry_after_ms = 12_300
+    limiter._redis = rate_limit_redis
+    return limiter
+
+
+@pytest.mark.asyncio
+async def test_one_round_trip_and_headers(limiter):
+    response = Response()
+    result = await limiter.check_rate_limit(make_request(), response=response)
+
+    assert result.allowed
+    assert limiter._redis.calls == 1
+    assert response.headers["X-RateLimit-Remaining"] == "1"
+    assert response.headers["X-RateLimit-Limit"] == "2"
+
+
+@pytest.mark.asyncio
+async def test_over_limit_raises_429_with_retry_after(limiter):
+    await limiter.check_rate_limit(make_request())
+    await limiter.check_rate_limit(make_request())
+    with pytest.raises(HTTPException) as exc:
+        await limiter.check_rate_limit(make_request())
+
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "13"
+    assert exc.value.headers["X-RateLimit-Remaining"] == "0"
+    # Otro cliente tiene su propio contador
+    assert (await limiter.check_rate_limit(make_request("5.6.7.8"))).allowed
+
+
+@pytest.mark.asyncio
+async def test_fails_open_without_redis(limiter):
+    limiter._redis.fail = True
+    assert (await limiter.check_rate_limit(make_request())).allowed
+
+
+def test_algorithm_selects_script():
+    shas = {
+        RateLimiter(10, 60, algorithm=algorithm)._script.sha
+        for algorithm in RateLimitAlgorithm
+    }
+    assert len(shas) == len(RateLimitAlgorithm)
+    assert RateLimiter(10, 60, algorithm="gcra").algorithm is RateLimitAlgorithm.GCRA
+    with pytest.raises(ValueError):
+        RateLimiter(10, 60, algorithm="token_bucket")
+
+
+@pytest.mark.asyncio
+async def test_local_batch_syncs_in_batches_and_stays_exact(rate_limit_redis):
+    limiter = RateLimiter(max_requests=20, window_seconds=60, key_prefix="rate_limit:test", local_batch=4)
+    limiter._redis = redis = rate_limit_redis
+
+    results = [await limiter.hit("k") for _ in range(25)]
+
+    assert sum(r.allowed for r in results) == 20
+    assert redis.hits["k"] == 20
+    # Lejos del límite, un round-trip cada lote; cerca, uno por request
+    assert redis.calls < 20
+    assert [r.remaining for r in results[:20]] == list(range(19, -1, -1))
+
+
+# ── Scripts Lua contra un Redis que los ejecuta ───────────────────────────────
+
+class Clock:
+    """Sustituye al módulo `time` de fakeredis: el TIME de los scripts."""
+
+    def __init__(self):
+        # Múltiplo de la ventana de 60 s: el contador deslizante empieza ventana
+        self.now = 1_700_000_040.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch, lua_redis):  # noqa: ARG001 — se omite sin fakeredis/lupa
+    from fakeredis.commands_mixins import server_mixin
+
+    clock = Clock()
+    monkeypatch.setattr(server_mixin, "time", clock)
+    return clock
+
+
+def lua_limiter(redis, algorithm, max_requests):
+    limiter = RateLimiter(max_requests, 60, key_prefix="rate_limit:test", algorithm=algorithm)
+    limiter._redis = redis
+    return limiter
+
+
+@pytest.mark.asyncio
+async def test_sliding_log_script(lua_redis, clock):
+    limiter = lua_limiter(lua_redis, RateLimitAlgorithm.SLIDING_LOG, 3)
+    for remaining in (2, 1, 0):
+        assert (await limiter.hit("k")).remaining == remaining
+        clock.now += 10
+
+    # Hueco cuando caduque el hit más antiguo (t0 + 60 s)
+    denied = await limiter.hit("k")
+    assert not denied.allowed and denied.retry_after == 30
+    # Con coste 2 hace falta que caduque también el segundo (t0 + 10 s)
+    assert (await limiter.hit("k", cost=2)).retry_after == 40
+    # Un coste mayor que el máximo nunca cabe: una ventana entera
+    assert (await limiter.hit("k", cost=4)).retry_after == 60
+
+    # Los rechazos no cuentan: al caducar el primero cabe exactamente uno
+    clock.now += 30
+    assert (await limiter.hit("k")).remaining == 0
+    assert not (await limiter.hit("k")).allowed
+
+
+@pytest.mark.asyncio
+async def test_sliding_counter_script_weights_previous_window(lua_redis, clock):
+    limiter = lua_limiter(lua_redis, RateLimitAlgorithm.SLIDING_COUNTER, 10)
+    assert (await limiter.hit("k", cost=8)).remaining == 2
+
+    # 15 s dentro de la ventana siguiente la anterior pesa 0.75: 8 * 0.75 = 6
+    clock.now += 75
+    allowed = await limiter.hit("k", cost=4)
+    assert allowed.allowed and allowed.remaining == 0
+
+    # Cabe uno más cuando el peso baje a (10 - 4 - 1) / 8, a los 22.5 s
+    denied = await limiter.hit("k")
+    assert not denied.allowed and denied.retry_after == 8
+    clock.now += 7.5
+    assert (await limiter.hit("k")).allowed
+
+
+@pytest.mark.asyncio
+async def test_gcra_script_spaces_hits_and_charges_cost(lua_redis, clock):
+    # 4 por minuto: un hit cada 15 s, ráfaga de hasta 4
+    limiter = lua_limiter(lua_redis, RateLimitAlgorithm.GCRA, 4)
+    assert (await limiter.hit("k", cost=3)).remaining == 1
+
+    denied = await limiter.hit("k", cost=2)
+    assert not denied.allowed and denied.retry_after == 15
+    assert (await limiter.hit("k")).remaining == 0
+    assert (await limiter.hit("k")).retry_after == 15
+
+    clock.now += 15
+    assert (await limiter.hit("k")).allowed
+    assert not (await limiter.hit("k")).allowed
@@ -0,0 +1,82 @@
+import pytest
+
+from app.core import redis_report
+from app.core.cache import CacheKeys
+from app.core.redis_report import NO_TTL, OTHER_PREFIX, keyspace_report, prefix_of
+
+
+def keyspace(redis, sizes, ttls, page):
+    """Rellena el FakeRedis: claves con su MEMORY USAGE y su TTL."""
+    redis.store.update(dict.fromkeys(sizes, b""))
+    redis.sizes.update(sizes)
+    redis.ttls.update(ttls)
+    redis.scan_page = page
+    return redis
+
+
+def test_prefix_of_groups_http_by_namespace():
+    assert prefix_of("cvgen:http::templates:abc") == "cvgen:http:templates"
+    assert prefix_of("cv_status:123") == "cv_status:"
+    assert prefix_of("lock:fill:cvgen:http::cv:1") == "lock:"
+    assert prefix_of("something") == OTHER_PREFIX
+
+
+@pytest.mark.asyncio
+async def test_report_aggregates_by_prefix(fake_redis):
+    redis = keyspace(
+        fake_redis,
+        sizes={
+            "cvgen:http::templates:a": 1000,
+            "cvgen:http::templates:b": 3000,
+            "cv_status:1": 100,
+            "rate_limit:strict:1.2.3.4": 80,
+            "misc": 50,
+        },
+        ttls={"cvgen:http::templates:a": 30, "cvgen:http::templates:b": 600, "cv_status:1": 10},
+        page=2,
+    )
+    report = await keyspace_report(redis, max_keys=100, scan_count=2, pause=0)
+
+    assert report["complete"] is True
+    assert report["scanned"] == 5
+    assert report["total_bytes"] == 4230
+    assert list(report["prefixes"])[0] == "cvgen:http:templates"
+
+    templates = report["prefixes"]["cvgen:http:templates"]
+    assert templates["keys"] == 2
+    assert templates["avg_bytes"] == 2000
+    assert templates["max_bytes"] == 3000
+    assert templates["ttl"] == {"<1m": 1, "<1h": 1}
+    assert report["prefixes"]["rate_limit:"]["ttl"] == {NO_TTL: 1}
+    assert report["prefixes"][OTHER_PREFIX]["keys"] == 1
+
+
+@pytest.mark.asyncio
+async def test_report_stops_at_max_keys_and_extrapolates(fake_redis):
+    redis = keyspace(fake_redis, sizes={f"cv_status:{i}": 100 for i in range(10)}, ttls={}, page=3)
+    report = await keyspace_report(redis, max_keys=5, scan_count=3, pause=0)
+
+    assert report["complete"] is False
+    assert report["scanned"] == 5
+    # Dos lotes (SCAN + pipeline de MEMORY USAGE/TTL) y DBSIZE
+    assert redis.round_trips == 5
+    status = report["prefixes"]["cv_status:"]
+    assert status["keys"] == 5
+    assert status["estimated_keys"] == 10
+    assert status["estimated_bytes"] == 1000
+
+
+@pytest.mark.asyncio
+async def test_report_does_not_release_a_lock_taken_by_another_process(monkeypatch, lua_redis_text):
+    lock = CacheKeys.keyspace_report_lock()
+
+    async def slow_report(_redis, max_keys):
+        # El lock expira durante el informe y otro proceso lo toma
+        await lua_redis_text.set(lock, "other")
+        return {"max_keys": max_keys}
+
+    monkeypatch.setattr(redis_report.redis_pools, "client", lambda _name: lua_redis_text)
+    monkeypatch.setattr(redis_report, "keyspace_report", slow_report)
+
+    assert await redis_report.run_keyspace_report(max_keys=10) == {"max_keys": 10}
+    assert await lua_redis_text.get(lock) == "other"
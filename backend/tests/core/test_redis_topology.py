@@ -0,0 +1,53 @@
+from redis.crc import key_slot
+
+from app.core.cache import CacheKeys
+from app.core.redis import queue_delete, redis_pools
+
+
+class RecordingPipeline:
+    def __init__(self):
+        self.commands = []
+
+    def delete(self, *keys):
+        self.commands.append(("DEL", *keys))
+
+    def execute_command(self, *args):
+        self.commands.append(args)
+
+
+def slot(key: str) -> int:
+    return key_slot(key.encode())
+
+
+def test_user_keys_share_a_slot():
+    user = "3fa85f64-5717-4562-b3fc-2c963f66afa6"
+    keys = [
+        CacheKeys.tag_user(user),
+        CacheKeys.tag_user(user, CacheKeys.NS_PROJECTS),
+        CacheKeys.user_projects(user),
+        CacheKeys.user_skills(user),
+        CacheKeys.user_cv_list(user),
+        CacheKeys.invalidation_pending(user),
+    ]
+    assert len({slot(k) for k in keys}) == 1
+
+    cv = "9b2d1c40-0000-4000-8000-000000000001"
+    cv_keys = [CacheKeys.cv_status(cv), CacheKeys.pdf_lock(cv), CacheKeys.cv_detail(cv), CacheKeys.tag_cv(cv)]
+    assert len({slot(k) for k in cv_keys}) == 1
+
+
+def test_queue_delete_single_command_outside_cluster(monkeypatch):
+    monkeypatch.setattr(redis_pools, "mode", "standalone")
+    pipe = RecordingPipeline()
+    assert queue_delete(pipe, ["a", "b"]) == 1
+    assert pipe.commands == [("DEL", "a", "b")]
+
+
+def test_queue_delete_splits_by_slot_in_cluster(monkeypatch):
+    monkeypatch.setattr(redis_pools, "mode", "cluster")
+    pipe = RecordingPipeline()
+    keys = [CacheKeys.tag_user("u1"), CacheKeys.user_projects("u1"), CacheKeys.tag_user("u2")]
+
+    assert queue_delete(pipe, keys) == 2
+    assert sorted(len(cmd) - 1 for cmd in pipe.commands) == [1, 2]
+    assert all(len({slot(k) for k in cmd[1:]}) == 1 for cmd in pipe.commands)
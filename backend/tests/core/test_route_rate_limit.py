@@ -0,0 +1,148 @@
+import pytest
+from pydantic import SecretStr
+
+from app.core import cache_warmup
+from app.core.config import settings
+from app.enums import RateLimitIdentity
+from app.middlewares.rate_limit import RateLimiter
+from app.middlewares.route_rate_limit import (
+    RateLimitMiddleware,
+    RateLimitRule,
+    RuleTable,
+    client_identity,
+)
+
+
+class DummyApp:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+
+def make_scope(path, method="GET", headers=(), ip="1.2.3.4"):
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": b"",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers],
+        "client": (ip, 1234),
+    }
+
+
+async def call(middleware, scope):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    start = messages[0]
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}
+
+
+@pytest.fixture
+def limiter(rate_limit_redis):
+    limiter = RateLimiter(max_requests=4, window_seconds=60, key_prefix="rate_limit:test")
+    limiter._redis = rate_limit_redis
+    return limiter
+
+
+def test_rule_table_matches_templates_and_methods(limiter):
+    table = RuleTable([
+        RateLimitRule(path="/cvs/{cv_id}/pdf", limiter=limiter, methods=frozenset({"POST"})),
+        RateLimitRule(path="/cvs/{cv_id}", limiter=limiter),
+        RateLimitRule(path="/cvs/latest", limiter=limiter, cost=2),
+    ])
+
+    assert table.match("POST", "/cvs/42/pdf").path == "/cvs/{cv_id}/pdf"
+    assert table.match("GET", "/cvs/42/pdf") is None
+    assert table.match("DELETE", "/cvs/42").path == "/cvs/{cv_id}"
+    # Las rutas estáticas tienen prioridad sobre las plantillas
+    assert table.match("GET", "/cvs/latest").cost == 2
+    assert table.match("GET", "/other") is None
+
+
+@pytest.mark.asyncio
+async def test_rejects_before_app_and_keys_by_template(limiter):
+    app = DummyApp()
+    middleware = RateLimitMiddleware(app, rules=[
+        RateLimitRule(path="/cvs/{cv_id}", limiter=limiter, identity=RateLimitIdentity.USER, cost=2),
+    ])
+    user_id = "0b7c3c1e-5f7e-4e8a-9d57-1f6f0e7c2a10"
+    user = [("X-User-Id", user_id)]
+
+    status, headers = await call(middleware, make_scope("/cvs/1", headers=user))
+    assert status == 200
+    assert headers["x-ratelimit-remaining"] == "2"
+
+    # Otro id de la misma ruta comparte contador: la clave usa la plantilla
+    await call(middleware, make_scope("/cvs/2", headers=user))
+    status, headers = await call(middleware, make_scope("/cvs/3", headers=user))
+
+    assert status == 429
+    assert headers["retry-after"] == "5"
+    assert app.calls == 2
+    assert list(limiter._redis.hits) == [f"rate_limit:test:/cvs/{{cv_id}}:user:{user_id}"]
+
+    # Otro usuario tiene su propio contador; sin X-User-Id cuenta la IP
+    assert (await call(middleware, make_scope("/cvs/1", headers=[("X-User-Id", "u2")])))[0] == 200
+    assert (await call(middleware, make_scope("/cvs/1")))[0] == 200
+    assert "rate_limit:test:/cvs/{cv_id}:ip:1.2.3.4" in limiter._redis.hits
+
+
+@pytest.mark.asyncio
+async def test_unmatched_requests_pass_through(limiter):
+    app = DummyApp()
+    middleware = RateLimitMiddleware(app, rules=[RateLimitRule(path="/cvs/{cv_id}", limiter=limiter)])
+
+    status, headers = await call(middleware, make_scope("/health"))
+
+    assert status == 200
+    assert "x-ratelimit-limit" not in headers
+    assert limiter._redis.hits == {}
+
+
+@pytest.mark.asyncio
+async def test_cache_warmup_requests_do_not_count(limiter, monkeypatch):
+    monkeypatch.setattr(cache_warmup, "_WARMUP_TOKEN", b"secret")
+    app = DummyApp()
+    middleware = RateLimitMiddleware(app, rules=[RateLimitRule(path="/cvs/{cv_id}", limiter=limiter)])
+
+    await call(middleware, make_scope("/cvs/1", headers=[(cache_warmup.WARMUP_HEADER, "secret")]))
+    assert limiter._redis.hits == {}
+
+    # Con otro valor el header no sirve para saltarse el límite
+    await call(middleware, make_scope("/cvs/1", headers=[(cache_warmup.WARMUP_HEADER, "guess")]))
+    assert sum(limiter._redis.hits.values()) == 1
+
+
+def test_only_a_valid_api_key_is_an_identity(monkeypatch):
+    monkeypatch.setattr(settings, "SECRET_KEY", SecretStr("s3cret"))
+
+    def identity(key):
+        scope = make_scope("/utils/clear-cache", headers=[("X-API-Key", key)])
+        return client_identity(scope, RateLimitIdentity.API_KEY)
+
+    assert identity("s3cret").startswith("key:")
+    assert "s3cret" not in identity("s3cret")
+    # Una clave inventada por request no abre contadores nuevos: cuenta la IP
+    assert identity("random-1") == identity("random-2") == "ip:1.2.3.4"
+
+
+def test_only_a_uuid_user_id_is_an_identity():
+    def identity(user_id):
+        scope = make_scope("/cvs/1/pdf", headers=[("X-User-Id", user_id)])
+        return client_identity(scope, RateLimitIdentity.USER)
+
+    user_id = "0b7c3c1e-5f7e-4e8a-9d57-1f6f0e7c2a10"
+    assert identity(user_id) == f"user:{user_id}"
+    assert identity(user_id.upper()) == identity(f"{{{user_id}}}") == f"user:{user_id}"
+    assert identity("random-1") == identity("random-2") == "ip:1.2.3.4"
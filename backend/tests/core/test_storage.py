@@ -0,0 +1,311 @@
+import pytest
+from botocore.exceptions import ClientError
+from minio.commonconfig import ENABLED, Filter
+from minio.lifecycleconfig import Expiration, LifecycleConfig, Rule
+
+from app.core.cache import CacheKeys, cache_service
+from app.core.config import settings
+from app.core.s3 import (
+    AsyncS3Client,
+    MinIOClient,
+    ObjectStorage,
+    UploadRejected,
+    build_object_storage,
+)
+
+
+class DummyS3:
+    """Cliente aioboto3 mínimo: objetos en un dict."""
+
+    def __init__(self):
+        self.objects = {}
+        self.presigned = []
+        self.posts = []
+        self.locked = set()
+        self.lifecycle = None
+
+    async def put_object(self, Bucket, Key, Body, ContentType, Metadata):
+        self.objects[(Bucket, Key)] = (Body, ContentType, Metadata)
+
+    async def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        body, content_type, _ = self.objects[(Bucket, Key)]
+        return {"ContentLength": len(body), "ContentType": content_type}
+
+    async def copy_object(self, Bucket, Key, CopySource):
+        self.objects[(Bucket, Key)] = self.objects[(CopySource["Bucket"], CopySource["Key"])]
+
+    async def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+    async def delete_objects(self, Bucket, Delete):
+        errors = []
+        for obj in Delete["Objects"]:
+            if obj["Key"] in self.locked:
+                errors.append({"Key": obj["Key"], "Code": "AccessDenied", "Message": "locked"})
+            else:
+                self.objects.pop((Bucket, obj["Key"]), None)
+        return {"Errors": errors} if errors else {}
+
+    async def head_bucket(self, Bucket):
+        return {}
+
+    async def get_bucket_lifecycle_configuration(self, Bucket):
+        if self.lifecycle is None:
+            raise ClientError({"Error": {"Code": "NoSuchLifecycleConfiguration"}}, "GetLifecycle")
+        return self.lifecycle
+
+    async def put_bucket_lifecycle_configuration(self, Bucket, LifecycleConfiguration):
+        self.lifecycle = LifecycleConfiguration
+
+    async def generate_presigned_url(self, method, Params, ExpiresIn):
+        self.presigned.append((method, Params, ExpiresIn))
+        return f"https://storage/{Params['Bucket']}/{Params['Key']}?sig"
+
+    async def generate_presigned_post(self, Bucket, Key, Fields, Conditions, ExpiresIn):
+        self.posts.append((Key, Conditions, ExpiresIn))
+        return {"url": f"https://storage/{Bucket}", "fields": {"key": Key, **Fields}}
+
+
+@pytest.fixture
+def redis(monkeypatch, fake_redis):
+    redis = fake_redis
+    monkeypatch.setattr(cache_service, "_redis", redis)
+    return redis
+
+
+@pytest.fixture
+def storage(redis):  # noqa: ARG001 — cache_service debe usar el FakeRedis
+    storage = AsyncS3Client()
+    storage._client = DummyS3()
+    return storage
+
+
+def test_build_object_storage():
+    assert isinstance(build_object_storage("minio"), MinIOClient)
+    assert isinstance(build_object_storage("aioboto3"), AsyncS3Client)
+    assert issubclass(MinIOClient, ObjectStorage)
+
+
+@pytest.mark.asyncio
+async def test_pdf_roundtrip(storage):
+    name = await storage.upload_pdf("cv1", b"%PDF")
+
+    assert name == "pdfs/cv1.pdf"
+    assert await storage.pdf_exists("cv1")
+    body, content_type, metadata = storage._client.objects[("cvs", name)]
+    assert (body, content_type, metadata["cv-id"]) == (b"%PDF", "application/pdf", "cv1")
+
+    await storage.delete_pdf("cv1")
+    assert not await storage.pdf_exists("cv1")
+    # Borrar algo que ya no existe no falla
+    await storage.delete_pdf("cv1")
+
+
+@pytest.mark.asyncio
+async def test_download_url_is_signed_in_process(storage):
+    url = await storage.get_download_url("cv1")
+
+    assert url.startswith("https://storage/cvs/pdfs/cv1.pdf")
+    method, params, _ = storage._client.presigned[0]
+    assert method == "get_object"
+    assert params["ResponseContentDisposition"] == 'attachment; filename="cv-cv1.pdf"'
+
+
+@pytest.mark.asyncio
+async def test_download_urls_cached_in_batch_until_pdf_changes(storage, redis, monkeypatch):
+    monkeypatch.setattr(settings, "MINIO_PRESIGN_TTL", 3600)
+    monkeypatch.setattr(settings, "MINIO_PRESIGN_REFRESH_MARGIN", 300)
+    presigned = storage._client.presigned
+
+    first = await storage.get_download_urls(["cv1", "cv2", "cv1"])
+    assert list(first) == ["cv1", "cv2"]
+    assert len(presigned) == 2
+    # Caduca en caché antes que el URL
+    assert set(redis.ttls.values()) == {3300}
+
+    # Solo se firma el que falta
+    again = await storage.get_download_urls(["cv2", "cv3", "cv1"])
+    assert again["cv1"] == first["cv1"]
+    assert len(presigned) == 3
+
+    # Una nueva versión del PDF descarta el URL cacheado
+    await storage.upload_pdf("cv1", b"%PDF-2")
+    await storage.get_download_url("cv1")
+    assert len(presigned) == 4
+
+
+@pytest.mark.asyncio
+async def test_avatar_upload_presigned_post(storage, monkeypatch):
+    monkeypatch.setattr(settings, "ASSET_UPLOAD_MAX_BYTES", 2048)
+
+    upload = await storage.presign_avatar_upload("u1", "image/png")
+
+    key, conditions, expires_in = storage._client.posts[0]
+    assert upload.fields["key"] == key == f"uploads/avatars/u1/{upload.token}"
+    assert {"Content-Type": "image/png"} in conditions
+    assert ["content-length-range", 1, 2048] in conditions
+    assert expires_in == upload.expires_in == settings.ASSET_UPLOAD_TTL
+
+    with pytest.raises(UploadRejected):
+        await storage.presign_avatar_upload("u1", "application/pdf")
+
+
+@pytest.mark.asyncio
+async def test_avatar_upload_complete(storage, monkeypatch):
+    monkeypatch.setattr(settings, "ASSET_UPLOAD_MAX_BYTES", 2048)
+    objects = storage._client.objects
+    upload  = await storage.presign_avatar_upload("u1", "image/png")
+    pending = ("cv-assets", upload.fields["key"])
+
+    # Nada subido todavía / token inventado
+    with pytest.raises(UploadRejected):
+        await storage.complete_avatar_upload("u1", upload.token)
+    with pytest.raises(UploadRejected):
+        await storage.complete_avatar_upload("u1", "../../templates/x")
+
+    objects[pending] = (b"0" * 4096, "image/png", {})
+    with pytest.raises(UploadRejected):
+        await storage.complete_avatar_upload("u1", upload.token)
+
+    objects[pending] = (b"png", "image/png", {})
+    url = await storage.complete_avatar_upload("u1", upload.token)
+
+    assert url.endswith("/cv-assets/avatars/u1.jpg")
+    assert pending not in objects
+    assert objects[("cv-assets", "avatars/u1.jpg")][0] == b"png"
+
+
+@pytest.mark.asyncio
+async def test_upload_schedules_pdf_expiry(storage, redis, monkeypatch):
+    monkeypatch.setattr(settings, "PDF_EXPIRY_HOURS", 2)
+    monkeypatch.setattr("app.core.s3.time.time", lambda: 1000.0)
+
+    await storage.upload_pdf("cv1", b"%PDF")
+
+    assert redis.zsets[CacheKeys.pdf_expiry_index()] == {"cv1": 1000.0 + 7200}
+
+
+@pytest.mark.asyncio
+async def test_delete_pdfs_in_bulk(storage, redis):
+    for cv_id in ("cv1", "cv2", "cv3"):
+        await storage.upload_pdf(cv_id, b"%PDF")
+    await storage.get_download_urls(["cv1", "cv2", "cv3"])
+    storage._client.locked.add("pdfs/cv2.pdf")
+
+    failed = await storage.delete_pdfs(["cv1", "cv2", "cv3", "gone"])
+
+    assert failed == ["cv2"]
+    assert list(storage._client.objects) == [("cvs", "pdfs/cv2.pdf")]
+    # Solo se olvidan los URLs de los PDFs borrados
+    assert list(redis.store) == [CacheKeys.presigned_pdf_url("cv2")]
+
+
+@pytest.mark.asyncio
+async def test_lifecycle_rule_merged_into_existing_config(storage):
+    s3 = storage._client
+    await storage.ensure_buckets()
+    assert [r["ID"] for r in s3.lifecycle["Rules"]] == ["expire-pending-uploads"]
+
+    other = {"ID": "expire-old-exports", "Filter": {"Prefix": "exports/"}, "Status": "Enabled"}
+    s3.lifecycle["Rules"].insert(0, other)
+    await storage.ensure_buckets()
+    assert [r["ID"] for r in s3.lifecycle["Rules"]] == ["expire-old-exports", "expire-pending-uploads"]
+
+
+def test_minio_lifecycle_rule_merged_into_existing_config():
+    class DummyMinio:
+        def __init__(self):
+            self.config = LifecycleConfig([
+                Rule(ENABLED, rule_filter=Filter(prefix="exports/"), rule_id="expire-old-exports",
+                     expiration=Expiration(days=30)),
+                Rule(ENABLED, rule_filter=Filter(prefix="uploads/"), rule_id="expire-pending-uploads",
+                     expiration=Expiration(days=7)),
+            ])
+
+        def get_bucket_lifecycle(self, bucket):
+            return self.config
+
+        def set_bucket_lifecycle(self, bucket, config):
+            self.config = config
+
+    storage = MinIOClient()
+    storage._client = client = DummyMinio()
+    storage._ensure_upload_lifecycle_sync()
+
+    rules = {rule.rule_id: rule.expiration.days for rule in client.config.rules}
+    assert rules == {"expire-old-exports": 30, "expire-pending-uploads": 1}
+
+
+# ── Limpieza de PDFs caducados (app/tasks/cleanup.py) ─────────────────────────
+
+class ExpiringStorage:
+    """MinIOClient de la tarea: una subida nueva llega durante el borrado."""
+
+    def __init__(self, locked=(), during_delete=None):
+        self.locked = set(locked)
+        self.during_delete = during_delete
+        self.deleted = []
+
+    async def delete_pdfs(self, cv_ids):
+        if self.during_delete:
+            await self.during_delete()
+        self.deleted.extend(c for c in cv_ids if c not in self.locked)
+        return sorted(c for c in cv_ids if c in self.locked)
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def expiry_index(monkeypatch, lua_redis):
+    monkeypatch.setattr(cache_service, "_redis", lua_redis)
+    return lua_redis
+
+
+async def run_cleanup(monkeypatch, storage):
+    from app.tasks.cleanup import _cleanup_expired_pdfs
+
+    monkeypatch.setattr("app.core.s3.MinIOClient", lambda: storage)
+    monkeypatch.setattr("app.tasks.cleanup.time.time", lambda: 1000.0)
+    return await _cleanup_expired_pdfs(max_batches=1)
+
+
+@pytest.mark.asyncio
+async def test_cleanup_skips_pdfs_uploaded_again(monkeypatch, expiry_index):
+    for cv_id, expires_at in (("cv1", 10.0), ("cv2", 20.0), ("cv3", 5000.0)):
+        await cache_service.schedule_pdf_expiry(cv_id, expires_at)
+    pop = cache_service.pop_expired_pdfs
+
+    async def pop_then_reupload(now, limit):
+        due = await pop(now, limit)
+        # cv2 se vuelve a subir después de salir del índice
+        await cache_service.schedule_pdf_expiry("cv2", 8200.0)
+        return due
+
+    monkeypatch.setattr(cache_service, "pop_expired_pdfs", pop_then_reupload)
+    storage = ExpiringStorage()
+    summary = await run_cleanup(monkeypatch, storage)
+
+    assert storage.deleted == ["cv1"]
+    assert summary == {"deleted": 1, "failed": 0}
+    index = dict(await expiry_index.zrange(CacheKeys.pdf_expiry_index(), 0, -1, withscores=True))
+    assert index == {b"cv2": 8200.0, b"cv3": 5000.0}
+
+
+@pytest.mark.asyncio
+async def test_failed_delete_requeued_without_overwriting_newer_expiry(monkeypatch, expiry_index):
+    await cache_service.schedule_pdf_expiry("cv1", 10.0)
+    await cache_service.schedule_pdf_expiry("cv2", 20.0)
+
+    async def reupload():
+        await cache_service.schedule_pdf_expiry("cv2", 8200.0)
+
+    # Los dos fallan; cv2 se vuelve a subir mientras se intentaba borrar
+    storage = ExpiringStorage(locked={"cv1", "cv2"}, during_delete=reupload)
+    summary = await run_cleanup(monkeypatch, storage)
+
+    assert summary == {"deleted": 0, "failed": 2}
+    index = dict(await expiry_index.zrange(CacheKeys.pdf_expiry_index(), 0, -1, withscores=True))
+    assert index == {b"cv1": 10.0, b"cv2": 8200.0}
@@ -0,0 +1,49 @@
+from app.enums import RenderEngineName
+from app.services.pdf import CVDocument, CVSection, DirectPdfEngine, PdfService
+
+
+def _document(items: int = 3) -> CVDocument:
+    return CVDocument(
+        full_name="Ada Lovelace",
+        headline="Analista (matemática)",
+        contact=["ada@example.com"],
+        sections=[CVSection("Experiencia", [f"Proyecto {i} — motor analítico" for i in range(items)])],
+    )
+
+
+def test_direct_engine_produces_valid_pdf():
+    pdf = DirectPdfEngine().render(_document(), "ats-plain")
+    assert pdf.startswith(b"%PDF-1.4")
+    assert pdf.rstrip().endswith(b"%%EOF")
+    assert b"/Count 1" in pdf
+    # Los paréntesis del texto se escapan dentro de los literales PDF
+    assert b"Analista \\(matem" in pdf
+
+
+def test_direct_engine_adds_pages_for_long_documents():
+    pdf = DirectPdfEngine().render(_document(items=200), "ats-plain")
+    assert b"/Count 1 " not in pdf
+    assert pdf.count(b"/Type /Page ") > 1
+
+
+def test_direct_engine_wraps_long_lines():
+    engine = DirectPdfEngine()
+    lines = engine._wrap("palabra " * 100, "F1", 10.5)
+    assert len(lines) > 1
+    max_width = engine.PAGE_WIDTH - 2 * engine.MARGIN
+    assert all(engine._text_width(line, "F1", 10.5) <= max_width for line in lines)
+
+
+def test_direct_engine_breaks_words_wider_than_the_line():
+    engine = DirectPdfEngine()
+    url = "https://example.com/" + "a" * 200
+    lines = engine._wrap(f"Portfolio: {url} fin", "F1", 10.5)
+    assert lines[0] == "Portfolio:"
+    assert "".join(lines[1:-1]) + lines[-1].removesuffix(" fin") == url
+    max_width = engine.PAGE_WIDTH - 2 * engine.MARGIN
+    assert all(engine._text_width(line, "F1", 10.5) <= max_width for line in lines)
+
+
+def test_templates_declare_their_engine():
+    assert PdfService.engine_for_template("ats-plain") == RenderEngineName.DIRECT
+    assert PdfService.engine_for_template("modern") == RenderEngineName.WEASYPRINT
@@ -0,0 +1,29 @@
+import orjson
+
+from app.core.config import settings
+from app.services.reference_data import build_reference_bundle
+
+
+def test_bundle_version_is_a_stable_content_hash():
+    first = build_reference_bundle()
+    second = build_reference_bundle()
+    assert first.version == second.version
+    assert first.body == second.body
+    assert first.etag == f'"{first.version}"'
+
+
+def test_bundle_contains_enums_and_templates(monkeypatch, tmp_path):
+    (tmp_path / "ats-plain.html").write_text("")
+    (tmp_path / "modern.html").write_text("")
+    monkeypatch.setattr(settings, "PDF_TEMPLATES_DIR", tmp_path)
+
+    bundle = build_reference_bundle()
+    data = orjson.loads(bundle.body)
+    assert {"value": "direct", "label": "Direct"} in data["enums"]["options"]["render_engine"]
+    assert data["templates"] == [
+        {"slug": "ats-plain", "label": "Ats Plain", "engine": "direct"},
+        {"slug": "modern", "label": "Modern", "engine": "weasyprint"},
+    ]
+
+    (tmp_path / "classic.html").write_text("")
+    assert build_reference_bundle().version != bundle.version
@@ -1,14 +1,14 @@
-import json
 import pytest
-from unittest.mock import Mock
 
-from app.services.settings import SettingsService, CACHE_KEY_PREFIX
+from app.services import settings as settings_module
+from app.services.settings import SNAPSHOT_CACHE_KEY, SettingsService
 from app.models.app_setting import AppSetting
-from app.core import redis
+from app.core.cache import cache_service, local_cache
 
 class DummyDBSession:
     def __init__(self, initial: dict[str, object] | None = None):
         self._store = {}
+        self.queries = 0
         if initial:
             for k, v in initial.items():
                 self._store[k] = AppSetting(key=k, value=v)
@@ -25,51 +25,152 @@ class DummyDBSession:
     async def refresh(self, obj):
         return obj
 
+    async def read_all(self):
+        self.queries += 1
+        return {k: s.value for k, s in self._store.items()}
+
+class DummyPipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._ops.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        results = [await getattr(self._redis, name)(*a, **kw) for name, a, kw in self._ops]
+        self._ops = []
+        return results
+
 class DummyRedisAsync:
     def __init__(self):
         self._store = {}
 
+    def pipeline(self, transaction=True):
+        return DummyPipeline(self)
+
     async def get(self, key):
         return self._store.get(key)
 
-    async def set(self, key, value, ex=None):
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self._store:
+            return None
         self._store[key] = value
+        return True
+
+    async def ttl(self, key):
+        return 60 if key in self._store else -2
+
+    async def incr(self, key):
+        self._store[key] = int(self._store.get(key, 0)) + 1
+        return self._store[key]
+
+    async def eval(self, script, numkeys, *args):
+        if numkeys == 1:  # liberar el lock de relleno
+            return self._store.pop(args[0], None) is not None
+        version_key, key, fresh, lock, version, raw, _, etag, _, token = args
+        if self._store.get(lock) == token:
+            del self._store[lock]
+        if str(self._store.get(version_key, "")) != str(version):
+            return 0
+        self._store[key] = raw
+        self._store[fresh] = etag
+        return 1
+
+    async def publish(self, channel, message):
+        return 0
 
     async def delete(self, *keys):
-        for k in keys:
-            self._store.pop(k, None)
-
-    async def keys(self, pattern):
-        return list(self._store.keys())
+        return sum(self._store.pop(k, None) is not None for k in keys)
 
 @pytest.fixture
 def mock_redis(monkeypatch):
     dummy_redis = DummyRedisAsync()
-    monkeypatch.setattr(redis, "redis_client", dummy_redis)
+    monkeypatch.setattr(cache_service, "_redis", dummy_redis)
+    monkeypatch.setattr(settings_module, "redis_client", dummy_redis)
+    local_cache.clear()
     return dummy_redis
 
-@pytest.mark.asyncio
-async def test_get_with_cache_hit(mock_redis):
-    db = DummyDBSession({"MY_KEY": {"a": 1}})
-    await mock_redis.set(f"{CACHE_KEY_PREFIX}MY_KEY", json.dumps({"a": 1}))
+@pytest.fixture
+def db(monkeypatch):
+    db = DummyDBSession({"MY_KEY": {"a": 1}, "MAINTENANCE_MODE": False})
+    monkeypatch.setattr(settings_module, "_read_all_settings", db.read_all)
+    return db
 
+@pytest.mark.asyncio
+async def test_get_loads_whole_table_once(mock_redis, db):
     svc = SettingsService(db)
-    val = await svc.get("MY_KEY", default=None)
-    assert val == {"a": 1}
+    assert await svc.get("MY_KEY", default=None) == {"a": 1}
+    assert await svc.get("MAINTENANCE_MODE", default=True) is False
+    assert await svc.get("MISSING", default=25) == 25
+    assert db.queries == 1
+    assert SNAPSHOT_CACHE_KEY in mock_redis._store
 
 @pytest.mark.asyncio
-async def test_get_cache_miss_reads_db_and_sets_cache(mock_redis):
-    db = DummyDBSession({"MY_KEY2": "string-value"})
+@pytest.mark.usefixtures("mock_redis")
+async def test_get_many(db):
     svc = SettingsService(db)
-    val = await svc.get("MY_KEY2", default=None)
-    assert val == "string-value"
-    assert await mock_redis.get(f"{CACHE_KEY_PREFIX}MY_KEY2") == json.dumps("string-value")
+    values = await svc.get_many(["MY_KEY", "MISSING"], default=0)
+    assert values == {"MY_KEY": {"a": 1}, "MISSING": 0}
 
 @pytest.mark.asyncio
-async def test_update_creates_and_updates_cache(mock_redis):
-    db = DummyDBSession()
+async def test_update_invalidates_snapshot(mock_redis, db):
     svc = SettingsService(db)
+    await svc.get("MY_KEY")
     created = await svc.update("NEW_KEY", {"x": True}, description="desc")
     assert created.key == "NEW_KEY"
     assert created.value == {"x": True}
-    assert await mock_redis.get(f"{CACHE_KEY_PREFIX}NEW_KEY") == json.dumps({"x": True})
+    assert SNAPSHOT_CACHE_KEY not in mock_redis._store
+    assert await svc.get("NEW_KEY") == {"x": True}
+    assert db.queries == 2
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("mock_redis")
+async def test_get_many_falls_back_to_db(db, monkeypatch):
+    async def broken():
+        raise ConnectionError("redis caído")
+
+    monkeypatch.setattr(settings_module, "load_settings_snapshot", broken)
+    svc = SettingsService(db)
+    values = await svc.get_many(["MY_KEY", "MISSING"], default=0)
+    assert values == {"MY_KEY": {"a": 1}, "MISSING": 0}
+
+@pytest.mark.asyncio
+async def test_snapshot_read_before_a_change_is_not_stored(mock_redis, db, monkeypatch):
+    svc = SettingsService(db)
+
+    async def read_during_update():
+        snapshot = await db.read_all()
+        await svc.update("MY_KEY", {"a": 2})
+        return snapshot
+
+    monkeypatch.setattr(settings_module, "_read_all_settings", read_during_update)
+    assert await svc.get("MY_KEY") == {"a": 1}
+    assert SNAPSHOT_CACHE_KEY not in mock_redis._store
+
+    monkeypatch.setattr(settings_module, "_read_all_settings", db.read_all)
+    assert await svc.get("MY_KEY") == {"a": 2}
+
+@pytest.mark.asyncio
+async def test_clear_all_cache_bumps_version(mock_redis, db):
+    svc = SettingsService(db)
+    await svc.get("MY_KEY")
+    mock_redis.scan_iter = lambda match: _aiter(
+        [k for k in list(mock_redis._store) if k.startswith("app_settings:")]
+    )
+    await svc.clear_all_cache()
+    assert mock_redis._store[settings_module.VERSION_CACHE_KEY] == 1
+    assert SNAPSHOT_CACHE_KEY not in mock_redis._store
+
+async def _aiter(items):
+    for item in items:
+        yield item